@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import candidates, resumes, filters
+from app.api.endpoints import candidates, resumes, filters, saved_searches, changes
 
 api_router = APIRouter()
 
@@ -8,3 +8,5 @@ api_router = APIRouter()
 api_router.include_router(candidates.router, prefix="/candidates", tags=["candidates"])
 api_router.include_router(resumes.router, prefix="/resumes", tags=["resumes"])
 api_router.include_router(filters.router, prefix="/filters", tags=["filters"])
+api_router.include_router(saved_searches.router, prefix="/saved-searches", tags=["saved-searches"])
+api_router.include_router(changes.router, prefix="/changes", tags=["changes"])
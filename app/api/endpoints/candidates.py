@@ -1,16 +1,31 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 
-from app.db.database import get_db
-from app.crud.candidate import candidate_crud
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.serialization import orjson_response, parse_fields
+from app.db.database import get_async_db
+from app.db.write_queue import write_queue
+from app.crud.candidate import async_candidate_crud
+from app.services.export_service import EXPORT_FORMATS, candidate_exporter, parquet_available
+from app.services.query_cache import normalize_filter_params, query_cache
+from app.services.semantic_search import semantic_search
 from app.schemas.candidate import (
+    CANDIDATE_FIELDS,
     CandidateResponse, 
+    SemanticSearchResult,
     CandidateCreate, 
     CandidateUpdate,
     FilterRequest,
-    FilterResponse
+    FilterResponse,
+    BulkIdsRequest,
+    BulkStatusRequest,
+    BulkTagRequest,
+    BulkGetResponse,
+    BulkOperationResponse
 )
 
 class StatusUpdateRequest(BaseModel):
@@ -20,23 +35,219 @@ class StatusUpdateRequest(BaseModel):
 
 router = APIRouter()
 
+# 候选人状态的有效值
+VALID_STATUSES = ["pending", "interviewed", "rejected", "hired"]
+
+def _validate_status_or_400(status: str) -> None:
+    """校验状态值，无效时返回400"""
+    if status not in VALID_STATUSES:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"无效的状态值。有效值: {', '.join(VALID_STATUSES)}"
+        )
+
+def _decode_cursor_or_400(cursor: Optional[str]):
+    """解析分页游标，格式错误时返回400"""
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _fast_fields_or_400(fast: bool, fields: Optional[str]) -> Optional[List[str]]:
+    """快速路径要返回的字段（总含 id），未启用快速路径时返回None"""
+    if not fast and not fields:
+        return None
+    try:
+        return list(dict.fromkeys(["id", *parse_fields(fields, CANDIDATE_FIELDS)]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/", response_model=List[CandidateResponse])
 async def get_candidates(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 返回的游标"),
+    fast: bool = Query(False, description="只查所需列并用orjson直接序列化"),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段（稀疏字段集），指定时使用快速路径"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取候选人列表"""
-    candidates = candidate_crud.get_multi(db, skip=skip, limit=limit)
+    """获取候选人列表
+    
+    按ID升序返回；传入 cursor 时使用键集分页，深翻页与首页开销相同。
+    下一页游标和总数分别通过 X-Next-Cursor、X-Total-Count 响应头返回。
+    fast 或 fields 启用快速路径：不构造ORM对象和响应模型，大页面时序列化开销显著降低。
+    """
+    after = _decode_cursor_or_400(cursor)
+    after_id = after["id"] if after else None
+    field_list = _fast_fields_or_400(fast, fields)
+    
+    if field_list:
+        async def load_rows():
+            rows = await async_candidate_crud.get_multi_rows(
+                db, fields=field_list, skip=skip, limit=limit, after_id=after_id
+            )
+            next_cursor = encode_cursor({"id": rows[-1]["id"]}) if len(rows) == limit else None
+            return rows, next_cursor, await async_candidate_crud.count(db)
+        
+        rows, next_cursor, total_count = await query_cache.aget_or_compute(
+            "candidates:list:rows",
+            {"skip": skip, "limit": limit, "after_id": after_id, "fields": field_list},
+            load_rows
+        )
+        headers = {"X-Total-Count": str(total_count)}
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+        return orjson_response(rows, headers=headers)
+    
+    async def load_page():
+        candidates = await async_candidate_crud.get_multi(db, skip=skip, limit=limit, after_id=after_id)
+        next_cursor = encode_cursor({"id": candidates[-1].id}) if len(candidates) == limit else None
+        return (
+            [CandidateResponse.model_validate(c) for c in candidates],
+            next_cursor,
+            await async_candidate_crud.count(db)
+        )
+    
+    # 数据未变化时重复请求直接命中缓存，不访问数据库
+    candidates, next_cursor, total_count = await query_cache.aget_or_compute(
+        "candidates:list", {"skip": skip, "limit": limit, "after_id": after_id}, load_page
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["X-Total-Count"] = str(total_count)
     return candidates
 
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """查询结果缓存的命中率、写队列积压等指标"""
+    return {**query_cache.stats(), "write_queue": write_queue.stats()}
+
+def _missing_ids(requested: List[int], found: List[int]) -> List[int]:
+    """请求中不存在的候选人ID（去重，保持原顺序）"""
+    found_set = set(found)
+    return [i for i in dict.fromkeys(requested) if i not in found_set]
+
+@router.post("/bulk/get", response_model=BulkGetResponse)
+async def bulk_get_candidates(
+    request: BulkIdsRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """按ID批量获取候选人（一条查询，按请求顺序返回）"""
+    candidates = await async_candidate_crud.get_many(db, ids=list(dict.fromkeys(request.ids)))
+    return BulkGetResponse(
+        candidates=candidates,
+        missing_ids=_missing_ids(request.ids, [c.id for c in candidates])
+    )
+
+@router.post("/bulk/status", response_model=BulkOperationResponse)
+async def bulk_update_status(
+    request: BulkStatusRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量更新候选人状态（单个事务）"""
+    _validate_status_or_400(request.status)
+    updated = await async_candidate_crud.bulk_update_status(
+        db, ids=request.ids, status=request.status, notes=request.notes
+    )
+    return BulkOperationResponse(
+        message=f"已更新 {len(updated)} 个候选人的状态",
+        affected_ids=updated,
+        missing_ids=_missing_ids(request.ids, updated)
+    )
+
+@router.post("/bulk/tags", response_model=BulkOperationResponse)
+async def bulk_tag_candidates(
+    request: BulkTagRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量为候选人添加/移除标签（单个事务）"""
+    if not request.add and not request.remove:
+        raise HTTPException(status_code=400, detail="add 和 remove 不能同时为空")
+    tagged = await async_candidate_crud.bulk_tag(
+        db, ids=request.ids, add=request.add, remove=request.remove
+    )
+    return BulkOperationResponse(
+        message=f"已更新 {len(tagged)} 个候选人的标签",
+        affected_ids=tagged,
+        missing_ids=_missing_ids(request.ids, tagged)
+    )
+
+@router.post("/bulk/delete", response_model=BulkOperationResponse)
+async def bulk_delete_candidates(
+    request: BulkIdsRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """批量删除候选人（单个事务）"""
+    deleted = await async_candidate_crud.bulk_delete(db, ids=request.ids)
+    return BulkOperationResponse(
+        message=f"已删除 {len(deleted)} 个候选人",
+        affected_ids=deleted,
+        missing_ids=_missing_ids(request.ids, deleted)
+    )
+
+@router.get("/export")
+async def export_candidates(
+    format: Literal["ndjson", "csv", "parquet"] = Query("ndjson", description="导出格式"),
+    include_extracted: bool = Query(False, description="附带最新一份简历的结构化数据"),
+    keywords: Optional[List[str]] = Query(None),
+    education: Optional[str] = Query(None),
+    min_experience: Optional[int] = Query(None),
+    max_experience: Optional[int] = Query(None),
+    skills: Optional[List[str]] = Query(None),
+    skill_match: Literal["all", "any"] = Query("all"),
+    status: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None)
+):
+    """流式导出人才库（NDJSON / CSV / Parquet）
+    
+    按ID顺序从服务端游标分批读取并边读边写，内存占用与导出行数无关；
+    筛选参数与 /filter 相同（不支持模糊匹配）。Parquet 需要安装可选依赖 pyarrow。
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet导出需要安装 pyarrow（poetry install -E parquet）")
+    filters = {
+        "keywords": keywords,
+        "education": education,
+        "min_experience": min_experience,
+        "max_experience": max_experience,
+        "skills": skills,
+        "skill_match": skill_match,
+        "status": status,
+        "tags": tags,
+    }
+    filename = f"candidates-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        candidate_exporter.stream(format, filters=filters, include_extracted=include_extracted),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/semantic-search", response_model=List[SemanticSearchResult])
+async def semantic_search_candidates(
+    q: str = Query(..., min_length=1, description="自然语言描述，如“后端开发 熟悉分布式”"),
+    limit: int = Query(20, ge=1, le=200),
+    min_score: float = Query(0.0, ge=-1.0, le=1.0),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """语义检索候选人（本地向量近似最近邻，不调用LLM）"""
+    if not semantic_search.ready:
+        raise HTTPException(status_code=503, detail="本实例未提供语义检索")
+    matches = [(cid, score) for cid, score in semantic_search.search(q, limit=limit) if score >= min_score]
+    candidates = await async_candidate_crud.get_many(db, ids=[cid for cid, _ in matches])
+    scores = dict(matches)
+    return [
+        SemanticSearchResult(candidate=candidate, score=scores[candidate.id])
+        for candidate in candidates
+    ]
+
 @router.get("/{candidate_id}", response_model=CandidateResponse)
 async def get_candidate(
     candidate_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """根据ID获取候选人详情"""
-    candidate = candidate_crud.get(db, id=candidate_id)
+    candidate = await async_candidate_crud.get(db, id=candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="候选人不存在")
     return candidate
@@ -44,30 +255,30 @@ async def get_candidate(
 @router.post("/", response_model=CandidateResponse)
 async def create_candidate(
     candidate_in: CandidateCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """创建新候选人"""
     # 检查邮箱是否已存在
     if candidate_in.email:
-        existing = candidate_crud.get_by_email(db, email=candidate_in.email)
+        existing = await async_candidate_crud.get_by_email(db, email=candidate_in.email)
         if existing:
             raise HTTPException(status_code=400, detail="该邮箱已存在")
     
-    candidate = candidate_crud.create(db, obj_in=candidate_in)
+    candidate = await async_candidate_crud.create(db, obj_in=candidate_in)
     return candidate
 
 @router.patch("/{candidate_id}", response_model=CandidateResponse)
 async def update_candidate(
     candidate_id: int,
     candidate_in: CandidateUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新候选人信息"""
-    candidate = candidate_crud.get(db, id=candidate_id)
+    candidate = await async_candidate_crud.get(db, id=candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="候选人不存在")
     
-    candidate = candidate_crud.update(db, db_obj=candidate, obj_in=candidate_in)
+    candidate = await async_candidate_crud.update(db, db_obj=candidate, obj_in=candidate_in)
     return candidate
 
 from pydantic import BaseModel
@@ -81,39 +292,34 @@ class StatusUpdateRequest(BaseModel):
 async def update_candidate_status(
     candidate_id: int,
     request: StatusUpdateRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """更新候选人状态"""
-    candidate = candidate_crud.get(db, id=candidate_id)
+    candidate = await async_candidate_crud.get(db, id=candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="候选人不存在")
     
     # 验证状态值
-    valid_statuses = ["pending", "interviewed", "rejected", "hired"]
-    if request.status not in valid_statuses:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"无效的状态值。有效值: {', '.join(valid_statuses)}"
-        )
+    _validate_status_or_400(request.status)
     
     update_data = CandidateUpdate(status=request.status)
     if request.notes:
         update_data.notes = request.notes
     
-    candidate = candidate_crud.update(db, db_obj=candidate, obj_in=update_data)
+    candidate = await async_candidate_crud.update(db, db_obj=candidate, obj_in=update_data)
     return {"message": "状态更新成功", "candidate": candidate}
 
 @router.delete("/{candidate_id}")
 async def delete_candidate(
     candidate_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """删除候选人"""
-    candidate = candidate_crud.get(db, id=candidate_id)
+    candidate = await async_candidate_crud.get(db, id=candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="候选人不存在")
     
-    candidate_crud.delete(db, id=candidate_id)
+    await async_candidate_crud.delete(db, id=candidate_id)
     return {"message": "候选人删除成功"}
 
 @router.post("/filter", response_model=FilterResponse)
@@ -121,23 +327,62 @@ async def filter_candidates(
     filter_request: FilterRequest,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="上一页响应中的 next_cursor"),
+    fast: bool = Query(False, description="只查所需列并用orjson直接序列化"),
+    fields: Optional[str] = Query(None, description="逗号分隔的返回字段（稀疏字段集），指定时使用快速路径"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """筛选候选人"""
-    candidates = candidate_crud.filter_candidates(
-        db,
-        keywords=filter_request.keywords,
-        education=filter_request.education,
-        min_experience=filter_request.min_experience,
-        max_experience=filter_request.max_experience,
-        skills=filter_request.skills,
-        status=filter_request.status,
-        skip=skip,
-        limit=limit
-    )
+    """筛选候选人（fast、fields 的含义同候选人列表）"""
+    after = _decode_cursor_or_400(cursor)
+    field_list = _fast_fields_or_400(fast, fields)
+    
+    async def load_page():
+        page = await async_candidate_crud.filter_page(
+            db,
+            keywords=filter_request.keywords,
+            education=filter_request.education,
+            min_experience=filter_request.min_experience,
+            max_experience=filter_request.max_experience,
+            skills=filter_request.skills,
+            skill_match=filter_request.skill_match,
+            status=filter_request.status,
+            tags=filter_request.tags,
+            fuzzy=filter_request.fuzzy,
+            fuzzy_threshold=filter_request.fuzzy_threshold,
+            skip=skip,
+            limit=limit,
+            after=after,
+            fields=field_list
+        )
+        candidates = page.candidates
+        if not field_list:
+            candidates = [CandidateResponse.model_validate(c) for c in candidates]
+        return candidates, encode_cursor(page.next_cursor), page.total_count, page.total_count_capped
+    
+    params = {**normalize_filter_params(filter_request), "skip": skip, "limit": limit, "after": after}
+    namespace = "candidates:filter"
+    if field_list:
+        params["fields"] = field_list
+        namespace = "candidates:filter:rows"
+    try:
+        candidates, next_cursor, total_count, total_count_capped = await query_cache.aget_or_compute(
+            namespace, params, load_page
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    if field_list:
+        return orjson_response({
+            "candidates": candidates,
+            "total_count": total_count,
+            "total_count_capped": total_count_capped,
+            "next_cursor": next_cursor,
+            "filter_criteria": filter_request.dict(exclude_unset=True)
+        })
     return FilterResponse(
         candidates=candidates,
-        total_count=len(candidates),
+        total_count=total_count,
+        total_count_capped=total_count_capped,
+        next_cursor=next_cursor,
         filter_criteria=filter_request.dict(exclude_unset=True)
     )
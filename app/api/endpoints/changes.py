@@ -0,0 +1,50 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.database import get_async_db
+from app.crud.change_log import async_change_log_crud
+from app.models.change_log import ENTITY_CANDIDATE, ENTITY_RESUME
+from app.schemas.change_log import ChangeFeedResponse
+
+router = APIRouter()
+
+@router.get("/", response_model=ChangeFeedResponse)
+async def get_changes(
+    cursor: Optional[str] = Query(None, description="上次响应中的 next_cursor，为空时从头读取"),
+    limit: int = Query(100, ge=1, le=1000),
+    entity: Optional[str] = Query(None, description="只返回某类实体的变更：candidate 或 resume"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """按提交顺序增量读取候选人和简历的变更
+    
+    下游（搜索索引、缓存、导出）保存 next_cursor，之后只需拉取该游标之后的变更，
+    按 entity_id 重新读取或删除对应数据即可，不必全表扫描。
+    """
+    if entity is not None and entity not in (ENTITY_CANDIDATE, ENTITY_RESUME):
+        raise HTTPException(status_code=400, detail=f"无效的实体类型: {entity}")
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    after_id = after["id"] if after else 0
+    
+    # 多取一条判断是否还有下一页
+    changes = await async_change_log_crud.get_changes(db, after_id=after_id, limit=limit + 1, entity=entity)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    last_id = changes[-1].id if changes else after_id
+    return ChangeFeedResponse(
+        changes=changes,
+        next_cursor=encode_cursor({"id": last_id}),
+        has_more=has_more
+    )
+
+@router.get("/head")
+async def get_change_head(db: AsyncSession = Depends(get_async_db)):
+    """当前最新变更的游标
+    
+    新消费者先全量同步，再从全量同步开始前取得的游标增量消费。
+    """
+    return {"cursor": encode_cursor({"id": await async_change_log_crud.latest_id(db)})}
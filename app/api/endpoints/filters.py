@@ -1,12 +1,17 @@
 import logging
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
 
-from app.db.database import get_db
-from app.crud.candidate import candidate_crud
+from app.db.database import get_async_db, run_read
+from app.crud.candidate import async_candidate_crud
+from app.schemas.candidate import FilterRequest
+from app.services.facet_index import EXPERIENCE_RANGES
+from app.services.facet_service import facet_service
 from app.services.llm_service import llm_service
+from app.services.rule_scoring import SnapshotNotReady, rule_scoring
 
 router = APIRouter()
 logger = logging.getLogger("app.api.filters")
@@ -21,10 +26,34 @@ class OptimizeResponse(BaseModel):
     optimized_criteria: Dict[str, Any]
     suggestions: List[str]
 
+class RuleCriteriaRequest(BaseModel):
+    """规则评分条件（与 /optimize 返回的 optimized_criteria 结构一致）"""
+    keywords: Optional[List[str]] = []
+    education: Optional[str] = None
+    min_experience: Optional[int] = None
+    max_experience: Optional[int] = None
+    skills: Optional[List[str]] = []
+    position_keywords: Optional[List[str]] = []
+    company_keywords: Optional[List[str]] = []
+
 class SmartMatchRequest(BaseModel):
     """智能匹配请求"""
     job_requirements: str
     candidate_ids: List[int] = []  # 如果为空，则匹配所有候选人
+    criteria: Optional[RuleCriteriaRequest] = None  # 提供时先用规则评分预筛，只把高分候选人交给LLM
+    prefilter_limit: int = Field(50, ge=1, le=1000)  # 预筛保留的候选人数
+
+class QuickRankRequest(BaseModel):
+    """规则快速排序请求"""
+    criteria: RuleCriteriaRequest
+    candidate_ids: List[int] = []  # 如果为空，则对所有候选人评分
+    limit: int = Field(50, ge=1, le=1000)
+    min_score: float = Field(0.0, ge=0.0, le=100.0)
+
+class QuickRankResponse(BaseModel):
+    """规则快速排序响应"""
+    matches: List[Dict[str, Any]]
+    total_candidates: int  # 参与评分的候选人数
 
 class SmartMatchResponse(BaseModel):
     """智能匹配响应"""
@@ -32,10 +61,17 @@ class SmartMatchResponse(BaseModel):
     matches: List[Dict[str, Any]]
     total_candidates: int
 
+async def rank_by_rules(criteria: RuleCriteriaRequest, **kwargs):
+    """在线程池中对已构建的快照做规则评分；快照尚未就绪时返回503"""
+    try:
+        return await run_in_threadpool(lambda: rule_scoring.rank(criteria.dict(), **kwargs))
+    except SnapshotNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 @router.post("/optimize", response_model=OptimizeResponse)
 async def optimize_filter_criteria(
     request: OptimizeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """使用LLM优化筛选条件"""
     logger.info(f"开始优化筛选条件，查询: {request.natural_language_query}")
@@ -82,7 +118,7 @@ async def optimize_filter_criteria(
 @router.post("/smart-match", response_model=SmartMatchResponse)
 async def smart_candidate_matching(
     request: SmartMatchRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """智能候选人匹配"""
     logger.info(f"开始智能候选人匹配，候选人数量: {len(request.candidate_ids) if request.candidate_ids else '全部'}")
@@ -90,20 +126,26 @@ async def smart_candidate_matching(
     
     try:
         # 获取候选人数据
-        if request.candidate_ids:
+        if request.criteria is not None:
+            # 规则评分预筛：不调用LLM，在全部（或指定）候选人中取得分最高的一批
+            ranked, _ = await rank_by_rules(
+                request.criteria,
+                limit=request.prefilter_limit,
+                candidate_ids=request.candidate_ids or None
+            )
+            logger.debug(f"规则预筛保留 {len(ranked)} 个候选人")
+            candidates = await async_candidate_crud.get_many(db, ids=[r["candidate_id"] for r in ranked])
+        elif request.candidate_ids:
             # 获取指定的候选人
             logger.debug(f"获取指定候选人: {request.candidate_ids}")
-            candidates = []
-            for candidate_id in request.candidate_ids:
-                candidate = candidate_crud.get(db, candidate_id)
-                if candidate:
-                    candidates.append(candidate)
-                else:
-                    logger.warning(f"未找到候选人: candidate_id={candidate_id}")
+            candidates = await async_candidate_crud.get_many(db, ids=list(dict.fromkeys(request.candidate_ids)))
+            if len(candidates) < len(set(request.candidate_ids)):
+                found = {c.id for c in candidates}
+                logger.warning(f"未找到候选人: candidate_ids={[i for i in request.candidate_ids if i not in found]}")
         else:
             # 获取所有候选人
             logger.debug("获取所有候选人数据")
-            candidates = candidate_crud.get_multi(db, skip=0, limit=1000)
+            candidates = await async_candidate_crud.get_multi(db, skip=0, limit=1000)
         
         logger.info(f"获取到 {len(candidates)} 个候选人")
         
@@ -176,6 +218,8 @@ async def smart_candidate_matching(
             total_candidates=len(candidates)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         error_msg = str(e)
         logger.error(f"智能匹配失败: {error_msg}")
@@ -184,6 +228,43 @@ async def smart_candidate_matching(
             detail=f"智能匹配失败: {error_msg}"
         )
 
+@router.post("/quick-rank", response_model=QuickRankResponse)
+async def quick_rank_candidates(
+    request: QuickRankRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """规则快速排序：按结构化条件为候选人打分（0-100），不调用LLM，结果确定"""
+    ranked, total_candidates = await rank_by_rules(
+        request.criteria,
+        limit=request.limit,
+        min_score=request.min_score,
+        candidate_ids=request.candidate_ids or None
+    )
+    candidates = {c.id: c for c in await async_candidate_crud.get_many(db, ids=[r["candidate_id"] for r in ranked])}
+    
+    matches = []
+    for result in ranked:
+        candidate = candidates.get(result["candidate_id"])
+        if candidate is None:
+            # 快照尚未刷新时可能包含已删除的候选人
+            continue
+        matches.append({
+            "candidate_id": candidate.id,
+            "name": candidate.name,
+            "email": candidate.email,
+            "phone": candidate.phone,
+            "education": candidate.education,
+            "experience_years": candidate.experience_years,
+            "current_position": candidate.current_position,
+            "current_company": candidate.current_company,
+            "skills": candidate.skills or [],
+            "status": candidate.status,
+            "score": result["score"],
+            "breakdown": result["breakdown"]
+        })
+    
+    return QuickRankResponse(matches=matches, total_candidates=total_candidates)
+
 @router.get("/suggestions")
 async def get_filter_suggestions():
     """获取筛选建议"""
@@ -196,13 +277,7 @@ async def get_filter_suggestions():
         "education_levels": [
             "高中", "大专", "本科", "硕士", "博士"
         ],
-        "experience_ranges": [
-            {"label": "应届生", "min": 0, "max": 1},
-            {"label": "1-3年", "min": 1, "max": 3},
-            {"label": "3-5年", "min": 3, "max": 5},
-            {"label": "5-10年", "min": 5, "max": 10},
-            {"label": "10年以上", "min": 10, "max": None}
-        ],
+        "experience_ranges": EXPERIENCE_RANGES,
         "status_options": [
             {"value": "pending", "label": "待处理"},
             {"value": "interviewed", "label": "已面试"},
@@ -210,3 +285,15 @@ async def get_filter_suggestions():
             {"value": "hired", "label": "已录用"}
         ]
     }
+
+
+@router.post("/facets")
+async def get_filter_facets(
+    filter_request: FilterRequest,
+    skill_limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """获取当前筛选条件下各分面取值的候选人数"""
+    return await run_read(
+        lambda session: facet_service.get_counts(session, filter_request, skill_limit=skill_limit)
+    )
@@ -1,19 +1,35 @@
 import os
 import logging
-from typing import List
+from typing import List, Literal, Optional
 from urllib.parse import quote
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
 
-from app.db.database import get_db
-from app.crud.candidate import candidate_crud
-from app.crud.resume import resume_crud
-from app.schemas.candidate import UploadResponse, CandidateCreate
+from app.core.config import settings
+from app.core.http_cache import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    RangeNotSatisfiable,
+    http_date,
+    if_range_matches,
+    is_not_modified,
+    parse_range,
+    partial_file_response,
+    partial_stream_response,
+    range_not_satisfiable
+)
+from app.db.database import AsyncSessionLocal, get_async_db
+from app.crud.candidate import async_candidate_crud
+from app.crud.resume import async_resume_crud
+from app.crud.stored_file import async_stored_file_crud
+from app.schemas.candidate import UploadResponse, CandidateCreate, ResumeResponse
 from app.services.file_service import file_service
 from app.services.document_parser import document_parser
 from app.services.llm_service import llm_service
+from app.services.semantic_search import semantic_search
 
 router = APIRouter()
 logger = logging.getLogger("app.api.resumes")
@@ -22,15 +38,26 @@ async def process_resume_background(
     file_path: str,
     filename: str,
     resume_id: int,
-    db: Session
+    content_hash: Optional[str] = None
 ):
-    """后台处理简历的任务"""
+    """后台处理简历的任务（使用独立的数据库会话，请求会话在响应后即关闭）"""
+    async with AsyncSessionLocal() as db:
+        await _process_resume(file_path, filename, resume_id, db, content_hash)
+
+async def _process_resume(
+    file_path: str,
+    filename: str,
+    resume_id: int,
+    db: AsyncSession,
+    content_hash: Optional[str] = None
+):
+    """提取文本、抽取信息并更新简历和候选人"""
     logger.info(f"开始后台处理简历: {filename}, resume_id: {resume_id}")
     
     try:
         # 更新状态为处理中
         logger.debug(f"更新简历状态为处理中: resume_id={resume_id}")
-        resume_crud.update_processing_status(
+        await async_resume_crud.update_processing_status(
             db, resume_id=resume_id, status="processing"
         )
         
@@ -40,9 +67,15 @@ async def process_resume_background(
         
         # 提取文本
         logger.info(f"开始提取文本内容: {filename}")
-        raw_text = document_parser.extract_text(file_path, file_ext)
+        # 文本提取是CPU密集的同步操作，放到线程池中避免阻塞事件循环；对象存储中的文件先下载到本地
+        async with file_service.open_local(file_path, content_hash) as local_path:
+            raw_text = await run_in_threadpool(document_parser.extract_text, local_path, file_ext)
         logger.info(f"文本提取完成，内容长度: {len(raw_text)} 字符")
         
+        # 按标题分段，偏移随原文保存，下游按段读取而不必重新扫描全文
+        sections = document_parser.split_sections(raw_text)
+        logger.debug(f"简历分段完成: {[section['name'] for section in sections]}")
+        
         # 使用规则提取基础信息
         logger.debug("开始规则基础信息提取")
         basic_info = document_parser.extract_basic_info(raw_text)
@@ -59,20 +92,21 @@ async def process_resume_background(
         
         # 更新简历记录
         logger.debug(f"更新简历处理结果: resume_id={resume_id}")
-        resume_crud.update_processing_status(
+        await async_resume_crud.update_processing_status(
             db,
             resume_id=resume_id,
             status="completed",
             raw_text=raw_text,
-            extracted_data=extracted_data
+            extracted_data=extracted_data,
+            sections=sections
         )
         
         # 获取简历记录以获取candidate_id
-        resume = resume_crud.get(db, resume_id)
+        resume = await async_resume_crud.get(db, resume_id)
         if resume and resume.candidate_id:
             logger.debug(f"开始更新候选人信息: candidate_id={resume.candidate_id}")
             # 更新候选人信息
-            candidate = candidate_crud.get(db, resume.candidate_id)
+            candidate = await async_candidate_crud.get(db, resume.candidate_id)
             if candidate and extracted_data:
                 # 添加调试日志
                 logger.debug(f"提取的数据内容: {extracted_data}")
@@ -120,7 +154,7 @@ async def process_resume_background(
                     # 检查邮箱冲突
                     if 'email' in update_data:
                         email_to_check = update_data['email']
-                        existing_candidate = candidate_crud.get_by_email(db, email=email_to_check)
+                        existing_candidate = await async_candidate_crud.get_by_email(db, email=email_to_check)
                         if existing_candidate and existing_candidate.id != candidate.id:
                             # 如果邮箱已存在且不是当前候选人，跳过邮箱更新
                             del update_data['email']
@@ -130,7 +164,7 @@ async def process_resume_background(
                         logger.debug(f"最终更新数据: {update_data}")
                         from app.schemas.candidate import CandidateUpdate
                         candidate_update = CandidateUpdate(**update_data)
-                        candidate_crud.update(db, db_obj=candidate, obj_in=candidate_update)
+                        await async_candidate_crud.update(db, db_obj=candidate, obj_in=candidate_update)
                         logger.info(f"候选人信息更新成功: candidate_id={candidate.id}, 更新字段={list(update_data.keys())}")
                     else:
                         logger.info("没有可更新的候选人字段")
@@ -141,6 +175,21 @@ async def process_resume_background(
         else:
             logger.warning(f"未找到简历记录或candidate_id为空: resume_id={resume_id}")
         
+        # 写入语义检索向量（本地向量化，不调用LLM）
+        if resume and resume.candidate_id:
+            candidate = await async_candidate_crud.get(db, resume.candidate_id)
+            if candidate:
+                semantic_search.index_candidate(
+                    candidate.id,
+                    semantic_search.build_document(
+                        raw_text,
+                        current_position=candidate.current_position,
+                        current_company=candidate.current_company,
+                        skills=candidate.skills
+                    )
+                )
+                logger.debug(f"语义向量写入完成: candidate_id={candidate.id}")
+        
         logger.info(f"简历处理完成: {filename}, resume_id={resume_id}")
         
     except Exception as e:
@@ -149,7 +198,7 @@ async def process_resume_background(
         
         # 更新状态为失败
         try:
-            resume_crud.update_processing_status(
+            await async_resume_crud.update_processing_status(
                 db,
                 resume_id=resume_id,
                 status="failed",
@@ -163,7 +212,7 @@ async def process_resume_background(
 async def upload_resumes(
     background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """批量上传简历"""
     logger.info(f"开始批量上传简历，共 {len(files)} 个文件")
@@ -195,10 +244,10 @@ async def upload_resumes(
                 })
                 continue
             
-            # 保存文件
+            # 写入暂存区并计算内容哈希
             logger.debug(f"保存文件: {file.filename}")
             try:
-                file_path, file_size = await file_service.save_file(file)
+                staged = await file_service.stage_file(file)
             except ValueError as e:
                 logger.warning(f"文件保存失败: {file.filename}, 原因: {str(e)}")
                 failed_files.append({
@@ -215,28 +264,36 @@ async def upload_resumes(
                 continue
                 
             file_ext = os.path.splitext(file.filename)[1][1:].lower()
-            logger.info(f"文件保存成功: {file.filename}, 大小: {file_size} bytes, 路径: {file_path}")
-            
-            # 创建候选人记录（如果不存在）
-            logger.debug(f"创建候选人记录: {file.filename}")
-            candidate_data = CandidateCreate(
-                name=f"候选人_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-                email=None
-            )
-            candidate = candidate_crud.create(db, obj_in=candidate_data)
-            logger.debug(f"候选人创建成功: candidate_id={candidate.id}")
+            file_path = staged.file_path
+            logger.info(f"文件暂存成功: {file.filename}, 大小: {staged.file_size} bytes, sha256: {staged.content_hash}")
             
-            # 创建简历记录
-            logger.debug(f"创建简历记录: {file.filename}")
-            resume = resume_crud.create(
-                db,
-                filename=file.filename,
-                file_path=file_path,
-                file_size=file_size,
-                file_type=file_ext,
-                candidate_id=candidate.id
-            )
-            logger.info(f"简历记录创建成功: resume_id={resume.id}, candidate_id={candidate.id}")
+            try:
+                # 创建候选人记录（如果不存在）
+                logger.debug(f"创建候选人记录: {file.filename}")
+                candidate_data = CandidateCreate(
+                    name=f"候选人_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                    email=None
+                )
+                candidate = await async_candidate_crud.create(db, obj_in=candidate_data)
+                logger.debug(f"候选人创建成功: candidate_id={candidate.id}")
+                
+                # 创建简历记录，同一事务中登记对存储文件的引用
+                logger.debug(f"创建简历记录: {file.filename}")
+                resume = await async_resume_crud.create(
+                    db,
+                    filename=file.filename,
+                    file_path=file_path,
+                    file_size=staged.file_size,
+                    file_type=file_ext,
+                    candidate_id=candidate.id,
+                    content_hash=staged.content_hash
+                )
+            except Exception:
+                file_service.discard_staged(staged)
+                raise
+            # 引用登记后再放入存储（相同内容已存在时同样重新写入，覆盖是幂等的）
+            await file_service.commit_staged(staged)
+            logger.info(f"简历记录创建成功: resume_id={resume.id}, candidate_id={candidate.id}, 路径: {file_path}")
             
             # 添加后台处理任务
             logger.debug(f"添加后台处理任务: {file.filename}, resume_id={resume.id}")
@@ -245,7 +302,7 @@ async def upload_resumes(
                 file_path,
                 file.filename,
                 resume.id,
-                db
+                staged.content_hash
             )
             
             uploaded_files.append(file.filename)
@@ -272,67 +329,164 @@ async def upload_resumes(
 @router.get("/{resume_id}/content")
 async def get_resume_content(
     resume_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """获取简历内容"""
-    resume = resume_crud.get(db, resume_id)
+    """获取简历内容（原文只在这里加载）"""
+    resume = await async_resume_crud.get(db, resume_id)
     if not resume:
         raise HTTPException(status_code=404, detail="简历不存在")
+    content = await async_resume_crud.get_content(db, resume_id)
     
     return {
         "id": resume.id,
         "filename": resume.filename,
         "processing_status": resume.processing_status,
-        "raw_text": resume.raw_text,
-        "extracted_data": resume.extracted_data,
+        "raw_text": content.raw_text if content else None,
+        "extracted_data": content.extracted_data if content else None,
+        "sections": content.sections if content else None,
         "candidate_id": resume.candidate_id
     }
 
-@router.get("/candidate/{candidate_id}")
+@router.get("/{resume_id}/sections")
+async def get_resume_sections(
+    resume_id: int,
+    name: Optional[Literal["contact", "education", "experience", "skills", "projects", "other"]] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """按段读取简历原文（可只取某一类段落，如 name=skills）"""
+    content = await async_resume_crud.get_content(db, resume_id)
+    if not content or content.raw_text is None:
+        raise HTTPException(status_code=404, detail="简历原文不存在")
+    raw_text = content.raw_text
+    # 分段前处理的简历没有偏移时现场切分
+    sections = content.sections if content.sections is not None else document_parser.split_sections(raw_text)
+    return {
+        "resume_id": resume_id,
+        "sections": [
+            {**section, "text": raw_text[section["start"]:section["end"]].strip()}
+            for section in sections if name is None or section["name"] == name
+        ]
+    }
+
+@router.get("/candidate/{candidate_id}", response_model=List[ResumeResponse])
 async def get_candidate_resumes(
     candidate_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """获取候选人的所有简历"""
-    resumes = resume_crud.get_by_candidate(db, candidate_id)
+    resumes = await async_resume_crud.get_by_candidate(db, candidate_id)
     return resumes
 
 @router.get("/{resume_id}/download")
 async def download_resume(
     resume_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """下载简历文件"""
+    """下载简历文件
+    
+    按内容寻址存储的文件以内容哈希作为强ETag并允许长期缓存；支持
+    If-None-Match / If-Modified-Since 条件请求（304）和单个字节范围请求（206），
+    浏览器PDF预览可以按需分段加载，重复打开时不再重新下载。
+    文件在对象存储中时重定向到预签名URL（S3_PRESIGNED_DOWNLOADS），文件内容不经过应用；
+    关闭预签名时由应用按范围流式转发。
+    """
     logger.info(f"开始下载简历: resume_id={resume_id}")
     
     # 获取简历记录
-    resume = resume_crud.get(db, resume_id)
+    resume = await async_resume_crud.get(db, resume_id)
     if not resume:
         logger.warning(f"简历不存在: resume_id={resume_id}")
         raise HTTPException(status_code=404, detail="简历不存在")
     
     # 检查文件是否存在
-    if not resume.file_path or not os.path.exists(resume.file_path):
+    remote_key = file_service.remote_key(resume.file_path, resume.content_hash)
+    if remote_key:
+        stored = await file_service.storage.stat(remote_key)
+        file_size, mtime = (stored.size, stored.modified) if stored else (None, None)
+    else:
+        try:
+            stat_result = os.stat(resume.file_path) if resume.file_path else None
+        except OSError:
+            stat_result = None
+        file_size, mtime = (stat_result.st_size, stat_result.st_mtime) if stat_result else (None, None)
+    if file_size is None:
         logger.error(f"简历文件不存在: resume_id={resume_id}, file_path={resume.file_path}")
         raise HTTPException(status_code=404, detail="简历文件不存在")
     
+    # 内容寻址的文件以首次存储的时间作为修改时间：相同内容重新上传会重写文件，
+    # 文件的修改时间随之变化，但内容和ETag不变
+    if resume.content_hash:
+        stored_file = await async_stored_file_crud.get(db, resume.content_hash)
+        if stored_file:
+            mtime = stored_file.created_at.replace(tzinfo=timezone.utc).timestamp()
+    
     # 检查是否为PDF文件
     if resume.file_type.lower() != 'pdf':
         logger.warning(f"文件类型不是PDF: resume_id={resume_id}, file_type={resume.file_type}")
         raise HTTPException(status_code=400, detail="只支持PDF文件预览")
     
-    logger.info(f"返回简历文件: {resume.filename}, 路径: {resume.file_path}")
-    
     # 对文件名进行URL编码以支持中文字符
     encoded_filename = quote(resume.filename.encode('utf-8'))
     
+    # 内容寻址的文件不会变化；迁移前的旧文件没有内容哈希，只用文件修改时间协商
+    etag = f'"{resume.content_hash}"' if resume.content_hash else None
+    last_modified = http_date(mtime)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Last-Modified": last_modified,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if etag else REVALIDATE_CACHE_CONTROL,
+    }
+    if etag:
+        headers["ETag"] = etag
+    
+    if is_not_modified(request, etag, mtime):
+        logger.debug(f"简历未修改，返回304: resume_id={resume_id}")
+        return Response(status_code=304, headers=headers)
+    
+    if remote_key and settings.S3_PRESIGNED_DOWNLOADS:
+        url = await file_service.storage.presigned_url(
+            remote_key,
+            filename=resume.filename,
+            media_type="application/pdf",
+            expires=settings.S3_PRESIGN_EXPIRES
+        )
+        if url:
+            # 预签名URL会过期，重定向本身不缓存
+            logger.info(f"重定向到对象存储下载: resume_id={resume_id}")
+            return RedirectResponse(url, status_code=307, headers={"Cache-Control": "private, no-store"})
+    
+    headers["Content-Disposition"] = f"inline; filename*=UTF-8''{encoded_filename}"
+    range_header = request.headers.get("range")
+    if range_header and if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, file_size)
+        except RangeNotSatisfiable:
+            return range_not_satisfiable(file_size)
+        if byte_range:
+            logger.debug(f"返回简历文件片段: resume_id={resume_id}, range={byte_range}")
+            if remote_key:
+                return partial_stream_response(
+                    file_service.storage.get_stream(remote_key, *byte_range),
+                    byte_range, file_size, "application/pdf", headers
+                )
+            return partial_file_response(
+                resume.file_path, byte_range, file_size, "application/pdf", headers
+            )
+    
+    logger.info(f"返回简历文件: {resume.filename}, 路径: {resume.file_path}")
+    
+    if remote_key:
+        return StreamingResponse(
+            file_service.storage.get_stream(remote_key),
+            media_type="application/pdf",
+            headers={**headers, "Content-Length": str(file_size)}
+        )
+    
     # 返回文件响应
     return FileResponse(
         path=resume.file_path,
-        filename=resume.filename,
         media_type='application/pdf',
-        headers={
-            "Content-Disposition": f"inline; filename*=UTF-8''{encoded_filename}",
-            "Content-Type": "application/pdf"
-        }
+        headers=headers,
+        stat_result=stat_result
     )
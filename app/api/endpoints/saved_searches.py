@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import encode_cursor, decode_cursor
+from app.db.database import get_async_db, run_read
+from app.db.write_queue import write_queue
+from app.crud.candidate import async_candidate_crud
+from app.crud.saved_search import saved_search_crud
+from app.models.saved_search import SavedSearch
+from app.schemas.saved_search import (
+    SavedSearchCreate,
+    SavedSearchResponse,
+    SavedSearchResults
+)
+
+router = APIRouter()
+
+async def _to_response(db: AsyncSession, saved_searches: List[SavedSearch]) -> List[SavedSearchResponse]:
+    """附加匹配数和新增数"""
+    ids = [s.id for s in saved_searches]
+    counts = await run_read(lambda session: saved_search_crud.match_counts(session, ids))
+    responses = []
+    for saved_search in saved_searches:
+        match_count, new_match_count = counts.get(saved_search.id, (0, 0))
+        responses.append(SavedSearchResponse(
+            id=saved_search.id,
+            name=saved_search.name,
+            filters=saved_search.filters,
+            match_count=match_count,
+            new_match_count=new_match_count,
+            created_at=saved_search.created_at,
+            last_viewed_at=saved_search.last_viewed_at
+        ))
+    return responses
+
+async def _get_or_404(db: AsyncSession, saved_search_id: int) -> SavedSearch:
+    saved_search = await run_read(lambda session: saved_search_crud.get(session, saved_search_id))
+    if not saved_search:
+        raise HTTPException(status_code=404, detail="保存的搜索不存在")
+    return saved_search
+
+@router.post("/", response_model=SavedSearchResponse)
+async def create_saved_search(
+    saved_search_in: SavedSearchCreate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """保存筛选条件，并立即物化当前匹配的候选人"""
+    saved_search = await write_queue.run_write(db, lambda session: saved_search_crud.create(
+        session, name=saved_search_in.name, filter_request=saved_search_in.filters
+    ))
+    return (await _to_response(db, [saved_search]))[0]
+
+@router.get("/", response_model=List[SavedSearchResponse])
+async def get_saved_searches(db: AsyncSession = Depends(get_async_db)):
+    """获取所有保存的搜索及其匹配数、新增数"""
+    saved_searches = await run_read(saved_search_crud.get_multi)
+    return await _to_response(db, saved_searches)
+
+@router.get("/{saved_search_id}", response_model=SavedSearchResults)
+async def open_saved_search(
+    saved_search_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="上一页响应中的 next_cursor"),
+    only_new: bool = Query(False, description="只返回上次查看后新增的匹配"),
+    mark_viewed: bool = Query(True, description="打开首页时记录查看时间"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """打开保存的搜索：从物化结果按索引读取，不重新执行筛选
+    
+    新增匹配以打开首页时的上次查看时间为准，该时间随游标传递，
+    翻页过程中不会因为首页已标记查看而改变。
+    """
+    saved_search = await _get_or_404(db, saved_search_id)
+    try:
+        after = decode_cursor(cursor)
+        since = saved_search.last_viewed_at
+        if after is not None:
+            since = datetime.fromisoformat(after["since"]) if after.get("since") else None
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e) or "无效的分页游标")
+    
+    page = await run_read(lambda session: saved_search_crud.get_matches(
+        session,
+        saved_search,
+        since=since,
+        only_new=only_new,
+        skip=skip,
+        limit=limit,
+        after_id=after["id"] if after else None
+    ))
+    if after is None and mark_viewed:
+        saved_search = await write_queue.run_write(db, lambda session: saved_search_crud.mark_viewed(
+            session, saved_search_crud.get(session, saved_search_id)
+        ))
+    
+    next_cursor = None
+    if page.next_cursor:
+        next_cursor = {**page.next_cursor, "since": since.isoformat() if since else None}
+    return SavedSearchResults(
+        saved_search=(await _to_response(db, [saved_search]))[0],
+        candidates=await async_candidate_crud.get_many(db, ids=page.candidate_ids),
+        total_count=page.total_count,
+        new_count=page.new_count,
+        new_candidate_ids=page.new_ids,
+        next_cursor=encode_cursor(next_cursor)
+    )
+
+@router.post("/{saved_search_id}/refresh", response_model=SavedSearchResponse)
+async def refresh_saved_search(
+    saved_search_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """全量重算匹配结果（通常不需要，候选人变更时会自动增量维护）"""
+    saved_search = await _get_or_404(db, saved_search_id)
+    saved_search = await write_queue.run_write(db, lambda session: saved_search_crud.refresh(
+        session, saved_search_crud.get(session, saved_search_id)
+    ))
+    return (await _to_response(db, [saved_search]))[0]
+
+@router.delete("/{saved_search_id}")
+async def delete_saved_search(
+    saved_search_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """删除保存的搜索"""
+    await _get_or_404(db, saved_search_id)
+    await write_queue.run_write(db, lambda session: saved_search_crud.delete(session, id=saved_search_id))
+    return {"message": "保存的搜索删除成功"}
@@ -12,6 +12,33 @@ class Settings(BaseSettings):
     
     # 数据库配置
     DATABASE_URL: str = "sqlite:///./hr_copilot.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # 异步引擎连接串，默认由DATABASE_URL推导（aiosqlite/asyncpg）
+    
+    # 连接池配置（仅非SQLite数据库，如PostgreSQL；同步、异步引擎各自一个连接池）
+    DB_POOL_SIZE: int = 10  # 常驻连接数
+    DB_MAX_OVERFLOW: int = 20  # 高峰时允许额外创建的连接数
+    DB_POOL_TIMEOUT: int = 30  # 等待空闲连接的秒数
+    DB_POOL_RECYCLE: int = 1800  # 连接使用超过该秒数后重建，避免被服务端或中间件断开
+    
+    # SQLite调优（每个新连接建立时设置，非SQLite数据库忽略）
+    SQLITE_JOURNAL_MODE: str = "WAL"  # WAL模式下读写互不阻塞
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # WAL下NORMAL只在检查点fsync，断电最多丢失最近的事务
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # 遇到锁时等待的毫秒数，而不是立即报 database is locked
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 每个连接的页缓存大小
+    SQLITE_MMAP_SIZE: int = 268435456  # 内存映射读取的字节数，0表示关闭
+    SQLITE_WRITE_QUEUE: bool = True  # 写事务统一交给单个写线程依次执行
+    
+    # 筛选索引配置
+    FACET_INDEX_ENABLED: bool = True  # 启动时构建内存分面位图索引
+    QUERY_CACHE_MAX_ENTRIES: int = 1024  # 列表/筛选结果缓存条数，0表示关闭
+    RULE_SCORING_REFRESH_SECONDS: float = 0  # 大于0时按该间隔检查变更日志，其他副本写入后也重建规则评分快照
+    
+    # 语义检索配置
+    SEMANTIC_SEARCH_ENABLED: bool = True  # 关闭时不打开本地向量索引（多副本部署时只能在一个副本上开启）
+    VECTOR_INDEX_DIR: str = "data/vectors"  # 向量内存映射文件目录
+    SEMANTIC_EMBEDDING_DIM: int = 384  # 向量维度（修改后需重建索引）
+    VECTOR_INDEX_NPROBE: int = 16  # 每次查询扫描的IVF簇数
+    VECTOR_INDEX_TRAIN_MIN: int = 20000  # 向量数达到该值后训练IVF，之前使用暴力检索
     
     # LLM配置
     OPENROUTER_API_KEY: Optional[str] = None
@@ -22,6 +49,29 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     ALLOWED_EXTENSIONS: list = [".pdf", ".doc", ".docx"]
     
+    # PDF文本提取引擎：按顺序尝试已安装的引擎（pdfium、pdfminer、pypdf2），
+    # 结果质量分（可读字符比例）低于阈值时换下一个引擎，scripts/benchmark_pdf_engines.py 对比各引擎
+    PDF_ENGINES: list = ["pdfium", "pdfminer", "pypdf2"]
+    PDF_MIN_TEXT_QUALITY: float = 0.98
+    
+    # 文件存储后端：local（UPLOAD_DIR）或 s3（S3兼容的对象存储，如AWS S3、MinIO，需安装 aioboto3）
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: Optional[str] = None
+    S3_PREFIX: str = ""  # 对象键前缀，如 "resumes/"
+    S3_ENDPOINT_URL: Optional[str] = None  # MinIO等自建服务的地址，AWS S3留空
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None  # 留空时使用boto默认的凭证链（环境变量、实例角色等）
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+    S3_MULTIPART_THRESHOLD: int = 8 * 1024 * 1024  # 超过该大小分片上传
+    S3_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024  # 分片大小（S3要求除最后一片外不小于5MB）
+    S3_PRESIGNED_DOWNLOADS: bool = True  # 下载时重定向到预签名URL，文件不经过应用
+    S3_PRESIGN_EXPIRES: int = 300  # 预签名URL有效秒数
+    
+    # 存储对账：定期删除无简历引用的孤立文件、标记文件缺失的简历
+    STORAGE_GC_INTERVAL_HOURS: float = 24  # 0 表示不在应用内定期执行（可用 scripts/gc_uploads.py 手动执行）
+    STORAGE_GC_GRACE_HOURS: float = 24  # 文件写入后超过该时长才可能作为孤立文件删除
+    STORAGE_GC_BATCH_SIZE: int = 1000
+    
     # 会话配置
     SESSION_TIMEOUT: int = 3600  # 1小时
     
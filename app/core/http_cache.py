@@ -0,0 +1,131 @@
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncIterator, Iterator, Mapping, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+# 按内容寻址的文件永不改变，客户端可长期缓存（简历属个人数据，只允许浏览器缓存）
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# 内容可能变化的文件每次使用前向服务器确认
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+# 范围响应每次读取的字节数
+RANGE_CHUNK_SIZE = 64 * 1024
+
+class RangeNotSatisfiable(ValueError):
+    """请求的字节范围超出文件大小"""
+
+def http_date(timestamp: float) -> str:
+    """Last-Modified 等头使用的HTTP日期"""
+    return formatdate(timestamp, usegmt=True)
+
+def _parse_http_date(value: str) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def _etag_values(header: str):
+    return [value.strip() for value in header.split(",") if value.strip()]
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+def is_not_modified(request: Request, etag: Optional[str], mtime: float) -> bool:
+    """条件请求是否可以返回304
+
+    If-None-Match 优先（弱比较）；没有该头时按 If-Modified-Since 比较秒级修改时间。
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        values = _etag_values(if_none_match)
+        return "*" in values or _opaque(etag) in {_opaque(value) for value in values}
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        since = _parse_http_date(if_modified_since)
+        return since is not None and int(mtime) <= since
+    return False
+
+def if_range_matches(request: Request, etag: Optional[str], last_modified: str) -> bool:
+    """If-Range 校验（ETag须强匹配），不满足时应忽略Range返回完整文件"""
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return etag is not None and if_range == etag and not etag.startswith("W/")
+    return if_range == last_modified
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """解析单个字节范围，返回闭区间 (start, end)
+
+    没有Range头、格式无效或请求多个范围时返回None（按规范返回完整文件）；
+    范围完全超出文件时抛出 RangeNotSatisfiable。
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    first, last = (part.strip() for part in spec.split("-", 1))
+    if not (first or last) or any(part and not part.isdigit() for part in (first, last)):
+        return None
+    if not first:
+        # 后缀范围：最后N个字节
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiable(header)
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def partial_file_response(
+    path: str,
+    byte_range: Tuple[int, int],
+    size: int,
+    media_type: str,
+    headers: Mapping[str, str]
+) -> StreamingResponse:
+    """206响应：只发送请求的字节范围"""
+    start, end = byte_range
+    return partial_stream_response(_read_range(path, start, end), byte_range, size, media_type, headers)
+
+def partial_stream_response(
+    chunks: Union[Iterator[bytes], AsyncIterator[bytes]],
+    byte_range: Tuple[int, int],
+    size: int,
+    media_type: str,
+    headers: Mapping[str, str]
+) -> StreamingResponse:
+    """206响应：chunks 只包含请求范围内的字节（如对象存储的范围读取）"""
+    start, end = byte_range
+    return StreamingResponse(
+        chunks,
+        status_code=206,
+        media_type=media_type,
+        headers={
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            "Content-Length": str(end - start + 1),
+        }
+    )
+
+def range_not_satisfiable(size: int) -> Response:
+    """416响应"""
+    return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
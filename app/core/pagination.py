@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+
+def encode_cursor(values: Optional[Dict[str, Any]]) -> Optional[str]:
+    """将分页位置编码为不透明的游标字符串"""
+    if values is None:
+        return None
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """解析游标字符串，格式错误时抛出 ValueError"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("无效的分页游标")
+    if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+        raise ValueError("无效的分页游标")
+    return values
@@ -0,0 +1,24 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+from fastapi import Response
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """解析逗号分隔的字段列表（稀疏字段集），为空或 * 时返回全部字段，未知字段抛出 ValueError"""
+    if not fields or fields.strip() == "*":
+        return list(allowed)
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise ValueError(f"未知字段: {', '.join(unknown)}。可选字段: {', '.join(allowed)}")
+    if not requested:
+        raise ValueError("fields 不能为空")
+    return requested
+
+def orjson_response(content: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """用 orjson 直接序列化为响应体，跳过 response_model 校验和标准库 json 编码"""
+    return Response(
+        content=orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS),
+        media_type="application/json",
+        headers=headers
+    )
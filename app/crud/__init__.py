@@ -1,5 +1,11 @@
 # 导入所有CRUD操作
-from .candidate import candidate_crud
-from .resume import resume_crud
+from .candidate import candidate_crud, async_candidate_crud
+from .resume import resume_crud, async_resume_crud
+from .saved_search import saved_search_crud
+from .change_log import change_log_crud, async_change_log_crud
+from .stored_file import stored_file_crud, async_stored_file_crud
 
-__all__ = ["candidate_crud", "resume_crud"]
+__all__ = [
+    "candidate_crud", "resume_crud", "saved_search_crud", "change_log_crud", "stored_file_crud",
+    "async_candidate_crud", "async_resume_crud", "async_change_log_crud", "async_stored_file_crud"
+]
@@ -1,18 +1,90 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, select, delete, insert, update, intersect, exists, func, case
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple
+from datetime import datetime
+from app.db.database import run_read
+from app.db.fulltext import DEFAULT_FUZZY_THRESHOLD, RANKED_MATCH_LIMIT, candidate_fulltext
+from app.crud.change_log import change_log_crud
+from app.crud.stored_file import stored_file_crud
+from app.db.write_queue import write_queue
 from app.models.candidate import Candidate
+from app.models.candidate_skill import CandidateSkill, normalize_skill
+from app.models.candidate_tag import CandidateTag, normalize_tag
+from app.models.change_log import (
+    ENTITY_CANDIDATE, ENTITY_RESUME, OPERATION_CREATE, OPERATION_UPDATE, OPERATION_DELETE
+)
+from app.models.resume import Resume, ResumeContent
+from app.models.saved_search import SavedSearch, SavedSearchMatch
 from app.schemas.candidate import CandidateCreate, CandidateUpdate
+from app.services.facet_index import facet_index, EDUCATION_LEVELS, EXPERIENCE_RANGES
+from app.services.query_cache import query_cache
+from app.services.semantic_search import semantic_search
+
+class FilterPage(NamedTuple):
+    """一页筛选结果"""
+    candidates: List[Any]  # 候选人对象；指定 fields 时为只含这些字段的字典
+    next_cursor: Optional[Dict[str, Any]]  # 下一页的游标位置，没有下一页时为None
+    total_count: int
+    total_count_capped: bool = False  # 为True时实际总数超过 total_count（宽泛的关键词只统计到上限）
 
 class CandidateCRUD:
     """候选人CRUD操作"""
     
+    def _normalize_skills(self, skills: Optional[List[str]]) -> List[str]:
+        """规范化并去重技能列表"""
+        normalized = {normalize_skill(skill) for skill in (skills or []) if skill and skill.strip()}
+        return sorted(normalized)
+    
+    def _sync_skills(self, db: Session, candidate_id: int, skills: Optional[List[str]]) -> None:
+        """重写候选人在技能索引表中的记录"""
+        db.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id == candidate_id))
+        normalized = self._normalize_skills(skills)
+        if normalized:
+            db.execute(
+                insert(CandidateSkill),
+                [{"candidate_id": candidate_id, "skill_normalized": skill} for skill in normalized]
+            )
+    
+    def ensure_skill_index(self, db: Session, batch_size: int = 1000) -> int:
+        """技能索引表为空时从Candidate.skills回填，返回回填的候选人数"""
+        if db.query(exists().where(CandidateSkill.candidate_id.isnot(None))).scalar():
+            return 0
+        
+        count = 0
+        rows = db.execute(
+            select(Candidate.id, Candidate.skills).where(Candidate.skills.isnot(None))
+        ).yield_per(batch_size)
+        entries = []
+        for candidate_id, skills in rows:
+            entries.extend(
+                {"candidate_id": candidate_id, "skill_normalized": skill}
+                for skill in self._normalize_skills(skills)
+            )
+            count += 1
+            if len(entries) >= batch_size:
+                db.execute(insert(CandidateSkill), entries)
+                entries = []
+        if entries:
+            db.execute(insert(CandidateSkill), entries)
+        db.commit()
+        return count
+    
     def create(self, db: Session, *, obj_in: CandidateCreate) -> Candidate:
         """创建候选人"""
         db_obj = Candidate(**obj_in.dict())
         db.add(db_obj)
+        db.flush()
+        self._sync_skills(db, db_obj.id, db_obj.skills)
+        candidate_fulltext.index_candidate(db, db_obj.id)
+        self.match_saved_searches(db, [db_obj.id])
+        change_log_crud.record(
+            db, entity=ENTITY_CANDIDATE, operation=OPERATION_CREATE, versions=[(db_obj.id, db_obj.version)]
+        )
         db.commit()
         db.refresh(db_obj)
+        facet_index.update(db_obj)
+        query_cache.invalidate()
         return db_obj
     
     def get(self, db: Session, id: int) -> Optional[Candidate]:
@@ -28,10 +100,80 @@ class CandidateCRUD:
         db: Session, 
         *, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        after_id: Optional[int] = None
     ) -> List[Candidate]:
-        """获取候选人列表"""
-        return db.query(Candidate).offset(skip).limit(limit).all()
+        """获取候选人列表（按ID升序，after_id 为键集分页游标）"""
+        query = db.query(Candidate)
+        if after_id is not None:
+            query = query.filter(Candidate.id > after_id)
+        return query.order_by(Candidate.id).offset(skip).limit(limit).all()
+    
+    def count(self, db: Session) -> int:
+        """候选人总数，位图索引可用时直接从索引读取"""
+        if facet_index.ready:
+            return facet_index.count()
+        return db.query(func.count(Candidate.id)).scalar()
+    
+    def get_many(self, db: Session, *, ids: List[int]) -> List[Candidate]:
+        """按给定ID顺序批量获取候选人"""
+        if not ids:
+            return []
+        candidates = {c.id: c for c in db.query(Candidate).filter(Candidate.id.in_(ids))}
+        return [candidates[i] for i in ids if i in candidates]
+    
+    def _row_columns(self, fields: List[str]) -> list:
+        """字段对应的列，首列固定为ID（tags 不是列，另行批量查询）"""
+        return [Candidate.id] + [getattr(Candidate, field) for field in fields if field not in ("id", "tags")]
+    
+    def _to_dicts(self, db: Session, rows: List[tuple], fields: List[str]) -> List[Dict[str, Any]]:
+        """把 _row_columns 查出的元组转换为只含 fields 的字典"""
+        keys = [column.key for column in self._row_columns(fields)]
+        tags: Dict[int, List[str]] = {}
+        if "tags" in fields and rows:
+            for candidate_id, tag in db.execute(
+                select(CandidateTag.candidate_id, CandidateTag.tag)
+                .where(CandidateTag.candidate_id.in_([row[0] for row in rows]))
+                .order_by(CandidateTag.candidate_id, CandidateTag.tag)
+            ):
+                tags.setdefault(candidate_id, []).append(tag)
+        result = []
+        for row in rows:
+            values = dict(zip(keys, row))
+            if "tags" in fields:
+                values["tags"] = tags.get(row[0], [])
+            result.append({field: values[field] for field in fields})
+        return result
+    
+    def get_many_rows(self, db: Session, *, ids: List[int], fields: List[str]) -> List[Dict[str, Any]]:
+        """按给定ID顺序批量获取候选人的部分字段（只查所需列，不构造ORM对象）"""
+        if not ids:
+            return []
+        rows = {row[0]: row for row in db.execute(
+            select(*self._row_columns(fields)).where(Candidate.id.in_(ids))
+        ).tuples()}
+        return self._to_dicts(db, [rows[i] for i in ids if i in rows], fields)
+    
+    def get_multi_rows(
+        self,
+        db: Session,
+        *,
+        fields: List[str],
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """同 get_multi，只查询 fields 对应的列，返回字典"""
+        stmt = select(*self._row_columns(fields))
+        if after_id is not None:
+            stmt = stmt.where(Candidate.id > after_id)
+        rows = list(db.execute(stmt.order_by(Candidate.id).offset(skip).limit(limit)).tuples())
+        return self._to_dicts(db, rows, fields)
+    
+    def _load_page(self, db: Session, ids: List[int], fields: Optional[List[str]]) -> List[Any]:
+        if fields:
+            return self.get_many_rows(db, ids=ids, fields=fields)
+        return self.get_many(db, ids=ids)
     
     def update(
         self, 
@@ -44,19 +186,48 @@ class CandidateCRUD:
         update_data = obj_in.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_obj, field, value)
+        db_obj.version = (db_obj.version or 0) + 1
         db.add(db_obj)
+        db.flush()
+        if "skills" in update_data:
+            self._sync_skills(db, db_obj.id, db_obj.skills)
+        candidate_fulltext.index_candidate(db, db_obj.id)
+        self.match_saved_searches(db, [db_obj.id])
+        change_log_crud.record(
+            db,
+            entity=ENTITY_CANDIDATE,
+            operation=OPERATION_UPDATE,
+            versions=[(db_obj.id, db_obj.version)],
+            changed_fields=list(update_data)
+        )
         db.commit()
         db.refresh(db_obj)
+        facet_index.update(db_obj)
+        query_cache.invalidate()
         return db_obj
     
     def delete(self, db: Session, *, id: int) -> Candidate:
         """删除候选人"""
         obj = db.query(Candidate).get(id)
+        # 简历随候选人级联删除，一并记录
+        resume_versions = [(resume.id, resume.version) for resume in obj.resumes]
+        released = stored_file_crud.release(db, [resume.content_hash for resume in obj.resumes])
         db.delete(obj)
+        db.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id == id))
+        db.execute(delete(SavedSearchMatch).where(SavedSearchMatch.candidate_id == id))
+        candidate_fulltext.remove_candidate(db, id)
+        change_log_crud.record(db, entity=ENTITY_RESUME, operation=OPERATION_DELETE, versions=resume_versions)
+        change_log_crud.record(
+            db, entity=ENTITY_CANDIDATE, operation=OPERATION_DELETE, versions=[(obj.id, obj.version)]
+        )
         db.commit()
+        stored_file_crud.purge(db, released)
+        facet_index.remove(id)
+        query_cache.invalidate()
+        semantic_search.remove_candidate(id)
         return obj
     
-    def filter_candidates(
+    def _filter_query(
         self,
         db: Session,
         *,
@@ -65,24 +236,43 @@ class CandidateCRUD:
         min_experience: Optional[int] = None,
         max_experience: Optional[int] = None,
         skills: Optional[List[str]] = None,
+        skill_match: str = "all",
         status: Optional[str] = None,
-        skip: int = 0,
-        limit: int = 100
-    ) -> List[Candidate]:
-        """筛选候选人"""
+        tags: Optional[List[str]] = None
+    ):
+        """构建筛选查询（SQL路径），返回 (查询, 全文索引匹配子查询或None)
+        
+        关键词全部走全文索引时查询与匹配子查询 (candidate_id, rank) 连接，
+        调用方可以按 rank 排序；否则第二项为None。
+        """
         query = db.query(Candidate)
+        ranked_match = None
         
-        # 关键词筛选（姓名、职位、公司）
+        # 关键词筛选：长度足够的词走FTS5全文索引（含简历原文，按bm25排序），
+        # 短词或索引不可用时回退到姓名、职位、公司的LIKE匹配
         if keywords:
+            indexed_terms, like_terms = candidate_fulltext.split_terms(keywords)
             keyword_filters = []
-            for keyword in keywords:
+            for keyword in like_terms:
                 keyword_filter = or_(
                     Candidate.name.contains(keyword),
                     Candidate.current_position.contains(keyword),
                     Candidate.current_company.contains(keyword)
                 )
                 keyword_filters.append(keyword_filter)
-            query = query.filter(or_(*keyword_filters))
+            
+            if indexed_terms:
+                fts_match = candidate_fulltext.match_subquery(indexed_terms)
+                if keyword_filters:
+                    keyword_filters.append(
+                        Candidate.id.in_(select(fts_match.c.candidate_id))
+                    )
+                else:
+                    query = query.join(fts_match, Candidate.id == fts_match.c.candidate_id)
+                    ranked_match = fts_match
+            
+            if keyword_filters:
+                query = query.filter(or_(*keyword_filters))
         
         # 教育背景筛选
         if education:
@@ -94,18 +284,548 @@ class CandidateCRUD:
         if max_experience is not None:
             query = query.filter(Candidate.experience_years <= max_experience)
         
-        # 技能筛选
-        if skills:
-            for skill in skills:
-                # 使用JSON_EXTRACT函数或者类似的SQL查询
-                # 但SQLite对JSON支持有限，改用字符串包含检查
-                query = query.filter(Candidate.skills.op('LIKE')(f'%"{skill}"%'))
+        # 与全文索引连接时由FTS逐行驱动，ID加0让IN子查询只物化一次再逐行判断；
+        # 否则SQLite会按IN列表探测主键，每个命中都要遍历一遍整个列表
+        member_id = Candidate.id if ranked_match is None else Candidate.id + 0
+        
+        # 技能筛选：在candidate_skills的(skill_normalized, candidate_id)索引上
+        # 求交集（all）或并集（any），不再扫描JSON列
+        normalized_skills = self._normalize_skills(skills)
+        if normalized_skills:
+            if skill_match == "any":
+                skill_ids = select(CandidateSkill.candidate_id).where(
+                    CandidateSkill.skill_normalized.in_(normalized_skills)
+                )
+            else:
+                skill_ids = intersect(*[
+                    select(CandidateSkill.candidate_id).where(
+                        CandidateSkill.skill_normalized == skill
+                    )
+                    for skill in normalized_skills
+                ])
+            query = query.filter(member_id.in_(skill_ids))
         
         # 状态筛选
         if status:
             query = query.filter(Candidate.status == status)
         
-        return query.offset(skip).limit(limit).all()
+        # 标签筛选：含任一标签即匹配
+        normalized_tags = {normalize_tag(tag) for tag in tags or [] if tag and tag.strip()}
+        if normalized_tags:
+            query = query.filter(member_id.in_(
+                select(CandidateTag.candidate_id).where(CandidateTag.tag.in_(sorted(normalized_tags)))
+            ))
+        
+        return query, ranked_match
+    
+    def _id_subquery(self, query):
+        """筛选查询对应的候选人ID子查询，没有任何条件时返回None"""
+        if query.whereclause is None:
+            return None
+        return select(query.with_entities(Candidate.id).order_by(None).subquery().c.id)
+    
+    def filter_candidates(
+        self,
+        db: Session,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        **filters: Any
+    ) -> List[Candidate]:
+        """筛选候选人"""
+        return self.filter_page(db, skip=skip, limit=limit, **filters).candidates
+    
+    def filter_page(
+        self,
+        db: Session,
+        *,
+        keywords: Optional[List[str]] = None,
+        education: Optional[str] = None,
+        min_experience: Optional[int] = None,
+        max_experience: Optional[int] = None,
+        skills: Optional[List[str]] = None,
+        skill_match: str = "all",
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        fuzzy: bool = False,
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Dict[str, Any]] = None,
+        fields: Optional[List[str]] = None
+    ) -> FilterPage:
+        """筛选候选人并返回一页结果、下一页游标和总数
+        
+        结果按ID升序；关键词走全文索引时按 (bm25, ID) 排序，命中超过
+        RANKED_MATCH_LIMIT 时按ID排序、总数只统计到该值；模糊模式下按 (相似度降序, ID) 排序，
+        召回超过上限时只在重合最多的一批候选人中排序。
+        after 为上一页返回的游标位置，深翻页与首页开销相同。
+        指定 fields 时只查询这些列，结果为字典而不是ORM对象。
+        """
+        after_id = after["id"] if after else None
+        
+        # 模糊模式：关键词在姓名、职位、公司上做三元组相似度匹配，其余条件在召回时一并过滤
+        if fuzzy and keywords and candidate_fulltext.available:
+            query, _ = self._filter_query(
+                db,
+                education=education,
+                min_experience=min_experience,
+                max_experience=max_experience,
+                skills=skills,
+                skill_match=skill_match,
+                status=status,
+                tags=tags
+            )
+            matches = candidate_fulltext.fuzzy_scores(
+                db, keywords, threshold=fuzzy_threshold, candidate_ids=self._id_subquery(query)
+            )
+            scores = matches.scores
+            ordered = sorted(scores, key=lambda i: (-scores[i], i))
+            if after_id is not None:
+                if "score" not in after:
+                    raise ValueError("分页游标与当前排序方式不匹配")
+                position = (-after["score"], after_id)
+                ordered = [i for i in ordered if (-scores[i], i) > position]
+            ids = ordered[skip:skip + limit]
+            next_cursor = {"score": scores[ids[-1]], "id": ids[-1]} if len(ids) == limit else None
+            return FilterPage(self._load_page(db, ids, fields), next_cursor, len(scores), matches.capped)
+        
+        # 不含关键词、标签的结构化筛选优先由内存位图索引回答，SQL只取当前页
+        if not tags and facet_index.can_answer(
+            keywords=keywords,
+            education=education,
+            min_experience=min_experience,
+            max_experience=max_experience
+        ):
+            matched = facet_index.match(
+                status=status,
+                skills=skills,
+                skill_match=skill_match,
+                min_experience=min_experience,
+                max_experience=max_experience,
+                education=education
+            )
+            ids = matched.slice(skip, limit, after=after_id)
+            next_cursor = {"id": ids[-1]} if len(ids) == limit else None
+            return FilterPage(self._load_page(db, ids, fields), next_cursor, len(matched))
+        
+        query, ranked_match = self._filter_query(
+            db,
+            keywords=keywords,
+            education=education,
+            min_experience=min_experience,
+            max_experience=max_experience,
+            skills=skills,
+            skill_match=skill_match,
+            status=status,
+            tags=tags
+        )
+        
+        columns = self._row_columns(fields) if fields else None
+        if ranked_match is None:
+            total_count = query.order_by(None).with_entities(func.count(Candidate.id)).scalar()
+            if after_id is not None:
+                query = query.filter(Candidate.id > after_id)
+            if columns:
+                query = query.with_entities(*columns)
+            candidates = query.order_by(Candidate.id).offset(skip).limit(limit).all()
+            next_cursor = None
+            if len(candidates) == limit:
+                next_cursor = {"id": candidates[-1][0] if columns else candidates[-1].id}
+            if columns:
+                candidates = self._to_dicts(db, candidates, fields)
+            return FilterPage(candidates, next_cursor, total_count)
+        
+        # 关键词走全文索引：bm25需要为每个命中计算得分，总数只统计到 RANKED_MATCH_LIMIT，
+        # 未超过时按 (bm25, ID) 排序；宽泛的词按索引的rowid顺序只读到当前页，游标中rank为None
+        total_count = db.execute(
+            select(func.count()).select_from(
+                query.order_by(None).with_entities(Candidate.id).limit(RANKED_MATCH_LIMIT + 1).subquery()
+            )
+        ).scalar()
+        total_count_capped = total_count > RANKED_MATCH_LIMIT
+        if total_count_capped:
+            total_count = RANKED_MATCH_LIMIT
+        
+        if after_id is not None:
+            if "rank" not in after:
+                raise ValueError("分页游标与当前排序方式不匹配")
+            ranked = after["rank"] is not None
+        else:
+            ranked = not total_count_capped
+        if ranked:
+            sort_column = ranked_match.c.rank
+            sort_key = (sort_column, Candidate.id)
+            if after_id is not None:
+                query = query.filter(or_(
+                    sort_column > after["rank"],
+                    and_(sort_column == after["rank"], Candidate.id > after_id)
+                ))
+        else:
+            sort_column = ranked_match.c.candidate_id
+            sort_key = (sort_column,)
+            if after_id is not None:
+                query = query.filter(sort_column > after_id)
+        
+        rows = query.with_entities(*(columns or [Candidate]), sort_column).order_by(*sort_key).offset(skip).limit(limit).all()
+        if columns:
+            candidates = self._to_dicts(db, [row[:-1] for row in rows], fields)
+            last_id = rows[-1][0] if rows else None
+        else:
+            candidates = [candidate for candidate, _ in rows]
+            last_id = rows[-1][0].id if rows else None
+        next_cursor = None
+        if len(rows) == limit:
+            next_cursor = {"rank": rows[-1][-1] if ranked else None, "id": last_id}
+        return FilterPage(candidates, next_cursor, total_count, total_count_capped)
+    
+    def matching_ids(
+        self,
+        db: Session,
+        *,
+        candidate_ids: Optional[List[int]] = None,
+        keywords: Optional[List[str]] = None,
+        fuzzy: bool = False,
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        **filters: Any
+    ) -> List[int]:
+        """返回满足筛选条件的全部候选人ID（升序），candidate_ids 限定只检查这些候选人"""
+        if fuzzy and keywords and candidate_fulltext.available:
+            query, _ = self._filter_query(db, **filters)
+            if candidate_ids is None:
+                matches = candidate_fulltext.fuzzy_scores(
+                    db, keywords, threshold=fuzzy_threshold, candidate_ids=self._id_subquery(query),
+                    recall_limit=None
+                )
+                return sorted(matches.scores)
+            # 少量候选人直接按字段计算相似度，不依赖索引召回的候选数量上限
+            rows = query.filter(Candidate.id.in_(candidate_ids)).with_entities(
+                Candidate.id, Candidate.name, Candidate.current_position, Candidate.current_company
+            ).order_by(Candidate.id)
+            return [
+                row[0] for row in rows
+                if candidate_fulltext.fuzzy_score(keywords, row[1:], fuzzy_threshold) >= fuzzy_threshold
+            ]
+        
+        query, _ = self._filter_query(db, keywords=keywords, **filters)
+        if candidate_ids is not None:
+            query = query.filter(Candidate.id.in_(candidate_ids))
+        return [row[0] for row in query.with_entities(Candidate.id).order_by(Candidate.id)]
+    
+    def match_saved_searches(self, db: Session, candidate_ids: List[int]) -> None:
+        """用候选人的最新数据逐个检查保存的搜索，增量维护匹配结果（不提交事务）
+        
+        每个保存的搜索对这批候选人只执行一次筛选，批量变更时开销不随候选人数线性增长。
+        """
+        searches = db.query(SavedSearch.id, SavedSearch.filters).all()
+        if not searches or not candidate_ids:
+            return
+        
+        current = set(db.execute(
+            select(SavedSearchMatch.saved_search_id, SavedSearchMatch.candidate_id)
+            .where(SavedSearchMatch.candidate_id.in_(candidate_ids))
+        ).tuples())
+        now = datetime.utcnow()
+        added, removed = [], []
+        for search_id, filters in searches:
+            matched = set(self.matching_ids(db, candidate_ids=candidate_ids, **filters))
+            for candidate_id in candidate_ids:
+                pair = (search_id, candidate_id)
+                if candidate_id in matched and pair not in current:
+                    added.append({"saved_search_id": search_id, "candidate_id": candidate_id, "matched_at": now})
+                elif candidate_id not in matched and pair in current:
+                    removed.append(pair)
+        
+        if added:
+            db.execute(insert(SavedSearchMatch), added)
+        for search_id, candidate_id in removed:
+            db.execute(delete(SavedSearchMatch).where(
+                SavedSearchMatch.saved_search_id == search_id,
+                SavedSearchMatch.candidate_id == candidate_id
+            ))
+    
+    def existing_ids(self, db: Session, ids: List[int]) -> List[int]:
+        """返回给定ID中实际存在的候选人ID（去重，保持原顺序）"""
+        found = set(db.scalars(select(Candidate.id).where(Candidate.id.in_(set(ids)))))
+        return [i for i in dict.fromkeys(ids) if i in found]
+    
+    def _refresh_facets(self, db: Session, ids: List[int]) -> None:
+        """批量写入提交后按最新数据更新位图索引"""
+        if facet_index.ready:
+            for candidate in self.get_many(db, ids=ids):
+                facet_index.update(candidate)
+    
+    def _bump_versions(self, db: Session, ids: List[int], **values: Any) -> List[Tuple[int, int]]:
+        """一条UPDATE写入 values 并把版本号加一，返回 (候选人ID, 新版本号)"""
+        db.execute(
+            update(Candidate).where(Candidate.id.in_(ids))
+            .values(version=Candidate.version + 1, updated_at=datetime.utcnow(), **values)
+        )
+        return list(db.execute(
+            select(Candidate.id, Candidate.version).where(Candidate.id.in_(ids)).order_by(Candidate.id)
+        ).tuples())
+    
+    def bulk_update_status(
+        self,
+        db: Session,
+        *,
+        ids: List[int],
+        status: str,
+        notes: Optional[str] = None
+    ) -> List[int]:
+        """批量更新状态（一条UPDATE，单个事务），返回实际更新的候选人ID"""
+        ids = self.existing_ids(db, ids)
+        if not ids:
+            return []
+        values = {"status": status}
+        if notes:
+            values["notes"] = notes
+        versions = self._bump_versions(db, ids, **values)
+        self.match_saved_searches(db, ids)
+        change_log_crud.record(
+            db, entity=ENTITY_CANDIDATE, operation=OPERATION_UPDATE, versions=versions, changed_fields=list(values)
+        )
+        db.commit()
+        # 会话中已加载的候选人需要重新读取
+        db.expire_all()
+        self._refresh_facets(db, ids)
+        query_cache.invalidate()
+        return ids
+    
+    def bulk_tag(
+        self,
+        db: Session,
+        *,
+        ids: List[int],
+        add: Optional[List[str]] = None,
+        remove: Optional[List[str]] = None
+    ) -> List[int]:
+        """批量添加/移除标签（单个事务，先移除后添加），返回实际处理的候选人ID"""
+        ids = self.existing_ids(db, ids)
+        add_tags = sorted({normalize_tag(tag) for tag in add or [] if tag and tag.strip()})
+        remove_tags = sorted({normalize_tag(tag) for tag in remove or [] if tag and tag.strip()})
+        if not ids or not (add_tags or remove_tags):
+            return ids
+        
+        if remove_tags:
+            db.execute(delete(CandidateTag).where(
+                CandidateTag.candidate_id.in_(ids), CandidateTag.tag.in_(remove_tags)
+            ))
+        if add_tags:
+            existing = set(db.execute(
+                select(CandidateTag.candidate_id, CandidateTag.tag)
+                .where(CandidateTag.candidate_id.in_(ids), CandidateTag.tag.in_(add_tags))
+            ).tuples())
+            now = datetime.utcnow()
+            entries = [
+                {"candidate_id": candidate_id, "tag": tag, "created_at": now}
+                for candidate_id in ids for tag in add_tags
+                if (candidate_id, tag) not in existing
+            ]
+            if entries:
+                db.execute(insert(CandidateTag), entries)
+        versions = self._bump_versions(db, ids)
+        self.match_saved_searches(db, ids)
+        change_log_crud.record(
+            db, entity=ENTITY_CANDIDATE, operation=OPERATION_UPDATE, versions=versions, changed_fields=["tags"]
+        )
+        db.commit()
+        db.expire_all()
+        query_cache.invalidate()
+        return ids
+    
+    def bulk_delete(self, db: Session, *, ids: List[int]) -> List[int]:
+        """批量删除候选人及其简历、技能、标签、索引（单个事务），返回实际删除的候选人ID"""
+        ids = self.existing_ids(db, ids)
+        if not ids:
+            return []
+        resume_rows = db.execute(
+            select(Resume.id, Resume.version, Resume.content_hash)
+            .where(Resume.candidate_id.in_(ids)).order_by(Resume.id)
+        ).all()
+        resume_versions = [(row.id, row.version) for row in resume_rows]
+        released = stored_file_crud.release(db, [row.content_hash for row in resume_rows])
+        candidate_versions = list(db.execute(
+            select(Candidate.id, Candidate.version).where(Candidate.id.in_(ids)).order_by(Candidate.id)
+        ).tuples())
+        resume_ids = select(Resume.id).where(Resume.candidate_id.in_(ids))
+        db.execute(delete(ResumeContent).where(ResumeContent.resume_id.in_(resume_ids)))
+        db.execute(delete(Resume).where(Resume.candidate_id.in_(ids)))
+        db.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id.in_(ids)))
+        db.execute(delete(CandidateTag).where(CandidateTag.candidate_id.in_(ids)))
+        db.execute(delete(SavedSearchMatch).where(SavedSearchMatch.candidate_id.in_(ids)))
+        candidate_fulltext.remove_candidates(db, ids)
+        db.execute(delete(Candidate).where(Candidate.id.in_(ids)))
+        change_log_crud.record(db, entity=ENTITY_RESUME, operation=OPERATION_DELETE, versions=resume_versions)
+        change_log_crud.record(db, entity=ENTITY_CANDIDATE, operation=OPERATION_DELETE, versions=candidate_versions)
+        db.commit()
+        # 已删除的对象不能留在会话中
+        db.expunge_all()
+        stored_file_crud.purge(db, released)
+        for candidate_id in ids:
+            facet_index.remove(candidate_id)
+            semantic_search.remove_candidate(candidate_id)
+        query_cache.invalidate()
+        return ids
+    
+    def facet_counts(
+        self,
+        db: Session,
+        *,
+        skill_limit: int = 50,
+        **filters: Any
+    ) -> Dict[str, Any]:
+        """用SQL聚合统计筛选结果在各分面取值上的人数（位图索引不可用时使用）"""
+        matched_ids = select(
+            self._filter_query(db, **filters)[0]
+            .with_entities(Candidate.id)
+            .order_by(None)
+            .subquery()
+            .c.id
+        )
+        
+        total = db.query(func.count(Candidate.id)).filter(Candidate.id.in_(matched_ids)).scalar()
+        
+        status_rows = (
+            db.query(Candidate.status, func.count(Candidate.id))
+            .filter(Candidate.id.in_(matched_ids))
+            .group_by(Candidate.status)
+            .order_by(func.count(Candidate.id).desc())
+            .all()
+        )
+        
+        skill_count = func.count(CandidateSkill.candidate_id)
+        skill_rows = (
+            db.query(CandidateSkill.skill_normalized, skill_count)
+            .filter(CandidateSkill.candidate_id.in_(matched_ids))
+            .group_by(CandidateSkill.skill_normalized)
+            .order_by(skill_count.desc(), CandidateSkill.skill_normalized)
+            .limit(skill_limit)
+            .all()
+        )
+        
+        # 年限区间与教育层次在一次扫描中用条件求和统计
+        experience_sums = []
+        for bucket_range in EXPERIENCE_RANGES:
+            condition = Candidate.experience_years >= bucket_range["min"]
+            if bucket_range["max"] is not None:
+                condition = and_(condition, Candidate.experience_years < bucket_range["max"])
+            experience_sums.append(func.sum(case((condition, 1), else_=0)))
+        education_sums = [
+            func.sum(case((Candidate.education.contains(level), 1), else_=0))
+            for level in EDUCATION_LEVELS
+        ]
+        sums = (
+            db.query(*experience_sums, *education_sums)
+            .filter(Candidate.id.in_(matched_ids))
+            .one()
+        )
+        
+        return {
+            "total": total,
+            "status": [
+                {"value": value, "count": count} for value, count in status_rows if value
+            ],
+            "skills": [{"value": value, "count": count} for value, count in skill_rows],
+            "experience": [
+                {**bucket_range, "count": sums[i] or 0}
+                for i, bucket_range in enumerate(EXPERIENCE_RANGES)
+            ],
+            "education": [
+                {"value": level, "count": sums[len(EXPERIENCE_RANGES) + i] or 0}
+                for i, level in enumerate(EDUCATION_LEVELS)
+            ]
+        }
 
 # 创建CRUD实例
 candidate_crud = CandidateCRUD()
+
+class AsyncCandidateCRUD:
+    """候选人CRUD操作（异步会话）
+    
+    简单读取直接执行异步查询；筛选、部分字段列表等CPU密集的读取复用 CandidateCRUD 的实现，
+    在线程池中用独立的同步会话执行（run_read）。写入需要同步维护技能表、全文索引、保存的搜索等，
+    经由单写者队列执行；队列未启用时在异步会话的 run_sync 中执行，此时写入在事件循环线程上运行。
+    """
+    
+    def __init__(self, sync_crud: CandidateCRUD):
+        self.sync = sync_crud
+    
+    async def create(self, db: AsyncSession, *, obj_in: CandidateCreate) -> Candidate:
+        """创建候选人"""
+        return await write_queue.run_write(db, lambda session: self.sync.create(session, obj_in=obj_in))
+    
+    async def get(self, db: AsyncSession, id: int) -> Optional[Candidate]:
+        """根据ID获取候选人"""
+        return await db.scalar(select(Candidate).where(Candidate.id == id))
+    
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[Candidate]:
+        """根据邮箱获取候选人"""
+        return await db.scalar(select(Candidate).where(Candidate.email == email).limit(1))
+    
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> List[Candidate]:
+        """获取候选人列表（按ID升序，after_id 为键集分页游标）"""
+        stmt = select(Candidate)
+        if after_id is not None:
+            stmt = stmt.where(Candidate.id > after_id)
+        result = await db.scalars(stmt.order_by(Candidate.id).offset(skip).limit(limit))
+        return list(result)
+    
+    async def get_multi_rows(self, db: AsyncSession, **kwargs: Any) -> List[Dict[str, Any]]:
+        """获取候选人列表的部分字段（参数同 CandidateCRUD.get_multi_rows）"""
+        return await run_read(lambda session: self.sync.get_multi_rows(session, **kwargs))
+    
+    async def count(self, db: AsyncSession) -> int:
+        """候选人总数，位图索引可用时直接从索引读取"""
+        if facet_index.ready:
+            return facet_index.count()
+        return await db.scalar(select(func.count(Candidate.id)))
+    
+    async def get_many(self, db: AsyncSession, *, ids: List[int]) -> List[Candidate]:
+        """按给定ID顺序批量获取候选人"""
+        if not ids:
+            return []
+        result = await db.scalars(select(Candidate).where(Candidate.id.in_(ids)))
+        candidates = {c.id: c for c in result}
+        return [candidates[i] for i in ids if i in candidates]
+    
+    async def update(self, db: AsyncSession, *, db_obj: Candidate, obj_in: CandidateUpdate) -> Candidate:
+        """更新候选人信息"""
+        candidate_id = db_obj.id
+        return await write_queue.run_write(db, lambda session: self.sync.update(
+            session, db_obj=session.get(Candidate, candidate_id), obj_in=obj_in
+        ))
+    
+    async def delete(self, db: AsyncSession, *, id: int) -> Candidate:
+        """删除候选人"""
+        return await write_queue.run_write(db, lambda session: self.sync.delete(session, id=id))
+    
+    async def existing_ids(self, db: AsyncSession, ids: List[int]) -> List[int]:
+        """返回给定ID中实际存在的候选人ID（去重，保持原顺序）"""
+        found = set(await db.scalars(select(Candidate.id).where(Candidate.id.in_(set(ids)))))
+        return [i for i in dict.fromkeys(ids) if i in found]
+    
+    async def bulk_update_status(self, db: AsyncSession, **kwargs: Any) -> List[int]:
+        """批量更新状态（参数同 CandidateCRUD.bulk_update_status）"""
+        return await write_queue.run_write(db, lambda session: self.sync.bulk_update_status(session, **kwargs))
+    
+    async def bulk_tag(self, db: AsyncSession, **kwargs: Any) -> List[int]:
+        """批量添加/移除标签（参数同 CandidateCRUD.bulk_tag）"""
+        return await write_queue.run_write(db, lambda session: self.sync.bulk_tag(session, **kwargs))
+    
+    async def bulk_delete(self, db: AsyncSession, *, ids: List[int]) -> List[int]:
+        """批量删除候选人"""
+        return await write_queue.run_write(db, lambda session: self.sync.bulk_delete(session, ids=ids))
+    
+    async def filter_page(self, db: AsyncSession, **kwargs: Any) -> FilterPage:
+        """筛选候选人并返回一页结果（参数同 CandidateCRUD.filter_page）"""
+        return await run_read(lambda session: self.sync.filter_page(session, **kwargs))
+
+async_candidate_crud = AsyncCandidateCRUD(candidate_crud)
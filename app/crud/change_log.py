@@ -0,0 +1,95 @@
+from sqlalchemy import select, func, text
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+from app.models.change_log import ChangeLogEntry
+
+# PostgreSQL上写变更日志前获取的事务级咨询锁
+_CHANGE_LOG_LOCK_KEY = 0x48524348
+
+class ChangeLogCRUD:
+    """变更日志操作
+    
+    record 由各CRUD在业务写入之后、commit之前调用，日志与数据同时提交或回滚。
+    下游用自增ID作游标增量消费，因此ID必须按提交顺序递增：SQLite只有一个写事务，
+    天然满足；PostgreSQL上写日志前获取事务级咨询锁，使写日志的事务依次提交，
+    避免先分配ID的事务后提交、被已越过该ID的消费者漏掉。
+    """
+    
+    def _lock(self, db: Session) -> None:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CHANGE_LOG_LOCK_KEY})
+    
+    def record(
+        self,
+        db: Session,
+        *,
+        entity: str,
+        operation: str,
+        versions: Iterable[Tuple[int, int]],
+        changed_fields: Optional[List[str]] = None
+    ) -> None:
+        """记录一批同类变更，versions 为 (实体ID, 版本号)（不提交事务）"""
+        now = datetime.utcnow()
+        entries = [
+            ChangeLogEntry(
+                entity=entity,
+                entity_id=entity_id,
+                operation=operation,
+                version=version,
+                changed_fields=sorted(changed_fields) if changed_fields else None,
+                changed_at=now
+            )
+            for entity_id, version in versions
+        ]
+        if not entries:
+            return
+        self._lock(db)
+        db.add_all(entries)
+        db.flush()
+    
+    def get_changes(
+        self,
+        db: Session,
+        *,
+        after_id: int = 0,
+        limit: int = 100,
+        entity: Optional[str] = None
+    ) -> List[ChangeLogEntry]:
+        """按ID升序返回 after_id 之后的变更"""
+        query = db.query(ChangeLogEntry).filter(ChangeLogEntry.id > after_id)
+        if entity:
+            query = query.filter(ChangeLogEntry.entity == entity)
+        return query.order_by(ChangeLogEntry.id).limit(limit).all()
+    
+    def latest_id(self, db: Session) -> int:
+        """当前最新的变更ID，没有变更时为0"""
+        return db.query(func.max(ChangeLogEntry.id)).scalar() or 0
+
+# 创建CRUD实例
+change_log_crud = ChangeLogCRUD()
+
+class AsyncChangeLogCRUD:
+    """变更日志读取（异步会话）"""
+    
+    async def get_changes(
+        self,
+        db: AsyncSession,
+        *,
+        after_id: int = 0,
+        limit: int = 100,
+        entity: Optional[str] = None
+    ) -> List[ChangeLogEntry]:
+        """按ID升序返回 after_id 之后的变更"""
+        stmt = select(ChangeLogEntry).where(ChangeLogEntry.id > after_id)
+        if entity:
+            stmt = stmt.where(ChangeLogEntry.entity == entity)
+        result = await db.scalars(stmt.order_by(ChangeLogEntry.id).limit(limit))
+        return list(result)
+    
+    async def latest_id(self, db: AsyncSession) -> int:
+        """当前最新的变更ID，没有变更时为0"""
+        return await db.scalar(select(func.max(ChangeLogEntry.id))) or 0
+
+async_change_log_crud = AsyncChangeLogCRUD()
@@ -1,6 +1,16 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.resume import Resume
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session, undefer
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, List, Optional, Set, Tuple
+from datetime import datetime
+from app.crud.candidate import candidate_crud
+from app.crud.change_log import change_log_crud
+from app.crud.stored_file import stored_file_crud
+from app.db.fulltext import candidate_fulltext
+from app.db.write_queue import write_queue
+from app.models.change_log import ENTITY_RESUME, OPERATION_CREATE, OPERATION_UPDATE
+from app.models.resume import Resume, ResumeContent
+from app.services.query_cache import query_cache
 
 class ResumeCRUD:
     """简历CRUD操作"""
@@ -13,17 +23,25 @@ class ResumeCRUD:
         file_path: str,
         file_size: int,
         file_type: str,
-        candidate_id: int
+        candidate_id: int,
+        content_hash: Optional[str] = None
     ) -> Resume:
-        """创建简历记录"""
+        """创建简历记录，content_hash 为内容存储中的文件哈希（同一事务中登记引用）"""
         db_obj = Resume(
             filename=filename,
             file_path=file_path,
             file_size=file_size,
             file_type=file_type,
-            candidate_id=candidate_id
+            candidate_id=candidate_id,
+            content_hash=content_hash
         )
         db.add(db_obj)
+        if content_hash:
+            stored_file_crud.acquire(db, content_hash=content_hash, size=file_size)
+        db.flush()
+        change_log_crud.record(
+            db, entity=ENTITY_RESUME, operation=OPERATION_CREATE, versions=[(db_obj.id, db_obj.version)]
+        )
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -36,6 +54,28 @@ class ResumeCRUD:
         """获取候选人的所有简历"""
         return db.query(Resume).filter(Resume.candidate_id == candidate_id).all()
     
+    def get_content(self, db: Session, resume_id: int) -> Optional[ResumeContent]:
+        """获取简历提取内容（原文和结构化数据一并加载）"""
+        return (
+            db.query(ResumeContent)
+            .options(undefer(ResumeContent.compressed_text), undefer(ResumeContent.extracted_data))
+            .filter(ResumeContent.resume_id == resume_id)
+            .first()
+        )
+    
+    @staticmethod
+    def _changed_fields(
+        raw_text: Optional[str], extracted_data: Optional[dict], error_message: Optional[str]
+    ) -> List[str]:
+        fields = ["processing_status"]
+        if raw_text:
+            fields.extend(["raw_text", "sections"])
+        if extracted_data:
+            fields.append("extracted_data")
+        if error_message:
+            fields.append("error_message")
+        return fields
+    
     def update_processing_status(
         self,
         db: Session,
@@ -44,23 +84,146 @@ class ResumeCRUD:
         status: str,
         raw_text: Optional[str] = None,
         extracted_data: Optional[dict] = None,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        sections: Optional[List[dict]] = None
     ) -> Optional[Resume]:
-        """更新简历处理状态"""
+        """更新简历处理状态，sections 为原文的分段偏移（随原文一起写入）"""
         resume = db.query(Resume).filter(Resume.id == resume_id).first()
         if resume:
             resume.processing_status = status
-            if raw_text:
-                resume.raw_text = raw_text
-            if extracted_data:
-                resume.extracted_data = extracted_data
+            if raw_text or extracted_data:
+                content = db.get(ResumeContent, resume_id) or ResumeContent(resume_id=resume_id)
+                if raw_text:
+                    content.raw_text = raw_text
+                    content.sections = sections
+                if extracted_data:
+                    content.extracted_data = extracted_data
+                db.add(content)
             if error_message:
                 resume.error_message = error_message
+            resume.version = (resume.version or 0) + 1
             
             db.add(resume)
+            db.flush()
+            if raw_text:
+                # 简历原文变化后同步刷新候选人的全文索引文档和保存的搜索结果
+                candidate_fulltext.index_candidate(db, resume.candidate_id)
+                candidate_crud.match_saved_searches(db, [resume.candidate_id])
+            change_log_crud.record(
+                db,
+                entity=ENTITY_RESUME,
+                operation=OPERATION_UPDATE,
+                versions=[(resume.id, resume.version)],
+                changed_fields=self._changed_fields(raw_text, extracted_data, error_message)
+            )
             db.commit()
             db.refresh(resume)
+            if raw_text:
+                # 关键词搜索覆盖简历原文
+                query_cache.invalidate()
         return resume
+    
+    def set_file_missing(self, db: Session, *, file_paths: Iterable[str], missing: bool) -> List[int]:
+        """按存储路径标记（或清除）文件缺失，只改动状态实际变化的简历，返回其ID"""
+        file_paths = list(file_paths)
+        if not file_paths:
+            return []
+        flag = Resume.file_missing_at.is_(None) if missing else Resume.file_missing_at.isnot(None)
+        ids = list(db.scalars(
+            select(Resume.id).where(Resume.file_path.in_(file_paths), flag).order_by(Resume.id)
+        ))
+        if not ids:
+            return []
+        db.execute(
+            update(Resume).where(Resume.id.in_(ids))
+            .values(file_missing_at=datetime.utcnow() if missing else None, version=Resume.version + 1)
+        )
+        versions = list(db.execute(
+            select(Resume.id, Resume.version).where(Resume.id.in_(ids)).order_by(Resume.id)
+        ).tuples())
+        change_log_crud.record(
+            db, entity=ENTITY_RESUME, operation=OPERATION_UPDATE, versions=versions, changed_fields=["file_missing_at"]
+        )
+        db.commit()
+        return ids
 
 # 创建CRUD实例
 resume_crud = ResumeCRUD()
+
+class AsyncResumeCRUD:
+    """简历CRUD操作（异步会话），写入经由单写者队列复用 ResumeCRUD"""
+    
+    def __init__(self, sync_crud: ResumeCRUD):
+        self.sync = sync_crud
+    
+    async def create(self, db: AsyncSession, **kwargs) -> Resume:
+        """创建简历记录（参数同 ResumeCRUD.create）"""
+        return await write_queue.run_write(db, lambda session: self.sync.create(session, **kwargs))
+    
+    async def get(self, db: AsyncSession, id: int) -> Optional[Resume]:
+        """根据ID获取简历"""
+        return await db.scalar(select(Resume).where(Resume.id == id))
+    
+    async def get_by_candidate(self, db: AsyncSession, candidate_id: int) -> List[Resume]:
+        """获取候选人的所有简历"""
+        result = await db.scalars(select(Resume).where(Resume.candidate_id == candidate_id))
+        return list(result)
+    
+    async def get_content(self, db: AsyncSession, resume_id: int) -> Optional[ResumeContent]:
+        """获取简历提取内容（原文和结构化数据一并加载）"""
+        return await db.scalar(
+            select(ResumeContent)
+            .options(undefer(ResumeContent.compressed_text), undefer(ResumeContent.extracted_data))
+            .where(ResumeContent.resume_id == resume_id)
+        )
+    
+    async def update_processing_status(self, db: AsyncSession, **kwargs) -> Optional[Resume]:
+        """更新简历处理状态（参数同 ResumeCRUD.update_processing_status）"""
+        return await write_queue.run_write(
+            db, lambda session: self.sync.update_processing_status(session, **kwargs)
+        )
+    
+    async def set_file_missing(self, db: AsyncSession, **kwargs) -> List[int]:
+        """标记或清除文件缺失（参数同 ResumeCRUD.set_file_missing）"""
+        return await write_queue.run_write(db, lambda session: self.sync.set_file_missing(session, **kwargs))
+    
+    async def content_hashes_after(self, db: AsyncSession, after: str, limit: int) -> List[str]:
+        """按哈希顺序分批读取被引用的内容哈希（去重，走 ix_resumes_content_hash）"""
+        result = await db.scalars(
+            select(Resume.content_hash)
+            .where(Resume.content_hash.isnot(None), Resume.content_hash > after)
+            .group_by(Resume.content_hash)
+            .order_by(Resume.content_hash)
+            .limit(limit)
+        )
+        return list(result)
+    
+    async def referenced_hashes(self, db: AsyncSession, content_hashes: List[str]) -> Set[str]:
+        """给定哈希中仍被简历引用的哈希"""
+        if not content_hashes:
+            return set()
+        result = await db.scalars(select(Resume.content_hash).where(Resume.content_hash.in_(content_hashes)))
+        return set(result)
+    
+    async def referenced_paths(self, db: AsyncSession, file_paths: List[str]) -> Set[str]:
+        """给定路径中仍被简历引用的路径"""
+        if not file_paths:
+            return set()
+        result = await db.scalars(select(Resume.file_path).where(Resume.file_path.in_(file_paths)))
+        return set(result)
+    
+    async def unhashed_paths_after(self, db: AsyncSession, after_id: int, limit: int) -> List[Tuple[int, str]]:
+        """按ID分批读取没有内容哈希的旧简历的 (ID, 路径)"""
+        result = await db.execute(
+            select(Resume.id, Resume.file_path)
+            .where(Resume.content_hash.is_(None), Resume.id > after_id)
+            .order_by(Resume.id)
+            .limit(limit)
+        )
+        return list(result.tuples())
+    
+    async def count_file_missing(self, db: AsyncSession) -> int:
+        """标记为文件缺失的简历数"""
+        return await db.scalar(select(func.count()).select_from(Resume).where(Resume.file_missing_at.isnot(None)))
+
+async_resume_crud = AsyncResumeCRUD(resume_crud)
@@ -0,0 +1,158 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete, insert, func, case, or_
+from typing import List, Optional, Dict, Any, Tuple, NamedTuple
+from datetime import datetime
+from app.crud.candidate import candidate_crud
+from app.models.saved_search import SavedSearch, SavedSearchMatch
+from app.schemas.candidate import FilterRequest
+
+# 保存时只保留可由SQL/索引评估的结构化条件，AI自然语言查询不参与物化
+_STORED_FIELDS = (
+    "keywords", "education", "min_experience", "max_experience",
+    "skills", "skill_match", "status", "tags", "fuzzy", "fuzzy_threshold",
+)
+
+class MatchPage(NamedTuple):
+    """一页保存的搜索结果"""
+    candidate_ids: List[int]
+    new_ids: List[int]  # 当前页中上次查看后新增的匹配
+    next_cursor: Optional[Dict[str, Any]]
+    total_count: int
+    new_count: int  # since 之后新增的匹配总数
+
+class SavedSearchCRUD:
+    """保存的搜索CRUD操作
+    
+    匹配结果物化在 saved_search_matches 中：创建或手动刷新时全量计算，
+    之后由CandidateCRUD在候选人创建/更新、简历处理完成时逐个候选人增量维护。
+    """
+    
+    def stored_filters(self, filter_request: FilterRequest) -> Dict[str, Any]:
+        """提取需要保存的筛选条件"""
+        data = filter_request.dict()
+        return {field: data[field] for field in _STORED_FIELDS}
+    
+    def create(self, db: Session, *, name: str, filter_request: FilterRequest) -> SavedSearch:
+        """创建保存的搜索并物化当前匹配结果"""
+        db_obj = SavedSearch(name=name, filters=self.stored_filters(filter_request))
+        db.add(db_obj)
+        db.flush()
+        self._rematerialize(db, db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def get(self, db: Session, id: int) -> Optional[SavedSearch]:
+        """根据ID获取保存的搜索"""
+        return db.query(SavedSearch).filter(SavedSearch.id == id).first()
+    
+    def get_multi(self, db: Session) -> List[SavedSearch]:
+        """获取所有保存的搜索"""
+        return db.query(SavedSearch).order_by(SavedSearch.id).all()
+    
+    def delete(self, db: Session, *, id: int) -> Optional[SavedSearch]:
+        """删除保存的搜索及其匹配结果"""
+        obj = self.get(db, id)
+        if obj:
+            db.execute(delete(SavedSearchMatch).where(SavedSearchMatch.saved_search_id == id))
+            db.delete(obj)
+            db.commit()
+        return obj
+    
+    def _rematerialize(self, db: Session, saved_search: SavedSearch) -> None:
+        """全量重算匹配结果，已有匹配保留原来的匹配时间"""
+        matched = set(candidate_crud.matching_ids(db, **saved_search.filters))
+        current = set(db.scalars(
+            select(SavedSearchMatch.candidate_id).where(SavedSearchMatch.saved_search_id == saved_search.id)
+        ))
+        stale = current - matched
+        if stale:
+            db.execute(delete(SavedSearchMatch).where(
+                SavedSearchMatch.saved_search_id == saved_search.id,
+                SavedSearchMatch.candidate_id.in_(stale)
+            ))
+        now = datetime.utcnow()
+        added = [
+            {"saved_search_id": saved_search.id, "candidate_id": candidate_id, "matched_at": now}
+            for candidate_id in sorted(matched - current)
+        ]
+        if added:
+            db.execute(insert(SavedSearchMatch), added)
+    
+    def refresh(self, db: Session, saved_search: SavedSearch) -> SavedSearch:
+        """手动全量刷新匹配结果（例如批量导入数据之后）"""
+        self._rematerialize(db, saved_search)
+        db.commit()
+        db.refresh(saved_search)
+        return saved_search
+    
+    def match_counts(self, db: Session, ids: List[int]) -> Dict[int, Tuple[int, int]]:
+        """统计每个保存的搜索的 (匹配数, 上次查看后新增数)"""
+        if not ids:
+            return {}
+        is_new = or_(
+            SavedSearch.last_viewed_at.is_(None),
+            SavedSearchMatch.matched_at > SavedSearch.last_viewed_at
+        )
+        rows = db.execute(
+            select(
+                SavedSearchMatch.saved_search_id,
+                func.count(),
+                func.sum(case((is_new, 1), else_=0))
+            )
+            .join(SavedSearch, SavedSearch.id == SavedSearchMatch.saved_search_id)
+            .where(SavedSearchMatch.saved_search_id.in_(ids))
+            .group_by(SavedSearchMatch.saved_search_id)
+        ).all()
+        return {search_id: (total, new or 0) for search_id, total, new in rows}
+    
+    def get_matches(
+        self,
+        db: Session,
+        saved_search: SavedSearch,
+        *,
+        since: Optional[datetime] = None,
+        only_new: bool = False,
+        skip: int = 0,
+        limit: int = 100,
+        after_id: Optional[int] = None
+    ) -> MatchPage:
+        """从物化结果中按候选人ID读取一页（走主键索引，不重新执行筛选）
+        
+        since 之后加入的匹配视为新增；only_new 时只返回新增匹配。
+        """
+        query = select(SavedSearchMatch.candidate_id, SavedSearchMatch.matched_at).where(
+            SavedSearchMatch.saved_search_id == saved_search.id
+        )
+        new_query = query if since is None else query.where(SavedSearchMatch.matched_at > since)
+        new_count = db.scalar(select(func.count()).select_from(new_query.subquery()))
+        if only_new:
+            query = new_query
+            total_count = new_count
+        else:
+            total_count = db.scalar(select(func.count()).select_from(query.subquery()))
+        
+        if after_id is not None:
+            query = query.where(SavedSearchMatch.candidate_id > after_id)
+        rows = db.execute(
+            query.order_by(SavedSearchMatch.candidate_id).offset(skip).limit(limit)
+        ).all()
+        
+        candidate_ids = [candidate_id for candidate_id, _ in rows]
+        new_ids = [
+            candidate_id for candidate_id, matched_at in rows
+            if since is None or matched_at > since
+        ]
+        next_cursor = {"id": candidate_ids[-1]} if len(rows) == limit else None
+        return MatchPage(candidate_ids, new_ids, next_cursor, total_count, new_count)
+    
+    def mark_viewed(self, db: Session, saved_search: SavedSearch) -> SavedSearch:
+        """记录查看时间，之后的匹配才算新增"""
+        saved_search.last_viewed_at = datetime.utcnow()
+        db.add(saved_search)
+        db.commit()
+        db.refresh(saved_search)
+        return saved_search
+
+# 创建CRUD实例
+saved_search_crud = SavedSearchCRUD()
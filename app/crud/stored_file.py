@@ -0,0 +1,141 @@
+from collections import Counter
+from sqlalchemy import select, delete, update, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Iterable, List, Optional
+from datetime import datetime
+from app.db.write_queue import write_queue
+from app.models.resume import Resume
+from app.models.stored_file import StoredFile
+from app.services.file_service import file_service
+
+# PostgreSQL上按内容哈希获取的事务级咨询锁的第一个键（第二个键取自哈希）
+_STORED_FILE_LOCK_NAMESPACE = 0x48524653
+
+class StoredFileCRUD:
+    """内容存储引用计数
+    
+    acquire/release 由简历的创建和删除在同一事务中调用（不提交）；
+    purge 在删除提交之后调用，清理引用计数降为0的记录和文件。
+    
+    删除文件前按哈希加锁并复查引用，锁持有到文件删除之后；acquire 获取同一把锁，
+    上传在登记引用提交后才写入文件，因此删除要么看到新登记的引用而跳过，
+    要么在上传写入文件之前完成。
+    """
+    
+    def _lock(self, db: Session, content_hashes: Iterable[str]) -> None:
+        """锁定给定哈希直到当前事务结束
+        
+        PostgreSQL上按哈希获取事务级咨询锁，排序后依次获取以免死锁；
+        SQLite只有一个写者，执行一条写语句提前开始写事务，其他连接的写入等待到提交。
+        """
+        hashes = sorted(set(content_hashes))
+        if not hashes:
+            return
+        if db.get_bind().dialect.name == "postgresql":
+            for key in sorted({int(h[:8], 16) - 2 ** 31 for h in hashes}):
+                db.execute(
+                    text("SELECT pg_advisory_xact_lock(:namespace, :key)"),
+                    {"namespace": _STORED_FILE_LOCK_NAMESPACE, "key": key}
+                )
+        else:
+            db.execute(
+                update(StoredFile).where(StoredFile.sha256.in_(hashes))
+                .values(ref_count=StoredFile.ref_count)
+            )
+    
+    def acquire(self, db: Session, *, content_hash: str, size: int) -> None:
+        """登记一次引用：不存在时插入，存在时引用计数加一（不提交事务）"""
+        self._lock(db, [content_hash])
+        insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(StoredFile).values(
+            sha256=content_hash, size=size, ref_count=1, created_at=datetime.utcnow()
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[StoredFile.sha256],
+            set_={"ref_count": StoredFile.ref_count + 1}
+        ))
+    
+    def release(self, db: Session, content_hashes: Iterable[str]) -> List[str]:
+        """每个哈希释放一次引用（可重复），返回涉及的哈希（不提交事务）"""
+        counts = Counter(h for h in content_hashes if h)
+        by_count = {}
+        for content_hash, count in counts.items():
+            by_count.setdefault(count, []).append(content_hash)
+        for count, hashes in by_count.items():
+            db.execute(
+                update(StoredFile).where(StoredFile.sha256.in_(hashes))
+                .values(ref_count=StoredFile.ref_count - count)
+            )
+        return sorted(counts)
+    
+    def purge(self, db: Session, content_hashes: List[str]) -> List[str]:
+        """删除给定哈希中已无引用的记录并提交，然后删除对应文件，返回删除记录的哈希
+        
+        本地文件在当前会话中删除；远程对象的删除要等待网络，交给写队列的线程执行。
+        两者都经由 delete_blobs 加锁复查引用，期间重新登记了引用的哈希不删除。
+        """
+        if not content_hashes:
+            return []
+        unreferenced = list(db.scalars(
+            select(StoredFile.sha256)
+            .where(StoredFile.sha256.in_(content_hashes), StoredFile.ref_count <= 0)
+        ))
+        if not unreferenced:
+            return []
+        db.execute(delete(StoredFile).where(
+            StoredFile.sha256.in_(unreferenced), StoredFile.ref_count <= 0
+        ))
+        db.commit()
+        if file_service.stores_locally:
+            self.delete_blobs(db, unreferenced)
+        else:
+            write_queue.submit(lambda session: self.delete_blobs(session, unreferenced))
+        return unreferenced
+    
+    def delete_blobs(self, db: Session, content_hashes: List[str]) -> int:
+        """加锁复查引用，删除仍无引用的文件后提交，返回删除的数量"""
+        if not content_hashes:
+            return 0
+        self._lock(db, content_hashes)
+        referenced = set(db.scalars(
+            select(StoredFile.sha256)
+            .where(StoredFile.sha256.in_(content_hashes), StoredFile.ref_count > 0)
+        ))
+        removed = file_service.delete_blobs([h for h in content_hashes if h not in referenced])
+        db.commit()
+        return removed
+    
+    def forget_unreferenced(self, db: Session, content_hashes: List[str]) -> List[str]:
+        """存储对账删除孤立文件前调用：加锁复查引用，删除无简历引用的记录，
+        返回仍无引用（可以删除文件）的哈希
+        
+        不提交事务：调用方删除文件后再提交，锁持有到文件删除之后。
+        """
+        if not content_hashes:
+            return []
+        self._lock(db, content_hashes)
+        referenced = set(db.scalars(
+            select(Resume.content_hash).where(Resume.content_hash.in_(content_hashes))
+        ))
+        unreferenced = [h for h in content_hashes if h not in referenced]
+        if unreferenced:
+            db.execute(delete(StoredFile).where(StoredFile.sha256.in_(unreferenced)))
+        return unreferenced
+    
+    def get(self, db: Session, content_hash: str) -> Optional[StoredFile]:
+        """根据哈希获取存储记录"""
+        return db.get(StoredFile, content_hash)
+
+class AsyncStoredFileCRUD:
+    """内容存储记录读取（异步会话）"""
+    
+    async def get(self, db: AsyncSession, content_hash: str) -> Optional[StoredFile]:
+        """根据哈希获取存储记录"""
+        return await db.get(StoredFile, content_hash)
+
+# 创建CRUD实例
+stored_file_crud = StoredFileCRUD()
+async_stored_file_crud = AsyncStoredFileCRUD()
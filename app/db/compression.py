@@ -0,0 +1,19 @@
+import zlib
+from typing import Optional
+
+# 压缩级别：6 在压缩率和速度之间折中（zlib默认值）
+COMPRESSION_LEVEL = 6
+
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """zlib压缩文本（UTF-8）"""
+    if text is None:
+        return None
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(data: Optional[bytes]) -> Optional[str]:
+    """解压 compress_text 的结果"""
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
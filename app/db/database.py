@@ -1,17 +1,91 @@
-from sqlalchemy import create_engine, MetaData
+from typing import Any, Callable, Dict
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.db.compression import decompress_text
+
+# 同步驱动对应的异步驱动
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url() -> str:
+    """异步引擎连接串：未单独配置时由 DATABASE_URL 换成对应的异步驱动"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"数据库 {backend} 没有配置异步驱动，请设置 ASYNC_DATABASE_URL")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """按数据库类型生成引擎参数
+    
+    SQLite连接需要跨线程使用；其他数据库（如PostgreSQL）使用带健康检查的连接池，
+    多个应用副本共用一个数据库时按 副本数 × 2 × (DB_POOL_SIZE + DB_MAX_OVERFLOW) 估算连接上限。
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """由配置生成的SQLite连接参数"""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # 负数表示KiB
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+    }
+
+def configure_sqlite_engine(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    """在每个新建的SQLite连接上设置PRAGMA并注册自定义函数（同步引擎或异步引擎的 sync_engine）
+    
+    inflate_text(blob) 解压压缩存储的简历原文，供全文索引在SQL中读取。
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value is not None:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+        dbapi_connection.create_function("inflate_text", 1, decompress_text, deterministic=True)
 
 # 创建数据库引擎
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # SQLite特定配置
-)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+configure_sqlite_engine(engine, sqlite_pragmas())
+
+# 异步引擎：请求处理中的数据库IO不阻塞事件循环
+async_database_url = get_async_database_url()
+async_engine = create_async_engine(async_database_url, **engine_options(async_database_url))
+configure_sqlite_engine(async_engine.sync_engine, sqlite_pragmas())
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 异步会话工厂；提交后不过期对象，避免在异步上下文中触发隐式加载
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 # 创建基础模型类
 Base = declarative_base()
 
@@ -23,3 +97,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """获取异步数据库会话"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def run_read(fn: Callable[[Session], Any]) -> Any:
+    """在线程池中用独立的同步会话执行只读函数，CPU密集的同步查询和计算不占用事件循环
+    
+    会话在返回前关闭，返回的ORM对象已脱离会话，只能访问已加载的属性。
+    """
+    def run():
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+    return await run_in_threadpool(run)
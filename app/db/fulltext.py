@@ -0,0 +1,610 @@
+import logging
+import math
+import re
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import Float, bindparam, case, cast, column, func, literal, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.db.compression import decompress_text
+from app.db.database import engine
+
+logger = logging.getLogger("app.db.fulltext")
+
+# trigram分词器要求查询词至少3个字符
+MIN_TERM_LENGTH = 3
+
+# bm25列权重：姓名、职位、公司、教育、技能、简历全文
+BM25_WEIGHTS = (10.0, 6.0, 6.0, 2.0, 4.0, 1.0)
+
+# 关键词命中不超过该数量时按相关度排序；更宽泛的词按ID排序，总数也只统计到该值
+RANKED_MATCH_LIMIT = 2000
+
+_FTS_TABLE = "candidates_fts"
+
+# fts5vocab 视图：每个三元组在各列中出现的文档数
+_FTS_VOCAB_TABLE = "candidates_fts_vocab"
+
+# 模糊匹配只在这几个短字段上进行
+FUZZY_COLUMNS = ("name", "current_position", "current_company")
+
+# 模糊匹配默认相似度阈值（与pg_trgm的word_similarity_threshold一致）
+DEFAULT_FUZZY_THRESHOLD = 0.6
+
+# 模糊召回的结果按批读取、重新打分，内存占用与召回总数无关
+FUZZY_BATCH_SIZE = 1000
+
+# 分页接口每个关键词最多重新打分的召回数量，超过时只保留与查询重合三元组最多的一批
+FUZZY_RECALL_LIMIT = 2000
+
+# 召回表达式“至少命中其中两个三元组”最多展开的 AND 组合数，超过时退回“至少命中一个”
+FUZZY_MAX_PAIRS = 45
+
+# 三元组文档频率缓存的条目上限（频率只用于挑选稀有三元组，过期不影响结果正确性）
+FUZZY_FREQUENCY_CACHE_SIZE = 4096
+
+# 单词由字母、数字和中文组成，其余字符视为分隔符
+_WORD_PATTERN = re.compile(r"[0-9a-z\u4e00-\u9fff]+")
+
+_CREATE_SQL = f"""
+CREATE VIRTUAL TABLE {_FTS_TABLE} USING fts5(
+    name, current_position, current_company, education, skills, resume_text,
+    tokenize='trigram'
+)
+"""
+
+# 候选人字段与其全部简历文本拼成一行索引文档，rowid即candidate_id
+_DOCUMENT_SQL = f"""
+INSERT OR REPLACE INTO {_FTS_TABLE}
+    (rowid, name, current_position, current_company, education, skills, resume_text)
+SELECT
+    c.id, c.name, c.current_position, c.current_company, c.education,
+    (SELECT group_concat(value, ' ') FROM json_each(c.skills)),
+    (SELECT group_concat(inflate_text(rc.compressed_text), char(10))
+     FROM resumes r JOIN resume_contents rc ON rc.resume_id = r.id
+     WHERE r.candidate_id = c.id)
+FROM candidates c
+"""
+
+fts_table = table(_FTS_TABLE, column("rowid"), *(column(c) for c in FUZZY_COLUMNS))
+
+
+def trigrams(value: str) -> Set[str]:
+    """按pg_trgm规则提取三元组：小写、按词切分，每个词前补两个空格、后补一个空格"""
+    grams = set()
+    for word in _WORD_PATTERN.findall((value or "").lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class FuzzyMatches(NamedTuple):
+    """模糊匹配结果"""
+    scores: Dict[int, float]  # candidate_id -> 相似度
+    capped: bool  # 召回达到上限，scores 只包含与查询重合最多的一部分候选人
+
+
+def word_similarity(query: str, value: str) -> float:
+    """查询词与字段值的相似度：查询三元组被字段覆盖的比例
+
+    与pg_trgm的word_similarity思路相同，查询是字段的一部分时（如“阿里巴巴”之于
+    “阿里巴巴集团”）得分接近1，拼写错误按错位的三元组数量扣分。
+    """
+    query_grams = trigrams(query)
+    if not query_grams:
+        return 0.0
+    return len(query_grams & trigrams(value)) / len(query_grams)
+
+
+class CandidateFullTextIndex:
+    """候选人全文索引（SQLite FTS5 + trigram分词）
+
+    索引覆盖姓名、职位、公司、教育、技能和简历原文，由CRUD在同一事务中同步维护。
+    非SQLite数据库或FTS5不可用时 available 为 False，调用方应回退到LIKE查询。
+    """
+
+    def __init__(self):
+        self.available = False
+        self._gram_frequencies: Dict[str, int] = {}
+
+    def ensure_schema(self, engine: Engine) -> None:
+        """创建FTS5虚拟表，首次创建时从现有数据回填"""
+        if engine.dialect.name != "sqlite":
+            logger.info("当前数据库不是SQLite，跳过FTS5全文索引")
+            return
+
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": _FTS_TABLE}
+            ).first()
+            if not exists:
+                try:
+                    conn.exec_driver_sql(_CREATE_SQL)
+                except OperationalError as e:
+                    logger.warning(f"FTS5不可用，关键词搜索回退到LIKE: {str(e)}")
+                    return
+                conn.exec_driver_sql(_DOCUMENT_SQL)
+                logger.info("FTS5全文索引创建并回填完成")
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {_FTS_VOCAB_TABLE} USING fts5vocab({_FTS_TABLE}, 'col')"
+            )
+
+        self.available = True
+
+    def index_candidate(self, db: Session, candidate_id: int) -> None:
+        """重建单个候选人的索引文档（需在flush之后、commit之前调用）"""
+        if not self.available:
+            return
+        db.execute(text(_DOCUMENT_SQL + " WHERE c.id = :id"), {"id": candidate_id})
+
+    def remove_candidate(self, db: Session, candidate_id: int) -> None:
+        """从索引中删除候选人"""
+        self.remove_candidates(db, [candidate_id])
+
+    def remove_candidates(self, db: Session, candidate_ids: List[int]) -> None:
+        """从索引中批量删除候选人"""
+        if not self.available or not candidate_ids:
+            return
+        db.execute(
+            text(f"DELETE FROM {_FTS_TABLE} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(candidate_ids)}
+        )
+
+    def split_terms(self, keywords: List[str]) -> Tuple[List[str], List[str]]:
+        """将关键词拆分为可走索引的词和需要回退LIKE的短词"""
+        indexed, fallback = [], []
+        for keyword in keywords:
+            keyword = keyword.strip()
+            if not keyword:
+                continue
+            if self.available and len(keyword) >= MIN_TERM_LENGTH:
+                indexed.append(keyword)
+            else:
+                fallback.append(keyword)
+        return indexed, fallback
+
+    def build_match_query(self, terms: List[str]) -> str:
+        """构造MATCH表达式，每个关键词作为短语，多个关键词之间为OR"""
+        phrases = ['"{}"'.format(term.replace('"', '""')) for term in terms]
+        return " OR ".join(phrases)
+
+    def match_subquery(self, terms: List[str]):
+        """返回 (candidate_id, rank) 子查询，rank越小越相关"""
+        weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+        stmt = (
+            select(
+                fts_table.c.rowid.label("candidate_id"),
+                column(f"bm25({_FTS_TABLE}, {weights})", is_literal=True).label("rank")
+            )
+            .select_from(fts_table)
+            .where(text(f"{_FTS_TABLE} MATCH :fts_query").bindparams(
+                fts_query=self.build_match_query(terms)
+            ))
+        )
+        return stmt.subquery("fts_match")
+
+    def _fuzzy_grams(self, term: str) -> List[str]:
+        """模糊召回用的三元组（不跨词、不含空格）"""
+        normalized = " ".join(_WORD_PATTERN.findall(term.lower()))
+        grams = {normalized[i:i + 3] for i in range(len(normalized) - 2)}
+        return sorted(g for g in grams if " " not in g)
+
+    def _min_overlap(self, keyword: str, grams: List[str], threshold: float) -> int:
+        """达到阈值至少要命中的召回三元组数量
+
+        相似度 = 命中的查询三元组 / 查询三元组总数，其中词首、词尾带空格的三元组
+        不在索引中，按全部命中估计，剩余部分必须由 grams 补足。
+        """
+        query_grams = trigrams(keyword)
+        required = math.ceil(threshold * len(query_grams) - 1e-9)
+        return min(len(grams), max(1, required - (len(query_grams) - len(grams))))
+
+    def _rarest_first(self, db: Session, grams: List[str]) -> List[str]:
+        """按姓名、职位、公司中的文档频率从低到高排列三元组"""
+        missing = [g for g in grams if g not in self._gram_frequencies]
+        if len(self._gram_frequencies) + len(missing) > FUZZY_FREQUENCY_CACHE_SIZE:
+            self._gram_frequencies.clear()
+        for gram in missing:
+            rows = db.execute(
+                text(f"SELECT col, doc FROM {_FTS_VOCAB_TABLE} WHERE term = :term"), {"term": gram}
+            )
+            self._gram_frequencies[gram] = sum(doc for col, doc in rows if col in FUZZY_COLUMNS)
+        return sorted(grams, key=lambda g: (self._gram_frequencies.get(g, 0), g))
+
+    def _fuzzy_match_query(self, grams: List[str], min_overlap: int) -> str:
+        """构造模糊召回的MATCH表达式：限定短字段，是“至少命中 min_overlap 个三元组”的必要条件
+
+        grams 按频率从低到高排列。命中 k 个（共 n 个）的文档必然含有最稀有的
+        n-k+2 个中的至少两个（抽屉原理），用这些三元组两两 AND 再 OR 召回；
+        组合过多时退回最稀有的 n-k+1 个中至少命中一个。
+        """
+        phrases = ['"{}"'.format(g.replace('"', '""')) for g in grams]
+        n = len(phrases)
+        if min_overlap >= n:
+            expression = " AND ".join(phrases)
+        elif min_overlap <= 1 or math.comb(n - min_overlap + 2, 2) > FUZZY_MAX_PAIRS:
+            expression = " OR ".join(phrases[:n - min_overlap + 1])
+        else:
+            expression = " OR ".join(
+                f"({a} AND {b})" for a, b in combinations(phrases[:n - min_overlap + 2], 2)
+            )
+        return "{%s} : (%s)" % (" ".join(FUZZY_COLUMNS), expression)
+
+    def fuzzy_score(self, keywords: List[str], values, threshold: float = DEFAULT_FUZZY_THRESHOLD) -> float:
+        """计算单个候选人（姓名、职位、公司）与关键词的模糊匹配得分"""
+        best = 0.0
+        for keyword in keywords:
+            keyword = keyword.strip()
+            if not keyword:
+                continue
+            for value in values:
+                score = word_similarity(keyword, value or "")
+                # 不足3个字符的关键词子串命中即视为满足阈值，相似度只用于排序
+                if len(keyword) < MIN_TERM_LENGTH and keyword.lower() in (value or "").lower():
+                    score = max(score, threshold)
+                best = max(best, score)
+        return best
+
+    def _score_rows(self, rows: Iterable, keyword: str, threshold: float, scores: Dict[int, float]) -> None:
+        """按 word_similarity 为召回的 (candidate_id, 姓名, 职位, 公司) 打分并保留最高分"""
+        query_grams = trigrams(keyword)
+        short = keyword.lower() if len(keyword) < MIN_TERM_LENGTH else None
+        for row in rows:
+            score = 0.0
+            for value in row[1:]:
+                if not value:
+                    continue
+                if query_grams:
+                    score = max(score, len(query_grams & trigrams(value)) / len(query_grams))
+                # 与 fuzzy_score 相同：短关键词子串命中即视为满足阈值
+                if short is not None and short in value.lower():
+                    score = max(score, threshold)
+            if score >= threshold and score > scores.get(row[0], 0.0):
+                scores[row[0]] = score
+
+    def _stream(self, db: Session, stmt) -> Iterable:
+        """分批读取查询结果，内存占用与结果总数无关"""
+        result = db.execute(stmt.execution_options(stream_results=True))
+        for rows in result.partitions(FUZZY_BATCH_SIZE):
+            yield from rows
+
+    def fuzzy_scores(
+        self,
+        db: Session,
+        keywords: List[str],
+        threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        candidate_ids: Optional[Any] = None,
+        recall_limit: Optional[int] = FUZZY_RECALL_LIMIT
+    ) -> FuzzyMatches:
+        """在姓名、职位、公司上做三元组模糊匹配，返回 candidate_id -> 相似度
+
+        先用FTS5索引召回可能达到阈值（命中足够多三元组）的候选人，再在Python中按
+        word_similarity 重新打分并过滤阈值；多个关键词取各候选的最高分。candidate_ids
+        为候选人ID的子查询（其余筛选条件），在召回时一并过滤。
+
+        每个关键词最多召回 recall_limit 个候选人：超过时逐步提高要求命中的三元组数量，
+        直到召回不超过上限，结果只包含重合最多的一批，capped 为 True。
+        recall_limit 为None时召回完整的匹配集合。
+        """
+        scores: Dict[int, float] = {}
+        capped = False
+        if not self.available:
+            return FuzzyMatches(scores, capped)
+
+        columns = (fts_table.c.rowid, *(fts_table.c[c] for c in FUZZY_COLUMNS))
+        for keyword in keywords:
+            keyword = keyword.strip()
+            if not keyword:
+                continue
+            base = select(*columns).select_from(fts_table)
+            if candidate_ids is not None:
+                # rowid加0：IN子查询只物化一次，而不是按列表中的每个ID各做一次MATCH
+                base = base.where((fts_table.c.rowid + 0).in_(candidate_ids))
+
+            grams = self._fuzzy_grams(keyword)
+            if not grams:
+                # 不足3个字符无法构成三元组，退回子串匹配
+                pattern = _like_pattern(keyword)
+                levels = [base.where(or_(*(fts_table.c[c].like(pattern, escape="\\") for c in FUZZY_COLUMNS)))]
+            else:
+                grams = self._rarest_first(db, grams)
+                levels = [
+                    base.where(text(f"{_FTS_TABLE} MATCH :query").bindparams(
+                        query=self._fuzzy_match_query(grams, k)
+                    ))
+                    for k in range(self._min_overlap(keyword, grams, threshold), len(grams) + 1)
+                ]
+
+            if recall_limit is None:
+                self._score_rows(self._stream(db, levels[0]), keyword, threshold, scores)
+                continue
+
+            # 从阈值要求的命中数开始逐级提高，直到召回不超过上限；
+            # 超出上限的上一级按ID补足一部分，命中更多的候选人都已完整召回
+            rows, partial = [], []
+            for stmt in levels:
+                rows = db.execute(stmt.order_by(fts_table.c.rowid).limit(recall_limit + 1)).all()
+                if len(rows) <= recall_limit:
+                    break
+                capped, partial, rows = True, rows[:recall_limit], []
+            self._score_rows(rows + partial, keyword, threshold, scores)
+        return FuzzyMatches(scores, capped)
+
+
+# PostgreSQL全文索引表：每个候选人一行
+_PG_TABLE = "candidate_search"
+
+# ts_rank 的权重，依次对应 D(简历原文)、C(教育、技能)、B(职位、公司)、A(姓名)，与BM25_WEIGHTS比例一致
+TS_RANK_WEIGHTS = (0.1, 0.3, 0.6, 1.0)
+
+# 'simple' 配置只按空白和标点切词、不做词干化，适合技能名、公司名等专有名词
+_TS_CONFIG = "simple"
+
+_CJK_PATTERN = re.compile(r"[\u4e00-\u9fff]")
+
+_PG_CREATE_SQL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {_PG_TABLE} (
+        candidate_id INTEGER PRIMARY KEY REFERENCES candidates(id) ON DELETE CASCADE,
+        name TEXT,
+        current_position TEXT,
+        current_company TEXT,
+        fuzzy_text TEXT NOT NULL,
+        content TEXT NOT NULL,
+        document TSVECTOR NOT NULL
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS ix_{_PG_TABLE}_document ON {_PG_TABLE} USING GIN (document)",
+)
+
+# pg_trgm可用时为子串匹配（中文关键词、模糊召回）建立三元组索引
+_PG_TRGM_SQL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX IF NOT EXISTS ix_{_PG_TABLE}_content_trgm ON {_PG_TABLE} USING GIN (content gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_{_PG_TABLE}_fuzzy_trgm ON {_PG_TABLE} USING GIN (fuzzy_text gin_trgm_ops)",
+)
+
+_PG_UPSERT_SQL = f"""
+INSERT INTO {_PG_TABLE}
+    (candidate_id, name, current_position, current_company, fuzzy_text, content, document)
+VALUES (
+    :candidate_id, :name, :current_position, :current_company, :fuzzy_text, :content,
+    setweight(to_tsvector('{_TS_CONFIG}', :weight_a), 'A') ||
+    setweight(to_tsvector('{_TS_CONFIG}', :weight_b), 'B') ||
+    setweight(to_tsvector('{_TS_CONFIG}', :weight_c), 'C') ||
+    setweight(to_tsvector('{_TS_CONFIG}', :weight_d), 'D')
+)
+ON CONFLICT (candidate_id) DO UPDATE SET
+    name = EXCLUDED.name,
+    current_position = EXCLUDED.current_position,
+    current_company = EXCLUDED.current_company,
+    fuzzy_text = EXCLUDED.fuzzy_text,
+    content = EXCLUDED.content,
+    document = EXCLUDED.document
+"""
+
+pg_search_table = table(
+    _PG_TABLE,
+    column("candidate_id"),
+    column("name"),
+    column("current_position"),
+    column("current_company"),
+    column("fuzzy_text"),
+    column("content"),
+    column("document"),
+)
+
+_candidates = table(
+    "candidates",
+    column("id"),
+    column("name"),
+    column("current_position"),
+    column("current_company"),
+    column("education"),
+    column("skills"),
+)
+
+_resumes = table("resumes", column("id"), column("candidate_id"), column("created_at"))
+
+_resume_contents = table("resume_contents", column("resume_id"), column("compressed_text"))
+
+
+def _like_pattern(value: str) -> str:
+    """转义LIKE通配符后两端加%"""
+    return "%" + value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class PostgresFullTextIndex(CandidateFullTextIndex):
+    """候选人全文索引（PostgreSQL tsvector + GIN）
+
+    与SQLite版接口相同。每个候选人一行，document 为按字段加权的tsvector，
+    英文、数字关键词按词前缀匹配并以ts_rank排序；'simple' 配置不切分中文，
+    含中文的关键词改为在小写全文 content 上做子串匹配（pg_trgm可用时走三元组索引）。
+    简历原文压缩存储，数据库中无法解压，文档由Python拼好后写入。
+    """
+
+    def ensure_schema(self, engine: Engine) -> None:
+        """创建索引表，首次创建时从现有数据回填"""
+        with engine.begin() as conn:
+            exists = conn.execute(text("SELECT to_regclass(:name)"), {"name": _PG_TABLE}).scalar()
+            for statement in _PG_CREATE_SQL:
+                conn.exec_driver_sql(statement)
+            try:
+                with conn.begin_nested():
+                    for statement in _PG_TRGM_SQL:
+                        conn.exec_driver_sql(statement)
+            except DBAPIError as e:
+                logger.warning(f"pg_trgm不可用，中文关键词和模糊匹配将顺序扫描: {str(e)}")
+
+            if not exists:
+                count = self._backfill(conn)
+                logger.info(f"PostgreSQL全文索引创建并回填完成: {count} 个候选人")
+
+        self.available = True
+
+    def _backfill(self, conn: Connection, batch_size: int = 1000) -> int:
+        """按ID分批为全部候选人写入索引文档"""
+        count, last_id = 0, 0
+        while True:
+            ids = list(conn.execute(
+                select(_candidates.c.id).where(_candidates.c.id > last_id)
+                .order_by(_candidates.c.id).limit(batch_size)
+            ).scalars())
+            if not ids:
+                return count
+            conn.execute(text(_PG_UPSERT_SQL), self._documents(conn, ids))
+            count += len(ids)
+            last_id = ids[-1]
+
+    def _documents(self, conn, candidate_ids: List[int]) -> List[Dict[str, Any]]:
+        """读取候选人字段和简历原文，生成索引行参数"""
+        texts: Dict[int, List[str]] = {}
+        rows = conn.execute(
+            select(_resumes.c.candidate_id, _resume_contents.c.compressed_text)
+            .join(_resume_contents, _resume_contents.c.resume_id == _resumes.c.id)
+            .where(_resumes.c.candidate_id.in_(candidate_ids))
+            .order_by(_resumes.c.created_at)
+        )
+        for candidate_id, compressed_text in rows:
+            if compressed_text is not None:
+                texts.setdefault(candidate_id, []).append(decompress_text(compressed_text))
+
+        documents = []
+        rows = conn.execute(
+            select(
+                _candidates.c.id, _candidates.c.name, _candidates.c.current_position,
+                _candidates.c.current_company, _candidates.c.education, _candidates.c.skills
+            ).where(_candidates.c.id.in_(candidate_ids))
+        )
+        for candidate_id, name, position, company, education, skills in rows:
+            skills_text = " ".join(str(skill) for skill in (skills or []))
+            resume_text = "\n".join(texts.get(candidate_id, []))
+            fields = [name, position, company, education, skills_text, resume_text]
+            documents.append({
+                "candidate_id": candidate_id,
+                "name": name,
+                "current_position": position,
+                "current_company": company,
+                "fuzzy_text": " ".join(filter(None, [name, position, company])).lower(),
+                "content": "\n".join(filter(None, fields)).lower(),
+                "weight_a": name or "",
+                "weight_b": " ".join(filter(None, [position, company])),
+                "weight_c": " ".join(filter(None, [education, skills_text])),
+                "weight_d": resume_text,
+            })
+        return documents
+
+    def index_candidate(self, db: Session, candidate_id: int) -> None:
+        """重建单个候选人的索引文档（需在flush之后、commit之前调用）"""
+        if not self.available:
+            return
+        documents = self._documents(db, [candidate_id])
+        if documents:
+            db.execute(text(_PG_UPSERT_SQL), documents)
+
+    def remove_candidates(self, db: Session, candidate_ids: List[int]) -> None:
+        """从索引中批量删除候选人"""
+        if not self.available or not candidate_ids:
+            return
+        db.execute(
+            text(f"DELETE FROM {_PG_TABLE} WHERE candidate_id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": list(candidate_ids)}
+        )
+
+    def split_terms(self, keywords: List[str]) -> Tuple[List[str], List[str]]:
+        """索引可用时所有关键词都走索引（tsvector或content子串），不受最短长度限制"""
+        if not self.available:
+            return super().split_terms(keywords)
+        return [keyword.strip() for keyword in keywords if keyword.strip()], []
+
+    def build_match_query(self, terms: List[str]) -> str:
+        """构造tsquery：每个关键词内的词按顺序相邻（<->）并做前缀匹配，多个关键词之间为OR"""
+        phrases = []
+        for term in terms:
+            words = _WORD_PATTERN.findall(term.lower())
+            if words:
+                phrases.append("(" + " <-> ".join(f"{word}:*" for word in words) + ")")
+        return " | ".join(phrases)
+
+    def match_subquery(self, terms: List[str]):
+        """返回 (candidate_id, rank) 子查询，rank越小越相关"""
+        ts_terms = [t for t in terms if not _CJK_PATTERN.search(t) and _WORD_PATTERN.search(t.lower())]
+        substring_terms = [t for t in terms if t not in ts_terms]
+
+        conditions = [pg_search_table.c.content.like(_like_pattern(t.lower())) for t in substring_terms]
+        rank = literal(0.0, Float)
+        if ts_terms:
+            ts_query = func.to_tsquery(_TS_CONFIG, self.build_match_query(ts_terms))
+            conditions.append(pg_search_table.c.document.op("@@")(ts_query))
+            weights = literal_column("'{%s}'::float4[]" % ", ".join(str(w) for w in TS_RANK_WEIGHTS))
+            # 转为double，游标中的rank回传时可以精确比较
+            rank = -cast(func.ts_rank(weights, pg_search_table.c.document, ts_query), Float)
+
+        stmt = (
+            select(pg_search_table.c.candidate_id.label("candidate_id"), rank.label("rank"))
+            .where(or_(*conditions))
+        )
+        return stmt.subquery("fts_match")
+
+    def fuzzy_scores(
+        self,
+        db: Session,
+        keywords: List[str],
+        threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        candidate_ids: Optional[Any] = None,
+        recall_limit: Optional[int] = FUZZY_RECALL_LIMIT
+    ) -> FuzzyMatches:
+        """在姓名、职位、公司上做三元组模糊匹配，返回 candidate_id -> 相似度
+
+        与SQLite版相同：只召回命中足够多三元组、可能达到阈值的候选人，
+        candidate_ids 子查询在召回时一并过滤，再按 word_similarity 重新打分并过滤阈值。
+        命中的三元组数量直接在SQL中计算，超过 recall_limit 时按命中数从多到少只取上限内的一批。
+        """
+        scores: Dict[int, float] = {}
+        capped = False
+        if not self.available:
+            return FuzzyMatches(scores, capped)
+
+        fuzzy_text = pg_search_table.c.fuzzy_text
+        for keyword in keywords:
+            keyword = keyword.strip()
+            if not keyword:
+                continue
+            stmt = select(
+                pg_search_table.c.candidate_id, pg_search_table.c.name,
+                pg_search_table.c.current_position, pg_search_table.c.current_company
+            )
+            if candidate_ids is not None:
+                stmt = stmt.where(pg_search_table.c.candidate_id.in_(candidate_ids))
+
+            grams = self._fuzzy_grams(keyword)
+            if grams:
+                matches = [fuzzy_text.like(_like_pattern(gram)) for gram in grams]
+                overlap = literal(0)
+                for match in matches:
+                    overlap = overlap + case((match, 1), else_=0)
+                stmt = stmt.where(or_(*matches)).where(overlap >= self._min_overlap(keyword, grams, threshold))
+                order_by = (overlap.desc(), pg_search_table.c.candidate_id)
+            else:
+                # 不足3个字符无法构成三元组，退回子串匹配
+                stmt = stmt.where(fuzzy_text.like(_like_pattern(keyword.lower())))
+                order_by = (pg_search_table.c.candidate_id,)
+
+            if recall_limit is None:
+                self._score_rows(self._stream(db, stmt), keyword, threshold, scores)
+                continue
+            rows = db.execute(stmt.order_by(*order_by).limit(recall_limit + 1)).all()
+            if len(rows) > recall_limit:
+                capped, rows = True, rows[:recall_limit]
+            self._score_rows(rows, keyword, threshold, scores)
+        return FuzzyMatches(scores, capped)
+
+
+# 创建索引实例（按数据库类型选择实现）
+candidate_fulltext = (
+    PostgresFullTextIndex() if engine.dialect.name == "postgresql" else CandidateFullTextIndex()
+)
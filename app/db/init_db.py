@@ -1,10 +1,30 @@
-from sqlalchemy.orm import Session
-from app.db.database import engine, Base
+import os
+from alembic import command
+from alembic.config import Config
+from app.db.database import engine, SessionLocal
+from app.db.fulltext import candidate_fulltext
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+
+def run_migrations():
+    """执行Alembic迁移到最新版本"""
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    command.upgrade(config, "head")
 
 async def init_db():
-    """初始化数据库，创建所有表"""
-    # 导入所有模型以确保它们被注册到Base.metadata
-    from app.models import candidate, resume
+    """初始化数据库，执行迁移并准备索引"""
+    from app.crud.candidate import candidate_crud
+    
+    # 执行数据库迁移（建表和索引都由迁移管理）
+    run_migrations()
+    
+    # 回填技能索引表（从旧版本升级时为空）
+    db = SessionLocal()
+    try:
+        candidate_crud.ensure_skill_index(db)
+    finally:
+        db.close()
     
-    # 创建所有表
-    Base.metadata.create_all(bind=engine)
+    # 创建全文索引（仅SQLite）
+    candidate_fulltext.ensure_schema(engine)
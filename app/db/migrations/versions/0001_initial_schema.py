@@ -0,0 +1,79 @@
+"""初始表结构（candidates、resumes、candidate_skills）
+
+引入Alembic之前的数据库已由 Base.metadata.create_all 建表，
+这里按表是否存在逐个创建，使旧库可以直接升级。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "candidates" not in existing:
+        op.create_table(
+            "candidates",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("email", sa.String(length=200)),
+            sa.Column("phone", sa.String(length=20)),
+            sa.Column("education", sa.String(length=200)),
+            sa.Column("experience_years", sa.Integer()),
+            sa.Column("current_position", sa.String(length=200)),
+            sa.Column("current_company", sa.String(length=200)),
+            sa.Column("skills", sa.JSON()),
+            sa.Column("status", sa.String(length=50)),
+            sa.Column("notes", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_candidates_id", "candidates", ["id"])
+        op.create_index("ix_candidates_email", "candidates", ["email"], unique=True)
+
+    if "resumes" not in existing:
+        op.create_table(
+            "resumes",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("filename", sa.String(length=500), nullable=False),
+            sa.Column("file_path", sa.String(length=1000), nullable=False),
+            sa.Column("file_size", sa.Integer()),
+            sa.Column("file_type", sa.String(length=10)),
+            sa.Column("raw_text", sa.Text()),
+            sa.Column("extracted_data", sa.JSON()),
+            sa.Column("processing_status", sa.String(length=50)),
+            sa.Column("error_message", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("processed_at", sa.DateTime()),
+            sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), nullable=False),
+        )
+        op.create_index("ix_resumes_id", "resumes", ["id"])
+
+    if "candidate_skills" not in existing:
+        op.create_table(
+            "candidate_skills",
+            sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), primary_key=True),
+            sa.Column("skill_normalized", sa.String(length=100), primary_key=True),
+        )
+        op.create_index(
+            "ix_candidate_skills_skill_candidate",
+            "candidate_skills",
+            ["skill_normalized", "candidate_id"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("candidate_skills")
+    op.drop_table("resumes")
+    op.drop_table("candidates")
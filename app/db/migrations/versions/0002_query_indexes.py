@@ -0,0 +1,34 @@
+"""按实际查询模式添加复合索引
+
+- candidates(status, id): 状态筛选 + 按ID键集分页
+- candidates(experience_years, id): 工作年限范围筛选
+- candidates(created_at, id): 按创建时间排序
+- resumes(candidate_id, created_at): ResumeCRUD.get_by_candidate
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_candidates_status_id", "candidates", ["status", "id"])
+    op.create_index("ix_candidates_experience_id", "candidates", ["experience_years", "id"])
+    op.create_index("ix_candidates_created_at_id", "candidates", ["created_at", "id"])
+    op.create_index("ix_resumes_candidate_created_at", "resumes", ["candidate_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_resumes_candidate_created_at", table_name="resumes")
+    op.drop_index("ix_candidates_created_at_id", table_name="candidates")
+    op.drop_index("ix_candidates_experience_id", table_name="candidates")
+    op.drop_index("ix_candidates_status_id", table_name="candidates")
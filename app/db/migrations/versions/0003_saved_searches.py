@@ -0,0 +1,50 @@
+"""保存的搜索及其物化匹配结果
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "saved_searches",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("filters", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("last_viewed_at", sa.DateTime()),
+    )
+    op.create_index("ix_saved_searches_id", "saved_searches", ["id"])
+
+    op.create_table(
+        "saved_search_matches",
+        sa.Column("saved_search_id", sa.Integer(), sa.ForeignKey("saved_searches.id"), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), primary_key=True),
+        sa.Column("matched_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_saved_search_matches_search_matched_at",
+        "saved_search_matches",
+        ["saved_search_id", "matched_at"]
+    )
+    op.create_index("ix_saved_search_matches_candidate", "saved_search_matches", ["candidate_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_saved_search_matches_candidate", table_name="saved_search_matches")
+    op.drop_index("ix_saved_search_matches_search_matched_at", table_name="saved_search_matches")
+    op.drop_table("saved_search_matches")
+    op.drop_index("ix_saved_searches_id", table_name="saved_searches")
+    op.drop_table("saved_searches")
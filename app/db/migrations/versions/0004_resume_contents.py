@@ -0,0 +1,92 @@
+"""简历原文移到 resume_contents，压缩存储
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.compression import compress_text, decompress_text
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# 每批搬运的简历数量
+BATCH_SIZE = 500
+
+resumes = sa.table(
+    "resumes",
+    sa.column("id", sa.Integer()),
+    sa.column("raw_text", sa.Text()),
+    sa.column("extracted_data", sa.JSON()),
+)
+
+resume_contents = sa.table(
+    "resume_contents",
+    sa.column("resume_id", sa.Integer()),
+    sa.column("compressed_text", sa.LargeBinary()),
+    sa.column("text_length", sa.Integer()),
+    sa.column("extracted_data", sa.JSON()),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "resume_contents",
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id"), primary_key=True),
+        sa.Column("compressed_text", sa.LargeBinary()),
+        sa.Column("text_length", sa.Integer()),
+        sa.Column("extracted_data", sa.JSON()),
+    )
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(resumes.c.id, resumes.c.raw_text, resumes.c.extracted_data)
+            .where(resumes.c.id > last_id)
+            .where(sa.or_(resumes.c.raw_text.isnot(None), resumes.c.extracted_data.isnot(None)))
+            .order_by(resumes.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(resume_contents.insert(), [
+            {
+                "resume_id": row.id,
+                "compressed_text": compress_text(row.raw_text),
+                "text_length": len(row.raw_text) if row.raw_text is not None else None,
+                "extracted_data": row.extracted_data,
+            }
+            for row in rows
+        ])
+        last_id = rows[-1].id
+
+    with op.batch_alter_table("resumes") as batch_op:
+        batch_op.drop_column("raw_text")
+        batch_op.drop_column("extracted_data")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("resumes") as batch_op:
+        batch_op.add_column(sa.Column("raw_text", sa.Text()))
+        batch_op.add_column(sa.Column("extracted_data", sa.JSON()))
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.select(resume_contents.c.resume_id, resume_contents.c.compressed_text, resume_contents.c.extracted_data)
+    )
+    for row in rows.all():
+        conn.execute(
+            resumes.update()
+            .where(resumes.c.id == row.resume_id)
+            .values(raw_text=decompress_text(row.compressed_text), extracted_data=row.extracted_data)
+        )
+
+    op.drop_table("resume_contents")
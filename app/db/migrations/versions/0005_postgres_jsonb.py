@@ -0,0 +1,48 @@
+"""PostgreSQL：candidates.skills 改为JSONB并建立GIN索引
+
+SQLite上没有对应类型，迁移为空操作。
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.alter_column(
+        "candidates", "skills",
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using="skills::jsonb"
+    )
+    # jsonb_path_ops 只支持 @> 包含查询，索引比默认的 jsonb_ops 小
+    op.create_index(
+        "ix_candidates_skills_gin", "candidates", ["skills"],
+        postgresql_using="gin",
+        postgresql_ops={"skills": "jsonb_path_ops"}
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_candidates_skills_gin", table_name="candidates")
+    op.alter_column(
+        "candidates", "skills",
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using="skills::json"
+    )
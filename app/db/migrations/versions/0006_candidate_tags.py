@@ -0,0 +1,31 @@
+"""候选人标签表
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "candidate_tags",
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), primary_key=True),
+        sa.Column("tag", sa.String(length=50), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_candidate_tags_tag_candidate", "candidate_tags", ["tag", "candidate_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_candidate_tags_tag_candidate", table_name="candidate_tags")
+    op.drop_table("candidate_tags")
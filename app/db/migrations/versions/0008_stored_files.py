@@ -0,0 +1,38 @@
+"""按内容寻址的文件存储：stored_files 引用计数表及简历内容哈希
+
+已有文件由 scripts/migrate_upload_store.py 搬到新目录结构并回填 content_hash。
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stored_files",
+        sa.Column("sha256", sa.String(length=64), primary_key=True),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    with op.batch_alter_table("resumes") as batch_op:
+        batch_op.add_column(sa.Column("content_hash", sa.String(length=64)))
+        batch_op.create_index("ix_resumes_content_hash", ["content_hash"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("resumes") as batch_op:
+        batch_op.drop_index("ix_resumes_content_hash")
+        batch_op.drop_column("content_hash")
+    op.drop_table("stored_files")
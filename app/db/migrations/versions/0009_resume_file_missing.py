@@ -0,0 +1,26 @@
+"""简历文件缺失标记：存储对账时发现文件不存在的时间
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("resumes") as batch_op:
+        batch_op.add_column(sa.Column("file_missing_at", sa.DateTime()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("resumes") as batch_op:
+        batch_op.drop_column("file_missing_at")
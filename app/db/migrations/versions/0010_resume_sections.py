@@ -0,0 +1,59 @@
+"""简历原文分段偏移：resume_contents.sections，并为已有原文回填
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.compression import decompress_text
+from app.services.document_parser import document_parser
+
+
+# revision identifiers, used by Alembic.
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+# 每批回填的简历数量
+BATCH_SIZE = 500
+
+resume_contents = sa.table(
+    "resume_contents",
+    sa.column("resume_id", sa.Integer()),
+    sa.column("compressed_text", sa.LargeBinary()),
+    sa.column("sections", sa.JSON()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("resume_contents") as batch_op:
+        batch_op.add_column(sa.Column("sections", sa.JSON()))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(resume_contents.c.resume_id, resume_contents.c.compressed_text)
+            .where(resume_contents.c.resume_id > last_id)
+            .where(resume_contents.c.compressed_text.isnot(None))
+            .order_by(resume_contents.c.resume_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for resume_id, compressed_text in rows:
+            conn.execute(
+                resume_contents.update()
+                .where(resume_contents.c.resume_id == resume_id)
+                .values(sections=document_parser.split_sections(decompress_text(compressed_text)))
+            )
+        last_id = rows[-1].resume_id
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("resume_contents") as batch_op:
+        batch_op.drop_column("sections")
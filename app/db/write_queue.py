@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+
+logger = logging.getLogger("app.db.write_queue")
+
+
+class WriteQueue:
+    """单写者队列：写事务按提交顺序在同一个后台线程中依次执行
+
+    SQLite同一时刻只允许一个写事务，多个请求和后台任务并发写入时会互相等锁
+    甚至报 database is locked。所有写入经由这里串行化后，写入之间不再争锁；
+    配合WAL模式，读请求仍走各自的连接，不会被写入阻塞。
+
+    每个任务使用独立的会话，任务结束后会话关闭，返回的ORM对象处于分离状态
+    （已加载的属性仍可读取）。
+    """
+
+    def __init__(self, session_factory: sessionmaker, enabled: bool = True):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+            return self._executor
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        """提交写任务，fn 接收会话并负责提交事务"""
+        def job():
+            db = self.session_factory()
+            try:
+                result = fn(db)
+                self.completed += 1
+                return result
+            except Exception:
+                db.rollback()
+                self.failed += 1
+                raise
+            finally:
+                db.close()
+                with self._lock:
+                    self.pending -= 1
+
+        with self._lock:
+            self.pending += 1
+        return self._get_executor().submit(job)
+
+    async def run(self, fn: Callable[[Session], Any]) -> Any:
+        """提交写任务并在不阻塞事件循环的情况下等待结果"""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    async def run_write(self, db: AsyncSession, fn: Callable[[Session], Any]) -> Any:
+        """执行同步写函数：启用时交给写线程，否则在当前异步会话中 run_sync
+
+        写线程使用独立会话，完成后清空请求会话的标识映射，
+        之后的查询会重新加载数据，而不是返回写入前缓存的对象。
+        """
+        if not self.enabled:
+            return await db.run_sync(fn)
+        result = await self.run(fn)
+        db.expunge_all()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "pending": self.pending,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """等待队列中的写任务完成并停止写线程"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# 创建写队列实例（仅SQLite启用，其他数据库本身支持并发写入）
+write_queue = WriteQueue(
+    SessionLocal,
+    enabled=settings.SQLITE_WRITE_QUEUE and engine.dialect.name == "sqlite"
+)
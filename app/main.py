@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
@@ -7,7 +8,13 @@ import logging
 from app.api import api_router
 from app.core.config import settings
 from app.core.logging_config import setup_logging
+from app.db.database import SessionLocal, async_engine
 from app.db.init_db import init_db
+from app.db.write_queue import write_queue
+from app.services.facet_index import facet_index
+from app.services.rule_scoring import rule_scoring
+from app.services.semantic_search import semantic_search
+from app.services.storage_gc import storage_reconciler
 
 # 初始化日志系统
 app_logger = setup_logging()
@@ -30,6 +37,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 # 静态文件服务
@@ -52,8 +60,27 @@ async def startup_event():
     app_logger.info("应用启动中...")
     await init_db()
     app_logger.info("数据库初始化完成")
+    if settings.FACET_INDEX_ENABLED:
+        db = SessionLocal()
+        try:
+            facet_index.build(db)
+        finally:
+            db.close()
+    # 规则评分快照在启动时构建，请求中只使用已构建的快照
+    await run_in_threadpool(rule_scoring.rebuild)
+    semantic_search.load()
+    storage_reconciler.start()
     app_logger.info("HR Copilot v2 应用启动成功")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时停止存储对账、落盘向量索引、等待排队的写入完成并关闭数据库连接池"""
+    await storage_reconciler.stop()
+    semantic_search.index.close()
+    write_queue.shutdown()
+    await async_engine.dispose()
+    app_logger.info("HR Copilot v2 应用已关闭")
+
 @app.get("/")
 async def root():
     """根路径健康检查"""
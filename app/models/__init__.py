@@ -1,5 +1,10 @@
 # 导入所有模型以便在其他地方使用
 from .candidate import Candidate
-from .resume import Resume
+from .resume import Resume, ResumeContent
+from .candidate_skill import CandidateSkill
+from .candidate_tag import CandidateTag
+from .saved_search import SavedSearch, SavedSearchMatch
+from .change_log import ChangeLogEntry
+from .stored_file import StoredFile
 
-__all__ = ["Candidate", "Resume"]
+__all__ = ["Candidate", "Resume", "ResumeContent", "CandidateSkill", "CandidateTag", "SavedSearch", "SavedSearchMatch", "ChangeLogEntry", "StoredFile"]
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import List
 from app.db.database import Base
 
 class Candidate(Base):
@@ -17,15 +19,34 @@ class Candidate(Base):
     experience_years = Column(Integer)  # 工作年限
     current_position = Column(String(200))  # 当前职位
     current_company = Column(String(200))  # 当前公司
-    skills = Column(JSON)  # 技能列表
+    skills = Column(JSON().with_variant(JSONB(), "postgresql"))  # 技能列表（PostgreSQL上为JSONB + GIN索引，见迁移 0005）
     
     # 状态管理
     status = Column(String(50), default="pending")  # pending, interviewed, rejected, hired
     notes = Column(Text)  # 备注
     
+    # 版本号：每次变更加一，与变更日志中的version对应
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # 时间戳
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # 关联关系
     resumes = relationship("Resume", back_populates="candidate", cascade="all, delete-orphan")
+    # 标签随候选人一起加载（selectin：每批候选人一条IN查询，异步会话中不会触发隐式加载）
+    tag_entries = relationship(
+        "CandidateTag", lazy="selectin", order_by="CandidateTag.tag", cascade="all, delete-orphan"
+    )
+    
+    @property
+    def tags(self) -> List[str]:
+        """标签列表"""
+        return [entry.tag for entry in self.tag_entries]
+    
+    # 按查询模式建立的复合索引（见迁移 0002_query_indexes）
+    __table_args__ = (
+        Index("ix_candidates_status_id", "status", "id"),
+        Index("ix_candidates_experience_id", "experience_years", "id"),
+        Index("ix_candidates_created_at_id", "created_at", "id"),
+    )
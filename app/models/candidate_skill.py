@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from app.db.database import Base
+
+def normalize_skill(skill: str) -> str:
+    """规范化技能名：去除多余空白并统一小写"""
+    return " ".join(skill.split()).lower()
+
+class CandidateSkill(Base):
+    """候选人技能索引表（由CandidateCRUD根据Candidate.skills维护）"""
+    __tablename__ = "candidate_skills"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    skill_normalized = Column(String(100), primary_key=True)
+    
+    # 按技能查候选人的复合索引，多技能筛选时在该索引上做交集/并集
+    __table_args__ = (
+        Index("ix_candidate_skills_skill_candidate", "skill_normalized", "candidate_id"),
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from datetime import datetime
+from app.db.database import Base
+
+# 标签最大长度
+MAX_TAG_LENGTH = 50
+
+def normalize_tag(tag: str) -> str:
+    """规范化标签：去除多余空白（保留大小写，标签按原样展示）"""
+    return " ".join(tag.split())[:MAX_TAG_LENGTH]
+
+class CandidateTag(Base):
+    """候选人标签（由批量打标签接口维护）"""
+    __tablename__ = "candidate_tags"
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    tag = Column(String(MAX_TAG_LENGTH), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # 按标签查候选人
+    __table_args__ = (
+        Index("ix_candidate_tags_tag_candidate", "tag", "candidate_id"),
+    )
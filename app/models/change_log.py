@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from datetime import datetime
+from app.db.database import Base
+
+# 实体类型
+ENTITY_CANDIDATE = "candidate"
+ENTITY_RESUME = "resume"
+
+# 操作类型
+OPERATION_CREATE = "create"
+OPERATION_UPDATE = "update"
+OPERATION_DELETE = "delete"
+
+class ChangeLogEntry(Base):
+    """数据变更日志（只追加，与业务写入在同一事务中提交）
+    
+    自增ID即变更序号，下游按ID递增顺序增量消费。
+    """
+    __tablename__ = "change_log"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity = Column(String(20), nullable=False)  # candidate, resume
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)  # create, update, delete
+    version = Column(Integer, nullable=False)  # 变更后的实体版本号（删除时为删除前的版本）
+    changed_fields = Column(JSON)  # 更新涉及的字段，创建和删除时为空
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        # 只消费某类实体的变更
+        Index("ix_change_log_entity_id", "entity", "id"),
+    )
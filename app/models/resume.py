@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey
-from sqlalchemy.orm import relationship
+from typing import Optional
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
+from app.db.compression import compress_text, decompress_text
 from app.db.database import Base
 
 class Resume(Base):
@@ -10,17 +12,18 @@ class Resume(Base):
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String(500), nullable=False)  # 原始文件名
     file_path = Column(String(1000), nullable=False)  # 存储路径
+    content_hash = Column(String(64), index=True)  # 文件内容的SHA-256，对应 stored_files（见迁移 0008）
     file_size = Column(Integer)  # 文件大小（字节）
     file_type = Column(String(10))  # 文件类型 pdf, doc, docx
-    
-    # 提取的内容
-    raw_text = Column(Text)  # 原始文本内容
-    extracted_data = Column(JSON)  # 结构化提取的数据
+    file_missing_at = Column(DateTime)  # 存储对账发现文件不存在的时间，文件恢复后清空（见迁移 0009）
     
     # 处理状态
     processing_status = Column(String(50), default="pending")  # pending, processing, completed, failed
     error_message = Column(Text)  # 错误信息
     
+    # 版本号：每次变更加一，与变更日志中的version对应
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    
     # 时间戳
     created_at = Column(DateTime, default=datetime.utcnow)
     processed_at = Column(DateTime)
@@ -28,3 +31,36 @@ class Resume(Base):
     # 外键关联
     candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
     candidate = relationship("Candidate", back_populates="resumes")
+    
+    # 提取的内容单独存放在 resume_contents 中，列表查询不会读到原文
+    content = relationship("ResumeContent", uselist=False, cascade="all, delete-orphan")
+    
+    # 按查询模式建立的复合索引（见迁移 0002_query_indexes）
+    __table_args__ = (
+        Index("ix_resumes_candidate_created_at", "candidate_id", "created_at"),
+    )
+
+
+class ResumeContent(Base):
+    """简历提取内容（原文压缩存储，按需加载）
+    
+    与简历一对一，原文和结构化数据都是延迟加载列，
+    只有访问对应属性时才会读取。
+    """
+    __tablename__ = "resume_contents"
+    
+    resume_id = Column(Integer, ForeignKey("resumes.id"), primary_key=True)
+    compressed_text = deferred(Column(LargeBinary))  # zlib压缩的原始文本
+    text_length = Column(Integer)  # 原始文本字符数
+    extracted_data = deferred(Column(JSON))  # 结构化提取的数据
+    sections = Column(JSON)  # 原文分段的字符偏移 [{"name", "start", "end"}]（见 DocumentParser.split_sections）
+    
+    @property
+    def raw_text(self) -> Optional[str]:
+        """原始文本内容"""
+        return decompress_text(self.compressed_text)
+    
+    @raw_text.setter
+    def raw_text(self, value: Optional[str]) -> None:
+        self.compressed_text = compress_text(value)
+        self.text_length = len(value) if value is not None else None
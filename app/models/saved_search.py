@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Index
+from datetime import datetime
+from app.db.database import Base
+
+class SavedSearch(Base):
+    """保存的搜索（筛选条件 + 物化的匹配结果）"""
+    __tablename__ = "saved_searches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False)
+    filters = Column(JSON, nullable=False)  # FilterRequest中的结构化筛选条件
+    
+    # 时间戳
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    last_viewed_at = Column(DateTime)  # 上次查看结果的时间，用于计算新增匹配
+
+class SavedSearchMatch(Base):
+    """保存的搜索的匹配结果（由CandidateCRUD在候选人变更时增量维护）"""
+    __tablename__ = "saved_search_matches"
+    
+    saved_search_id = Column(Integer, ForeignKey("saved_searches.id"), primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), primary_key=True)
+    matched_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # 开始匹配的时间
+    
+    __table_args__ = (
+        # 统计/读取上次查看后的新增匹配
+        Index("ix_saved_search_matches_search_matched_at", "saved_search_id", "matched_at"),
+        # 候选人变更或删除时查找其所在的搜索
+        Index("ix_saved_search_matches_candidate", "candidate_id"),
+    )
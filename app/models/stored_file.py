@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.database import Base
+
+class StoredFile(Base):
+    """按内容寻址存储的文件（uploads/ab/cd/<sha256>），相同内容只存一份
+    
+    ref_count 为引用该文件的简历数，随简历的创建和删除在同一事务中增减，
+    降为0后删除记录和文件。
+    """
+    __tablename__ = "stored_files"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -4,11 +4,26 @@ from .candidate import (
     CandidateCreate,
     CandidateUpdate,
     CandidateResponse,
+    SemanticSearchResult,
     ResumeBase,
     ResumeResponse,
     UploadResponse,
     FilterRequest,
-    FilterResponse
+    FilterResponse,
+    BulkIdsRequest,
+    BulkStatusRequest,
+    BulkTagRequest,
+    BulkGetResponse,
+    BulkOperationResponse
+)
+from .saved_search import (
+    SavedSearchCreate,
+    SavedSearchResponse,
+    SavedSearchResults
+)
+from .change_log import (
+    ChangeEntry,
+    ChangeFeedResponse
 )
 
 __all__ = [
@@ -16,9 +31,20 @@ __all__ = [
     "CandidateCreate", 
     "CandidateUpdate",
     "CandidateResponse",
+    "SemanticSearchResult",
     "ResumeBase",
     "ResumeResponse",
     "UploadResponse",
     "FilterRequest",
-    "FilterResponse"
+    "FilterResponse",
+    "BulkIdsRequest",
+    "BulkStatusRequest",
+    "BulkTagRequest",
+    "BulkGetResponse",
+    "BulkOperationResponse",
+    "SavedSearchCreate",
+    "SavedSearchResponse",
+    "SavedSearchResults",
+    "ChangeEntry",
+    "ChangeFeedResponse"
 ]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Dict, Any, Literal
 from datetime import datetime
 
 # 候选人相关Schema
@@ -36,12 +36,21 @@ class CandidateResponse(CandidateBase):
     """候选人响应Schema"""
     id: int
     status: str
+    tags: List[str] = []
     created_at: datetime
     updated_at: datetime
     
     class Config:
         from_attributes = True
 
+# 快速序列化路径（?fields=）可选择的字段，与 CandidateResponse 一致
+CANDIDATE_FIELDS = tuple(CandidateResponse.model_fields)
+
+class SemanticSearchResult(BaseModel):
+    """语义检索结果Schema"""
+    candidate: CandidateResponse
+    score: float  # 余弦相似度
+
 # 简历相关Schema
 class ResumeBase(BaseModel):
     """简历基础Schema"""
@@ -55,6 +64,7 @@ class ResumeResponse(ResumeBase):
     processing_status: str
     created_at: datetime
     processed_at: Optional[datetime] = None
+    file_missing_at: Optional[datetime] = None
     candidate_id: int
     
     class Config:
@@ -76,11 +86,45 @@ class FilterRequest(BaseModel):
     min_experience: Optional[int] = None
     max_experience: Optional[int] = None
     skills: Optional[List[str]] = []
+    skill_match: Literal["all", "any"] = "all"  # 多技能匹配方式：全部满足/任一满足
     status: Optional[str] = None
+    tags: Optional[List[str]] = []  # 含任一标签即匹配
+    fuzzy: bool = False  # 关键词在姓名、职位、公司上做模糊匹配，结果按相似度排序
+    fuzzy_threshold: float = Field(0.6, ge=0.0, le=1.0)  # 模糊匹配的最低相似度
     natural_language_query: Optional[str] = None  # AI筛选查询
 
 class FilterResponse(BaseModel):
     """筛选响应Schema"""
     candidates: List[CandidateResponse]
-    total_count: int
+    total_count: int  # 满足条件的候选人总数（不是当前页数量）
+    total_count_capped: bool = False  # 为True时实际总数超过 total_count，宽泛的关键词只统计到上限
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多结果时为空
     filter_criteria: Dict[str, Any]
+
+# 批量操作Schema（单次最多 BULK_MAX_IDS 个候选人，在一个事务中完成）
+BULK_MAX_IDS = 1000
+
+class BulkIdsRequest(BaseModel):
+    """批量获取/删除请求Schema"""
+    ids: List[int] = Field(..., min_length=1, max_length=BULK_MAX_IDS)
+
+class BulkStatusRequest(BulkIdsRequest):
+    """批量更新状态请求Schema"""
+    status: str
+    notes: Optional[str] = None
+
+class BulkTagRequest(BulkIdsRequest):
+    """批量打标签请求Schema（先移除后添加）"""
+    add: List[str] = []
+    remove: List[str] = []
+
+class BulkGetResponse(BaseModel):
+    """批量获取响应Schema"""
+    candidates: List[CandidateResponse]
+    missing_ids: List[int]  # 不存在的候选人ID
+
+class BulkOperationResponse(BaseModel):
+    """批量写操作响应Schema"""
+    message: str
+    affected_ids: List[int]  # 实际处理的候选人ID
+    missing_ids: List[int]  # 不存在的候选人ID
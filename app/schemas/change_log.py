@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+# 变更日志相关Schema
+class ChangeEntry(BaseModel):
+    """单条变更"""
+    id: int  # 变更序号，全局递增
+    entity: str  # candidate, resume
+    entity_id: int
+    operation: str  # create, update, delete
+    version: int
+    changed_fields: Optional[List[str]] = None
+    changed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class ChangeFeedResponse(BaseModel):
+    """变更订阅响应
+    
+    next_cursor 总是返回：has_more 为 False 时表示已追上最新变更，
+    保存该游标稍后再次拉取即可得到之后的新变更。
+    """
+    changes: List[ChangeEntry]
+    next_cursor: str
+    has_more: bool
@@ -0,0 +1,33 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+from .candidate import CandidateResponse, FilterRequest
+
+# 保存的搜索相关Schema
+class SavedSearchCreate(BaseModel):
+    """创建保存的搜索"""
+    name: str = Field(..., min_length=1, max_length=100)
+    filters: FilterRequest
+
+class SavedSearchResponse(BaseModel):
+    """保存的搜索响应Schema"""
+    id: int
+    name: str
+    filters: Dict[str, Any]
+    match_count: int = 0  # 当前匹配的候选人数
+    new_match_count: int = 0  # 上次查看后新增的匹配数
+    created_at: datetime
+    last_viewed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class SavedSearchResults(BaseModel):
+    """保存的搜索结果页"""
+    saved_search: SavedSearchResponse
+    candidates: List[CandidateResponse]
+    total_count: int  # 本次查询范围内的总数（only_new 时为新增数）
+    new_count: int  # 上次查看后新增的匹配数
+    new_candidate_ids: List[int]  # 当前页中属于新增匹配的候选人ID
+    next_cursor: Optional[str] = None
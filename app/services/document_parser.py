@@ -1,23 +1,55 @@
+import logging
 import os
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from docx import Document
-import PyPDF2
+from app.services.pdf_engines import pdf_text_extractor
+
+logger = logging.getLogger("app.services.document_parser")
+
+# 简历分段：段落名称及其中英文标题
+SECTION_HEADINGS = {
+    "contact": ["联系方式", "联系信息", "个人信息", "基本信息", "个人资料",
+                "contact", "contact information", "contact info", "personal information", "personal details"],
+    "education": ["教育背景", "教育经历", "学习经历", "学历", "教育",
+                  "education", "educational background", "education background", "academic background"],
+    "experience": ["工作经历", "工作经验", "职业经历", "实习经历", "工作履历", "任职经历", "实习经验",
+                   "experience", "work experience", "professional experience", "employment history",
+                   "work history", "career history", "internships", "internship experience"],
+    "skills": ["专业技能", "技能特长", "个人技能", "技能清单", "技术栈", "技能",
+               "skills", "technical skills", "core competencies", "key skills", "technologies", "tech stack"],
+    "projects": ["项目经验", "项目经历", "主要项目", "项目",
+                 "projects", "project experience", "selected projects", "key projects"],
+    # 其他标题只用于结束上一段
+    "other": ["自我评价", "个人评价", "个人简介", "个人总结", "求职意向", "荣誉奖项", "获奖情况", "获奖经历",
+              "证书", "资格证书", "语言能力", "兴趣爱好", "培训经历", "发表论文", "社会实践", "校园经历",
+              "summary", "profile", "objective", "about me", "awards", "honors", "certifications",
+              "certificates", "languages", "interests", "publications", "references", "volunteer experience"],
+}
+SECTION_NAMES = [name for name in SECTION_HEADINGS if name != "other"]
+
+_HEADING_TO_SECTION = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# 行首的编号和装饰符号（一、 1. ■ 【 # 等），标题后接冒号（可带内容）或结束（可带】等）
+_SECTION_HEADING = re.compile(
+    r"^[\s\d一二三四五六七八九十、.．)）(（【\[■□●○◆◇▪•·\-—#*|]*("
+    + "|".join(re.escape(h) for h in sorted(_HEADING_TO_SECTION, key=len, reverse=True))
+    + r")\s*(?:[:：]|[】\]]?\s*[:：]?\s*$)",
+    re.IGNORECASE
+)
+# 不带冒号的标题行最长字符数，更长的行视为正文
+_MAX_HEADING_LENGTH = 30
 
 class DocumentParser:
     """文档解析服务"""
     
     def extract_text_from_pdf(self, file_path: str) -> str:
-        """从PDF提取文本"""
+        """从PDF提取文本（引擎按 PDF_ENGINES 策略逐个文件选择，见 pdf_engines）"""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text() + "\n"
-                return text.strip()
+            result = pdf_text_extractor.extract(file_path)
         except Exception as e:
             raise ValueError(f"PDF解析失败: {str(e)}")
+        logger.info(f"PDF文本提取完成: 引擎 {result.engine}, {result.pages} 页, 质量分 {result.quality}")
+        return result.text
     
     def extract_text_from_docx(self, file_path: str) -> str:
         """从DOCX提取文本"""
@@ -47,6 +79,39 @@ class DocumentParser:
         else:
             raise ValueError(f"不支持的文件类型: {file_type}")
     
+    def split_sections(self, text: str) -> List[Dict[str, Any]]:
+        """按标题把简历原文切分为段落，返回 [{"name", "start", "end"}]（原文中的字符偏移）
+
+        逐行匹配中英文标题（允许编号、符号前缀和“技能：Python”这样带内容的标题行），
+        每段从标题行开始到下一个标题之前；第一个标题之前的页眉通常是姓名和联系方式，
+        记为 contact。自我评价、证书等其他标题记为 other。
+        """
+        sections: List[Dict[str, Any]] = []
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            stripped = line.strip()
+            if stripped:
+                match = _SECTION_HEADING.match(stripped)
+                if match and (len(stripped) <= _MAX_HEADING_LENGTH or stripped[match.end() - 1] in ":："):
+                    name = _HEADING_TO_SECTION[match.group(1).lower()]
+                    if not sections and text[:offset].strip():
+                        sections.append({"name": "contact", "start": 0, "end": offset})
+                    if sections and sections[-1]["end"] is None:
+                        sections[-1]["end"] = offset
+                    sections.append({"name": name, "start": offset, "end": None})
+            offset += len(line)
+        if not sections:
+            return [{"name": "contact", "start": 0, "end": len(text)}] if text.strip() else []
+        sections[-1]["end"] = len(text)
+        return sections
+
+    def section_text(self, text: str, sections: Optional[List[Dict[str, Any]]], name: str) -> str:
+        """取出指定名称的段落文本（同名多段时按顺序拼接）"""
+        return "\n".join(
+            text[section["start"]:section["end"]].strip()
+            for section in sections or [] if section["name"] == name
+        )
+
     def extract_basic_info(self, text: str) -> Dict[str, Any]:
         """使用规则提取基础信息"""
         info = {}
@@ -0,0 +1,98 @@
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+
+# 常见岗位/技能概念的中英文同义词，命中后额外生成一个概念特征，
+# 使“后端开发”“server engineer”“backend”等在向量空间中相互靠近
+CONCEPT_ALIASES: Dict[str, List[str]] = {
+    "backend": ["后端", "后台开发", "服务端", "服务器端", "backend", "back-end", "back end",
+                "server-side", "server side", "server engineer", "server developer"],
+    "frontend": ["前端", "web前端", "frontend", "front-end", "front end", "ui开发"],
+    "fullstack": ["全栈", "fullstack", "full-stack", "full stack"],
+    "mobile": ["移动端", "移动开发", "安卓", "android", "ios", "mobile"],
+    "data": ["数据分析", "数据工程", "大数据", "数仓", "data analyst", "data engineer",
+             "big data", "data warehouse"],
+    "ml": ["机器学习", "深度学习", "人工智能", "算法工程师", "自然语言处理", "计算机视觉",
+           "machine learning", "deep learning", "artificial intelligence", "nlp",
+           "computer vision"],
+    "devops": ["运维", "云原生", "devops", "sre", "site reliability", "k8s", "kubernetes"],
+    "qa": ["测试开发", "测试工程师", "质量保证", "qa", "quality assurance", "test engineer"],
+    "product": ["产品经理", "product manager", "product owner"],
+    "project": ["项目经理", "project manager", "pmp"],
+    "engineer": ["工程师", "开发", "程序员", "engineer", "developer", "programmer"],
+    "management": ["经理", "主管", "总监", "负责人", "manager", "team lead", "director", "head of"],
+    "hr": ["人力资源", "招聘", "human resources", "recruiter", "hrbp"],
+    "bachelor": ["本科", "学士", "bachelor"],
+    "master": ["硕士", "研究生", "master"],
+    "phd": ["博士", "phd", "ph.d", "doctorate"],
+}
+
+# 概念特征相对普通词的权重
+CONCEPT_WEIGHT = 3.0
+
+_CJK = r"一-鿿"
+_CJK_RUN = re.compile(f"[{_CJK}]+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*")
+
+
+def _compile_alias(alias: str) -> str:
+    if re.search(f"[{_CJK}]", alias):
+        return re.escape(alias)
+    # 英文别名按词边界匹配，避免 "ai" 命中 "email"
+    return r"(?<![a-z0-9])" + re.escape(alias) + r"(?![a-z0-9])"
+
+
+_CONCEPT_PATTERNS = {
+    concept: re.compile("|".join(_compile_alias(alias) for alias in aliases))
+    for concept, aliases in CONCEPT_ALIASES.items()
+}
+
+
+class HashingEmbedder:
+    """本地哈希向量化器
+
+    英文按词、中文按字二元组切分，叠加同义概念特征，用带符号的特征哈希
+    直接映射到固定维度并做L2归一化。无需训练和模型文件，结果与进程无关。
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def tokenize(self, text: str) -> Counter:
+        """切分文本并返回 token -> 权重"""
+        text = (text or "").lower()
+        tokens: Counter = Counter()
+
+        for word in _WORD.findall(text):
+            tokens["w:" + word.strip(".-")] += 1.0
+
+        for run in _CJK_RUN.findall(text):
+            if len(run) == 1:
+                tokens["c:" + run] += 1.0
+            for i in range(len(run) - 1):
+                tokens["c:" + run[i:i + 2]] += 1.0
+
+        for concept, pattern in _CONCEPT_PATTERNS.items():
+            hits = len(pattern.findall(text))
+            if hits:
+                tokens["concept:" + concept] += CONCEPT_WEIGHT * hits
+
+        return tokens
+
+    def embed(self, text: str) -> np.ndarray:
+        """生成单位长度的float32向量，空文本返回零向量"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token, weight in self.tokenize(text).items():
+            digest = zlib.crc32(token.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            # 词频取对数，避免长简历中高频词主导
+            vector[digest % self.dim] += sign * (1.0 + math.log(weight))
+
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
@@ -0,0 +1,240 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db.database import engine
+from app.models.candidate import Candidate
+from app.models.candidate_tag import CandidateTag
+from app.models.resume import Resume, ResumeContent
+
+# 导出格式及对应的 Content-Type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# 导出的候选人列（顺序即CSV/Parquet的列顺序）
+EXPORT_COLUMNS = [
+    Candidate.id,
+    Candidate.name,
+    Candidate.email,
+    Candidate.phone,
+    Candidate.education,
+    Candidate.experience_years,
+    Candidate.current_position,
+    Candidate.current_company,
+    Candidate.skills,
+    Candidate.status,
+    Candidate.notes,
+    Candidate.version,
+    Candidate.created_at,
+    Candidate.updated_at,
+]
+
+# 每批从游标读取的行数，同时是Parquet的行组大小
+DEFAULT_CHUNK_SIZE = 5000
+
+def parquet_available() -> bool:
+    """是否安装了 pyarrow（Parquet导出为可选功能）"""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+class _ChunkSink(io.RawIOBase):
+    """只追加的内存输出流，ParquetWriter 写入后由导出器取走已写出的字节"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+class CandidateExporter:
+    """人才库流式导出
+
+    在独立连接上以服务端游标（stream_results）按ID顺序读取候选人列，
+    每批只补查该批的标签和简历结构化数据，直接编码为输出字节，
+    不构造ORM对象和Pydantic模型，内存占用与总行数无关。
+    整个导出在一个读事务内完成，得到一致的快照。
+    """
+
+    def __init__(self, bind: Engine = engine, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.bind = bind
+        self.chunk_size = chunk_size
+
+    @property
+    def columns(self) -> List[str]:
+        return [column.key for column in EXPORT_COLUMNS] + ["tags"]
+
+    def _chunks(
+        self, filters: Dict[str, Any], include_extracted: bool
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """按批产出候选人字典"""
+        # 延迟导入：candidate_crud 依赖的服务模块较多
+        from app.crud.candidate import candidate_crud
+
+        with self.bind.connect() as conn:
+            session = Session(bind=conn)
+            try:
+                query, _ = candidate_crud._filter_query(session, **filters)
+                stmt = query.with_entities(*EXPORT_COLUMNS).order_by(None).order_by(Candidate.id).statement
+                result = conn.execution_options(stream_results=True, max_row_buffer=self.chunk_size).execute(stmt)
+                for rows in result.partitions(self.chunk_size):
+                    records = [dict(row._mapping) for row in rows]
+                    ids = [record["id"] for record in records]
+                    tags = self._tags(conn, ids)
+                    extracted = self._extracted_data(conn, ids) if include_extracted else None
+                    for record in records:
+                        record["tags"] = tags.get(record["id"], [])
+                        if extracted is not None:
+                            record["extracted_data"] = extracted.get(record["id"])
+                    yield records
+            finally:
+                session.close()
+
+    def _tags(self, conn, ids: Sequence[int]) -> Dict[int, List[str]]:
+        tags: Dict[int, List[str]] = {}
+        rows = conn.execute(
+            select(CandidateTag.candidate_id, CandidateTag.tag)
+            .where(CandidateTag.candidate_id.in_(ids))
+            .order_by(CandidateTag.candidate_id, CandidateTag.tag)
+        )
+        for candidate_id, tag in rows:
+            tags.setdefault(candidate_id, []).append(tag)
+        return tags
+
+    def _extracted_data(self, conn, ids: Sequence[int]) -> Dict[int, Any]:
+        """每个候选人最新一份简历的结构化数据"""
+        rows = conn.execute(
+            select(Resume.candidate_id, ResumeContent.extracted_data)
+            .join(ResumeContent, ResumeContent.resume_id == Resume.id)
+            .where(Resume.candidate_id.in_(ids), ResumeContent.extracted_data.isnot(None))
+            .order_by(Resume.id)
+        )
+        return {candidate_id: data for candidate_id, data in rows}
+
+    def stream(
+        self,
+        fmt: str,
+        *,
+        filters: Optional[Dict[str, Any]] = None,
+        include_extracted: bool = False
+    ) -> Iterator[bytes]:
+        """按格式产出导出文件的字节块"""
+        chunks = self._chunks(filters or {}, include_extracted)
+        columns = self.columns + (["extracted_data"] if include_extracted else [])
+        if fmt == "ndjson":
+            return self._ndjson(chunks)
+        if fmt == "csv":
+            return self._csv(chunks, columns)
+        if fmt == "parquet":
+            return self._parquet(chunks, include_extracted)
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+    def _ndjson(self, chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        for records in chunks:
+            yield "".join(
+                json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+                for record in records
+            ).encode("utf-8")
+
+    def _csv(self, chunks: Iterator[List[Dict[str, Any]]], columns: List[str]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for records in chunks:
+            for record in records:
+                row = []
+                for column in columns:
+                    value = record.get(column)
+                    if column in ("skills", "tags"):
+                        value = ";".join(value or [])
+                    elif column == "extracted_data" and value is not None:
+                        value = json.dumps(value, ensure_ascii=False, default=_json_default)
+                    elif isinstance(value, datetime):
+                        value = value.isoformat()
+                    row.append(value)
+                writer.writerow(row)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def _parquet(self, chunks: Iterator[List[Dict[str, Any]]], include_extracted: bool) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        fields = [
+            pa.field("id", pa.int64()),
+            pa.field("name", pa.string()),
+            pa.field("email", pa.string()),
+            pa.field("phone", pa.string()),
+            pa.field("education", pa.string()),
+            pa.field("experience_years", pa.int32()),
+            pa.field("current_position", pa.string()),
+            pa.field("current_company", pa.string()),
+            pa.field("skills", pa.list_(pa.string())),
+            pa.field("status", pa.string()),
+            pa.field("notes", pa.string()),
+            pa.field("version", pa.int32()),
+            pa.field("created_at", pa.timestamp("us")),
+            pa.field("updated_at", pa.timestamp("us")),
+            pa.field("tags", pa.list_(pa.string())),
+        ]
+        if include_extracted:
+            # 结构化数据没有固定结构，以JSON字符串存储
+            fields.append(pa.field("extracted_data", pa.string()))
+        schema = pa.schema(fields)
+
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        try:
+            for records in chunks:
+                if include_extracted:
+                    for record in records:
+                        if record["extracted_data"] is not None:
+                            record["extracted_data"] = json.dumps(
+                                record["extracted_data"], ensure_ascii=False, default=_json_default
+                            )
+                writer.write_table(pa.Table.from_pylist(records, schema=schema))
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
+
+# 创建全局导出器实例
+candidate_exporter = CandidateExporter()
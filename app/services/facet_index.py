@@ -0,0 +1,394 @@
+import logging
+import threading
+import time
+from array import array
+import heapq
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.candidate import Candidate
+from app.models.candidate_skill import normalize_skill
+
+logger = logging.getLogger("app.services.facet_index")
+
+# 每个容器覆盖 2^16 个候选人ID，空容器不存储（类似Roaring Bitmap的分块思路）
+CHUNK_BITS = 16
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# 工作年限按年分桶，达到上限的统一放入最后一个桶
+EXPERIENCE_CAP = 50
+
+# 工作年限分面区间（左闭右开），与 /api/filters/suggestions 的 experience_ranges 一致
+EXPERIENCE_RANGES = [
+    {"label": "应届生", "min": 0, "max": 1},
+    {"label": "1-3年", "min": 1, "max": 3},
+    {"label": "3-5年", "min": 3, "max": 5},
+    {"label": "5-10年", "min": 5, "max": 10},
+    {"label": "10年以上", "min": 10, "max": None}
+]
+
+# 教育层次词表，与 /api/filters/suggestions 保持一致；
+# 候选人教育背景包含某个词即属于该层次（与SQL的contains语义相同）
+EDUCATION_LEVELS = ["高中", "大专", "本科", "硕士", "博士"]
+
+if hasattr(int, "bit_count"):
+    def _popcount(value: int) -> int:
+        return value.bit_count()
+else:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+class Bitmap:
+    """分块压缩位图：ID按高16位分块，每块用Python整数存储低16位"""
+
+    __slots__ = ("_chunks",)
+
+    def __init__(self, chunks: Optional[Dict[int, int]] = None):
+        self._chunks = chunks if chunks is not None else {}
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "Bitmap":
+        """从ID批量构建位图"""
+        buffers: Dict[int, bytearray] = {}
+        for i in ids:
+            key, low = i >> CHUNK_BITS, i & CHUNK_MASK
+            buf = buffers.get(key)
+            if buf is None:
+                buf = buffers[key] = bytearray(1 << (CHUNK_BITS - 3))
+            buf[low >> 3] |= 1 << (low & 7)
+        return cls({key: int.from_bytes(buf, "little") for key, buf in buffers.items()})
+
+    def add(self, i: int) -> None:
+        key = i >> CHUNK_BITS
+        self._chunks[key] = self._chunks.get(key, 0) | (1 << (i & CHUNK_MASK))
+
+    def discard(self, i: int) -> None:
+        key = i >> CHUNK_BITS
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return
+        chunk &= ~(1 << (i & CHUNK_MASK))
+        if chunk:
+            self._chunks[key] = chunk
+        else:
+            del self._chunks[key]
+
+    def __contains__(self, i: int) -> bool:
+        return bool(self._chunks.get(i >> CHUNK_BITS, 0) >> (i & CHUNK_MASK) & 1)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        small, large = sorted((self._chunks, other._chunks), key=len)
+        chunks = {}
+        for key, chunk in small.items():
+            merged = chunk & large.get(key, 0)
+            if merged:
+                chunks[key] = merged
+        return Bitmap(chunks)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        chunks = dict(self._chunks)
+        for key, chunk in other._chunks.items():
+            chunks[key] = chunks.get(key, 0) | chunk
+        return Bitmap(chunks)
+
+    def __len__(self) -> int:
+        return sum(_popcount(chunk) for chunk in self._chunks.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for key in sorted(self._chunks):
+            chunk = self._chunks[key]
+            base = key << CHUNK_BITS
+            while chunk:
+                lowest = chunk & -chunk
+                yield base + lowest.bit_length() - 1
+                chunk ^= lowest
+
+    def slice(self, skip: int = 0, limit: int = 100, after: Optional[int] = None) -> List[int]:
+        """按ID升序取出ID大于 after 的第 skip 个起的 limit 个ID，整块跳过不需要的容器"""
+        result: List[int] = []
+        for key in sorted(self._chunks):
+            chunk = self._chunks[key]
+            if after is not None:
+                after_key = after >> CHUNK_BITS
+                if key < after_key:
+                    continue
+                if key == after_key:
+                    chunk &= ~((2 << (after & CHUNK_MASK)) - 1)
+            if skip:
+                size = _popcount(chunk)
+                if size <= skip:
+                    skip -= size
+                    continue
+            base = key << CHUNK_BITS
+            while chunk and len(result) < limit:
+                lowest = chunk & -chunk
+                chunk ^= lowest
+                if skip:
+                    skip -= 1
+                    continue
+                result.append(base + lowest.bit_length() - 1)
+            if len(result) >= limit:
+                break
+        return result
+
+
+def _union(bitmaps: Iterable[Bitmap]) -> Bitmap:
+    result = Bitmap()
+    for bitmap in bitmaps:
+        result = result | bitmap
+    return result
+
+
+class FacetIndex:
+    """候选人分面位图索引
+
+    为状态、技能、工作年限（按年分桶）和教育层次的每个取值维护一个位图，
+    多条件筛选在内存中求位图交集，SQL只用于取回当前页的候选人。
+    索引是进程内的，由CandidateCRUD的写操作增量维护。
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.ready = False
+        # 每次写入递增，供分面计数等缓存判断是否失效（索引未启用时同样递增）
+        self.generation = 0
+        self._skill_sizes = (-1, [])
+        self._reset()
+
+    def _reset(self) -> None:
+        self._all = Bitmap()
+        self._status: Dict[str, Bitmap] = {}
+        self._skills: Dict[str, Bitmap] = {}
+        self._experience: Dict[int, Bitmap] = {}
+        self._education: Dict[str, Bitmap] = {}
+
+    @staticmethod
+    def _experience_bucket(years: Optional[int]) -> Optional[int]:
+        if years is None or years < 0:
+            return None
+        return min(years, EXPERIENCE_CAP)
+
+    @staticmethod
+    def _education_levels(education: Optional[str]) -> List[str]:
+        if not education:
+            return []
+        return [level for level in EDUCATION_LEVELS if level in education]
+
+    def _facet_values(self, status, skills, experience_years, education):
+        """计算一个候选人所属的各分面取值"""
+        return (
+            status,
+            {normalize_skill(s) for s in (skills or []) if s and s.strip()},
+            self._experience_bucket(experience_years),
+            self._education_levels(education),
+        )
+
+    def build(self, db: Session, batch_size: int = 10000) -> None:
+        """从candidates表全量构建索引"""
+        start = time.time()
+        all_ids = array("q")
+        status_ids: Dict[str, array] = {}
+        skill_ids: Dict[str, array] = {}
+        experience_ids: Dict[int, array] = {}
+        education_ids: Dict[str, array] = {}
+
+        rows = db.execute(
+            select(
+                Candidate.id, Candidate.status, Candidate.skills,
+                Candidate.experience_years, Candidate.education
+            )
+        ).yield_per(batch_size)
+        for candidate_id, status, skills, experience_years, education in rows:
+            all_ids.append(candidate_id)
+            status, skills, bucket, levels = self._facet_values(
+                status, skills, experience_years, education
+            )
+            if status:
+                status_ids.setdefault(status, array("q")).append(candidate_id)
+            for skill in skills:
+                skill_ids.setdefault(skill, array("q")).append(candidate_id)
+            if bucket is not None:
+                experience_ids.setdefault(bucket, array("q")).append(candidate_id)
+            for level in levels:
+                education_ids.setdefault(level, array("q")).append(candidate_id)
+
+        with self._lock:
+            self._all = Bitmap.from_ids(all_ids)
+            self._status = {k: Bitmap.from_ids(v) for k, v in status_ids.items()}
+            self._skills = {k: Bitmap.from_ids(v) for k, v in skill_ids.items()}
+            self._experience = {k: Bitmap.from_ids(v) for k, v in experience_ids.items()}
+            self._education = {k: Bitmap.from_ids(v) for k, v in education_ids.items()}
+            self.generation += 1
+            self.ready = True
+
+        logger.info(
+            f"分面索引构建完成: {len(all_ids)} 个候选人, {len(skill_ids)} 个技能, "
+            f"耗时 {time.time() - start:.2f}s"
+        )
+
+    def _discard(self, candidate_id: int) -> None:
+        self._all.discard(candidate_id)
+        for facet in (self._status, self._skills, self._experience, self._education):
+            for bitmap in facet.values():
+                bitmap.discard(candidate_id)
+
+    def update(self, candidate: Candidate) -> None:
+        """候选人新增或修改后更新其所在的位图"""
+        if not self.ready:
+            self.generation += 1
+            return
+        status, skills, bucket, levels = self._facet_values(
+            candidate.status, candidate.skills, candidate.experience_years, candidate.education
+        )
+        with self._lock:
+            self._discard(candidate.id)
+            self._all.add(candidate.id)
+            if status:
+                self._status.setdefault(status, Bitmap()).add(candidate.id)
+            for skill in skills:
+                self._skills.setdefault(skill, Bitmap()).add(candidate.id)
+            if bucket is not None:
+                self._experience.setdefault(bucket, Bitmap()).add(candidate.id)
+            for level in levels:
+                self._education.setdefault(level, Bitmap()).add(candidate.id)
+            self.generation += 1
+
+    def remove(self, candidate_id: int) -> None:
+        """候选人删除后从所有位图中移除"""
+        if not self.ready:
+            self.generation += 1
+            return
+        with self._lock:
+            self._discard(candidate_id)
+            self.generation += 1
+
+    def count(self) -> int:
+        """索引中的候选人总数"""
+        with self._lock:
+            return len(self._all)
+
+    def can_answer(
+        self,
+        *,
+        keywords: Optional[List[str]] = None,
+        education: Optional[str] = None,
+        min_experience: Optional[int] = None,
+        max_experience: Optional[int] = None
+    ) -> bool:
+        """判断筛选条件是否能完全由位图回答"""
+        if not self.ready or keywords:
+            return False
+        if education and education not in EDUCATION_LEVELS:
+            return False
+        # 上限桶内的具体年限不可区分
+        if min_experience is not None and min_experience > EXPERIENCE_CAP:
+            return False
+        if max_experience is not None and max_experience >= EXPERIENCE_CAP:
+            return False
+        return True
+
+    def match(
+        self,
+        *,
+        status: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        skill_match: str = "all",
+        min_experience: Optional[int] = None,
+        max_experience: Optional[int] = None,
+        education: Optional[str] = None
+    ) -> Bitmap:
+        """求满足筛选条件的候选人位图（调用前应先检查 can_answer）"""
+        empty = Bitmap()
+        with self._lock:
+            result = Bitmap(dict(self._all._chunks))
+
+            if status:
+                result = result & self._status.get(status, empty)
+
+            normalized = {normalize_skill(s) for s in (skills or []) if s and s.strip()}
+            if normalized:
+                if skill_match == "any":
+                    result = result & _union(self._skills.get(s, empty) for s in normalized)
+                else:
+                    # 从最小的位图开始求交集
+                    for bitmap in sorted((self._skills.get(s, empty) for s in normalized), key=len):
+                        result = result & bitmap
+
+            if min_experience is not None or max_experience is not None:
+                low = max(min_experience or 0, 0)
+                high = EXPERIENCE_CAP if max_experience is None else max_experience
+                result = result & _union(
+                    bitmap for bucket, bitmap in self._experience.items() if low <= bucket <= high
+                )
+
+            if education:
+                result = result & self._education.get(education, empty)
+
+            return result
+
+    def _sorted_skill_sizes(self) -> List[tuple]:
+        """按全局人数降序排列的 (人数, 技能)，按generation缓存"""
+        generation, sizes = self._skill_sizes
+        if generation != self.generation:
+            sizes = sorted(
+                ((len(bitmap), skill) for skill, bitmap in self._skills.items()),
+                key=lambda item: (-item[0], item[1])
+            )
+            self._skill_sizes = (self.generation, sizes)
+        return sizes
+
+    def facet_counts(self, matched: Bitmap, skill_limit: int = 50) -> Dict[str, Any]:
+        """统计筛选结果在各分面取值上的人数"""
+        empty = Bitmap()
+        with self._lock:
+            status_counts = ((value, len(bitmap & matched)) for value, bitmap in self._status.items())
+            status = [
+                {"value": value, "count": count}
+                for value, count in sorted(status_counts, key=lambda item: -item[1])
+                if count
+            ]
+
+            experience = []
+            for bucket_range in EXPERIENCE_RANGES:
+                high = EXPERIENCE_CAP if bucket_range["max"] is None else bucket_range["max"] - 1
+                bucket = _union(
+                    bitmap for years, bitmap in self._experience.items()
+                    if bucket_range["min"] <= years <= high
+                )
+                experience.append({**bucket_range, "count": len(bucket & matched)})
+
+            education = [
+                {"value": level, "count": len(self._education.get(level, empty) & matched)}
+                for level in EDUCATION_LEVELS
+            ]
+
+            # 技能取值很多：按全局人数降序遍历，全局人数不超过当前第K名时即可停止
+            top_skills: List[tuple] = []
+            for size, skill in self._sorted_skill_sizes():
+                if len(top_skills) >= skill_limit and size <= top_skills[0][0]:
+                    break
+                count = len(self._skills[skill] & matched)
+                if not count:
+                    continue
+                if len(top_skills) < skill_limit:
+                    heapq.heappush(top_skills, (count, skill))
+                elif count > top_skills[0][0]:
+                    heapq.heapreplace(top_skills, (count, skill))
+            skills = [
+                {"value": skill, "count": count}
+                for count, skill in sorted(top_skills, key=lambda item: (-item[0], item[1]))
+            ]
+
+            return {
+                "total": len(matched),
+                "status": status,
+                "skills": skills,
+                "experience": experience,
+                "education": education
+            }
+
+
+# 创建索引实例
+facet_index = FacetIndex()
@@ -0,0 +1,48 @@
+from typing import Any, Dict
+from sqlalchemy.orm import Session
+
+from app.crud.candidate import candidate_crud
+from app.schemas.candidate import FilterRequest
+from app.services.facet_index import facet_index
+from app.services.query_cache import normalize_filter_params, query_cache
+
+class FacetService:
+    """分面计数服务：优先用位图索引计数，否则走SQL聚合；结果存入查询缓存"""
+    
+    def _compute(self, db: Session, filter_request: FilterRequest, skill_limit: int) -> Dict[str, Any]:
+        filters = dict(
+            keywords=filter_request.keywords,
+            education=filter_request.education,
+            min_experience=filter_request.min_experience,
+            max_experience=filter_request.max_experience,
+            skills=filter_request.skills,
+            skill_match=filter_request.skill_match,
+            status=filter_request.status,
+            tags=filter_request.tags
+        )
+        # 标签不在位图索引中，带标签条件时走SQL
+        if not filter_request.tags and facet_index.can_answer(
+            keywords=filter_request.keywords,
+            education=filter_request.education,
+            min_experience=filter_request.min_experience,
+            max_experience=filter_request.max_experience
+        ):
+            filters.pop("keywords")
+            filters.pop("tags")
+            matched = facet_index.match(**filters)
+            return facet_index.facet_counts(matched, skill_limit=skill_limit)
+        return candidate_crud.facet_counts(db, skill_limit=skill_limit, **filters)
+    
+    def get_counts(self, db: Session, filter_request: FilterRequest, skill_limit: int = 50) -> Dict[str, Any]:
+        """获取当前筛选条件下的分面计数"""
+        params = normalize_filter_params(filter_request)
+        # 分面计数不使用模糊匹配
+        params.pop("fuzzy")
+        params.pop("fuzzy_threshold")
+        params["skill_limit"] = skill_limit
+        return query_cache.get_or_compute(
+            "facets", params, lambda: self._compute(db, filter_request, skill_limit)
+        )
+
+# 创建服务实例
+facet_service = FacetService()
@@ -1,56 +1,151 @@
+import asyncio
+import hashlib
+import logging
 import os
 import uuid
-from typing import List, Tuple, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple
 from fastapi import UploadFile
 from app.core.config import settings
+from app.services.storage import StorageBackend, create_storage_backend
+
+logger = logging.getLogger("app.services.file")
+
+# 上传时每次读取的字节数
+CHUNK_SIZE = 1024 * 1024
+
+class StagedFile(NamedTuple):
+    """已写入暂存区、尚未放入内容存储的上传文件"""
+    temp_path: str
+    file_path: str  # 放入存储后的位置，如 uploads/ab/cd/<sha256> 或 s3://bucket/ab/cd/<sha256>
+    file_size: int
+    content_hash: str
 
 class FileService:
-    """文件处理服务"""
-    
-    def __init__(self):
+    """文件处理服务
+
+    上传文件按内容寻址存放在存储后端的 ab/cd/<sha256>（两级目录各256个分片），
+    相同内容只存一份。上传先写入本地暂存区并计算哈希，数据库中登记引用后
+    再放入存储，避免与删除最后一个引用时的清理相互覆盖。
+    存储后端由 STORAGE_BACKEND 配置：本地目录或S3兼容的对象存储。
+    """
+
+    def __init__(self, storage: Optional[StorageBackend] = None):
         self.upload_dir = settings.UPLOAD_DIR
-        os.makedirs(self.upload_dir, exist_ok=True)
-    
+        self.staging_dir = os.path.join(self.upload_dir, ".staging")
+        os.makedirs(self.staging_dir, exist_ok=True)
+        self.storage = storage or create_storage_backend()
+
     def validate_file(self, file: UploadFile) -> Tuple[bool, str]:
         """验证上传文件"""
         # 检查文件扩展名
         file_ext = os.path.splitext(file.filename)[1].lower()
         if file_ext not in settings.ALLOWED_EXTENSIONS:
             return False, f"不支持的文件格式: {file_ext}"
-        
+
         # 检查文件大小（这里需要读取内容，所以在实际保存时再检查）
         return True, "文件验证通过"
-    
-    async def save_file(self, file: UploadFile) -> Tuple[str, int]:
-        """保存上传的文件"""
+
+    def blob_key(self, content_hash: str) -> str:
+        """内容哈希对应的存储键"""
+        return f"{content_hash[:2]}/{content_hash[2:4]}/{content_hash}"
+
+    def blob_path(self, content_hash: str) -> str:
+        """内容哈希对应的存储位置（记录在 resumes.file_path 中）"""
+        return self.storage.location(self.blob_key(content_hash))
+
+    def remote_key(self, file_path: Optional[str], content_hash: Optional[str]) -> Optional[str]:
+        """文件在当前存储后端且不在本机时返回存储键，本地文件返回None"""
+        if not content_hash or file_path != self.blob_path(content_hash):
+            return None
+        key = self.blob_key(content_hash)
+        return None if self.storage.local_path(key) else key
+
+    async def stage_file(self, file: UploadFile) -> StagedFile:
+        """分块读取上传文件写入暂存区，同时计算SHA-256并检查大小"""
+        os.makedirs(self.staging_dir, exist_ok=True)
+        temp_path = os.path.join(self.staging_dir, f"{uuid.uuid4()}.part")
+        digest = hashlib.sha256()
+        file_size = 0
         try:
-            # 生成唯一文件名
-            file_ext = os.path.splitext(file.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_ext}"
-            file_path = os.path.join(self.upload_dir, unique_filename)
-            
-            # 保存文件并计算大小
-            content = await file.read()
-            file_size = len(content)
-            
-            # 检查文件大小
-            if file_size > settings.MAX_FILE_SIZE:
-                raise ValueError(f"文件大小超出限制: {file_size} > {settings.MAX_FILE_SIZE}")
-            
-            # 确保上传目录存在
-            os.makedirs(self.upload_dir, exist_ok=True)
-            
-            with open(file_path, "wb") as f:
-                f.write(content)
-            
-            return file_path, file_size
+            with open(temp_path, "wb") as f:
+                while True:
+                    chunk = await file.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    file_size += len(chunk)
+                    # 检查文件大小
+                    if file_size > settings.MAX_FILE_SIZE:
+                        raise ValueError(f"文件大小超出限制: {file_size} > {settings.MAX_FILE_SIZE}")
+                    digest.update(chunk)
+                    f.write(chunk)
         except Exception as e:
-            # 记录详细错误信息并重新抛出
-            import logging
-            logger = logging.getLogger("app.services.file")
-            logger.error(f"保存文件失败: {file.filename}, 错误: {str(e)}", exc_info=True)
+            self._remove(temp_path)
+            if not isinstance(e, ValueError):
+                logger.error(f"保存文件失败: {file.filename}, 错误: {str(e)}", exc_info=True)
+            raise
+
+        content_hash = digest.hexdigest()
+        return StagedFile(temp_path, self.blob_path(content_hash), file_size, content_hash)
+
+    async def commit_staged(self, staged: StagedFile) -> str:
+        """把暂存文件放入存储，返回存储位置
+
+        相同内容已存在时也重新写入（内容相同，覆盖是幂等的）：先判断存在再跳过写入，
+        判断之后文件仍可能被删除最后一个引用时的清理删掉，刚登记的引用就会指向缺失的文件。
+        大文件在S3后端上分片上传。
+        """
+        key = self.blob_key(staged.content_hash)
+        try:
+            await self.storage.put_file(key, staged.temp_path, move=True)
+        except Exception:
+            self._remove(staged.temp_path)
             raise
-    
+        return staged.file_path
+
+    @asynccontextmanager
+    async def open_local(self, file_path: str, content_hash: Optional[str] = None) -> AsyncIterator[str]:
+        """得到可以直接读取的本地路径：远程对象下载到暂存区，用完后删除"""
+        key = self.remote_key(file_path, content_hash)
+        if key is None:
+            yield file_path
+            return
+        os.makedirs(self.staging_dir, exist_ok=True)
+        temp_path = os.path.join(self.staging_dir, f"{uuid.uuid4()}.download")
+        try:
+            await self.storage.download_to(key, temp_path)
+            yield temp_path
+        finally:
+            self._remove(temp_path)
+
+    def discard_staged(self, staged: StagedFile) -> None:
+        """丢弃未使用的暂存文件"""
+        self._remove(staged.temp_path)
+
+    @property
+    def stores_locally(self) -> bool:
+        """存储后端是否在本机文件系统上"""
+        return self.storage.local_path(self.blob_key("0" * 64)) is not None
+
+    def delete_blobs(self, content_hashes: List[str]) -> int:
+        """删除已无引用的文件，返回删除的数量
+
+        由同步的CRUD调用：本地文件直接删除；远程对象在当前线程中批量删除，
+        需要等待网络，不能在事件循环线程中调用。
+        """
+        keys = [self.blob_key(content_hash) for content_hash in content_hashes]
+        if not keys:
+            return 0
+        if self.stores_locally:
+            return sum(self.delete_file(self.storage.local_path(key)) for key in keys)
+        try:
+            removed = asyncio.run(self.storage.delete_many(keys))
+        except Exception:
+            logger.error(f"删除存储对象失败: {keys}", exc_info=True)
+            return 0
+        logger.info(f"已删除 {removed} 个无引用的存储对象")
+        return removed
+
     def delete_file(self, file_path: str) -> bool:
         """删除文件"""
         try:
@@ -61,5 +156,11 @@ class FileService:
         except Exception:
             return False
 
+    def _remove(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
 # 创建服务实例
 file_service = FileService()
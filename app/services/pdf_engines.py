@@ -0,0 +1,149 @@
+import logging
+import threading
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.pdf_engines")
+
+class PdfText(NamedTuple):
+    """一次PDF文本提取的结果"""
+    text: str
+    engine: str
+    pages: int
+    quality: float
+
+class PdfEngine:
+    """PDF文本提取引擎接口，依赖的库未安装时 available() 为False"""
+
+    name = "base"
+    module = ""
+
+    def available(self) -> bool:
+        try:
+            __import__(self.module)
+        except ImportError:
+            return False
+        return True
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        """逐页提取文本"""
+        raise NotImplementedError
+
+class PyPDF2Engine(PdfEngine):
+    """PyPDF2：纯Python，较慢，缺少ToUnicode映射的中文字体容易乱码"""
+
+    name = "pypdf2"
+    module = "PyPDF2"
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        import PyPDF2
+        with open(file_path, "rb") as file:
+            reader = PyPDF2.PdfReader(file)
+            return [page.extract_text() or "" for page in reader.pages]
+
+class PdfiumEngine(PdfEngine):
+    """pypdfium2：PDFium的绑定，速度快、内存占用低，中文提取准确
+
+    PDFium不是线程安全的，同一进程内的调用串行执行。
+    """
+
+    name = "pdfium"
+    module = "pypdfium2"
+    _lock = threading.Lock()
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        import pypdfium2 as pdfium
+        with self._lock:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                pages = []
+                for index in range(len(pdf)):
+                    page = pdf[index]
+                    textpage = page.get_textpage()
+                    try:
+                        pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+                    finally:
+                        textpage.close()
+                        page.close()
+                return pages
+            finally:
+                pdf.close()
+
+class PdfminerEngine(PdfEngine):
+    """pdfminer.six：纯Python，最慢，按版面分析还原阅读顺序，多栏排版效果较好"""
+
+    name = "pdfminer"
+    module = "pdfminer"
+
+    def extract_pages(self, file_path: str) -> List[str]:
+        from pdfminer.high_level import extract_text
+        # 页与页之间以换页符分隔
+        pages = extract_text(file_path).split("\f")
+        if len(pages) > 1 and not pages[-1].strip():
+            pages.pop()
+        return pages
+
+PDF_ENGINES: Dict[str, PdfEngine] = {
+    engine.name: engine for engine in (PdfiumEngine(), PdfminerEngine(), PyPDF2Engine())
+}
+
+def text_quality(text: str) -> float:
+    """提取结果的质量分（0~1）：非空白字符中可读字符的比例
+
+    替换字符、私用区字符、控制字符以及pdfminer输出的 (cid:N) 占位都算作乱码。
+    """
+    cid_chars = text.count("(cid:") * 6
+    chars = [ch for ch in text if not ch.isspace()]
+    if not chars:
+        return 0.0
+    bad = cid_chars
+    for ch in chars:
+        if ch == "\ufffd" or unicodedata.category(ch) in ("Co", "Cc", "Cs", "Cn"):
+            bad += 1
+    return max(0.0, 1 - bad / len(chars))
+
+class PdfTextExtractor:
+    """按策略为每个文件选择PDF引擎
+
+    依次尝试 PDF_ENGINES 中已安装的引擎，第一个质量分不低于 PDF_MIN_TEXT_QUALITY
+    且有文本的结果直接采用；都不满足时（扫描件、字体映射缺失等）采用质量分最高的结果。
+    """
+
+    def __init__(self, engines: Optional[Sequence[str]] = None):
+        self._engines = engines
+
+    def engines(self) -> List[PdfEngine]:
+        names = self._engines or settings.PDF_ENGINES
+        unknown = [name for name in names if name not in PDF_ENGINES]
+        if unknown:
+            raise ValueError(f"未知的PDF引擎: {', '.join(unknown)}")
+        return [PDF_ENGINES[name] for name in names if PDF_ENGINES[name].available()]
+
+    def extract(self, file_path: str) -> PdfText:
+        engines = self.engines()
+        if not engines:
+            raise ValueError("没有可用的PDF引擎")
+        best: Optional[PdfText] = None
+        errors = []
+        for engine in engines:
+            try:
+                pages = engine.extract_pages(file_path)
+            except Exception as e:
+                logger.warning(f"PDF引擎 {engine.name} 提取失败: {file_path}, 错误: {str(e)}")
+                errors.append(f"{engine.name}: {str(e)}")
+                continue
+            text = "\n".join(page.strip() for page in pages).strip()
+            result = PdfText(text, engine.name, len(pages), round(text_quality(text), 4))
+            if text and result.quality >= settings.PDF_MIN_TEXT_QUALITY:
+                return result
+            logger.info(f"PDF引擎 {engine.name} 结果质量不足: {file_path}, 质量分 {result.quality}, {len(text)} 字符")
+            if best is None or (result.quality, len(text)) > (best.quality, len(best.text)):
+                best = result
+        if best is None:
+            raise ValueError("; ".join(errors))
+        return best
+
+# 创建提取器实例
+pdf_text_extractor = PdfTextExtractor()
@@ -0,0 +1,117 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from app.core.config import settings
+from app.models.candidate_skill import normalize_skill
+from app.models.candidate_tag import normalize_tag
+from app.schemas.candidate import FilterRequest
+
+def normalize_filter_params(filter_request: FilterRequest) -> Dict[str, Any]:
+    """将筛选条件规范化为缓存参数，语义相同的请求得到相同的键"""
+    return {
+        "keywords": sorted({k.strip() for k in filter_request.keywords or [] if k and k.strip()}),
+        "education": filter_request.education,
+        "min_experience": filter_request.min_experience,
+        "max_experience": filter_request.max_experience,
+        "skills": sorted({normalize_skill(s) for s in filter_request.skills or [] if s and s.strip()}),
+        "skill_match": filter_request.skill_match,
+        "status": filter_request.status,
+        "tags": sorted({normalize_tag(t) for t in filter_request.tags or [] if t and t.strip()}),
+        "fuzzy": filter_request.fuzzy,
+        "fuzzy_threshold": filter_request.fuzzy_threshold,
+    }
+
+class QueryCache:
+    """查询结果缓存（按写入代数失效的LRU）
+    
+    缓存键为 (命名空间, 规范化参数)。候选人数据每次写入都会调用 invalidate()
+    使代数加一并清空缓存；计算开始后发生写入的结果不会被写回缓存。
+    """
+    
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._entries: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> Tuple[str, str]:
+        """参数按键排序序列化，调用方负责先规范化取值（去空白、去重排序等）"""
+        return namespace, json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    
+    def _lookup(self, key: Tuple[str, str]) -> Tuple[bool, Any, int]:
+        """返回 (是否命中, 缓存值, 当前代数)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key], self.generation
+            self.misses += 1
+            return False, None, self.generation
+    
+    def _store(self, key: Tuple[str, str], value: Any, generation: int) -> None:
+        with self._lock:
+            # 计算期间数据已变化，结果可能过期，不写回
+            if generation == self.generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+    
+    def get_or_compute(self, namespace: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """命中时直接返回缓存结果，否则计算并写入"""
+        if self.max_entries <= 0:
+            return compute()
+        key = self.make_key(namespace, params)
+        hit, value, generation = self._lookup(key)
+        if hit:
+            return value
+        value = compute()
+        self._store(key, value, generation)
+        return value
+    
+    async def aget_or_compute(
+        self, namespace: str, params: Dict[str, Any], compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """get_or_compute 的异步版本，compute 为协程函数"""
+        if self.max_entries <= 0:
+            return await compute()
+        key = self.make_key(namespace, params)
+        hit, value, generation = self._lookup(key)
+        if hit:
+            return value
+        value = await compute()
+        self._store(key, value, generation)
+        return value
+    
+    def invalidate(self) -> None:
+        """数据写入后调用：代数加一并丢弃所有缓存结果"""
+        with self._lock:
+            self.generation += 1
+            self.invalidations += 1
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """命中率等运行指标"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+# 创建缓存实例
+query_cache = QueryCache(max_entries=settings.QUERY_CACHE_MAX_ENTRIES)
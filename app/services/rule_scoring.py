@@ -0,0 +1,407 @@
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.candidate_skill import CandidateSkill, normalize_skill
+from app.services.facet_index import EDUCATION_LEVELS
+from app.services.query_cache import query_cache
+
+logger = logging.getLogger("app.services.rule_scoring")
+
+# 各维度满分权重（总分100）；条件中未出现的维度不计分，其余按比例放大
+WEIGHTS = {
+    "skills": 40.0,
+    "experience": 25.0,
+    "education": 15.0,
+    "position": 12.0,
+    "company": 8.0,
+}
+
+# 教育层次别名，按 EDUCATION_LEVELS 的顺序从低到高
+EDUCATION_ALIASES = {
+    "高中": ["高中", "中专"],
+    "大专": ["大专", "专科", "associate"],
+    "本科": ["本科", "学士", "bachelor"],
+    "硕士": ["硕士", "研究生", "master", "mba"],
+    "博士": ["博士", "phd", "ph.d", "doctor"],
+}
+
+# 低于最低年限时每差一年扣去的比例；高于最高年限时按超出比例衰减
+EXPERIENCE_SHORTFALL_PENALTY = 0.25
+
+_CJK_RUN = re.compile(r"[一-鿿]+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def education_level(text: Optional[str]) -> int:
+    """返回教育背景对应的最高层次下标，无法识别时为 -1"""
+    text = (text or "").lower()
+    level = -1
+    for i, name in enumerate(EDUCATION_LEVELS):
+        if any(alias in text for alias in EDUCATION_ALIASES.get(name, [name])):
+            level = i
+    return level
+
+
+def text_tokens(text: Optional[str]) -> List[str]:
+    """职位/公司文本切词：英文按词，中文按字二元组（单字保留原字）"""
+    text = (text or "").lower()
+    tokens = [word.rstrip(".") for word in _WORD.findall(text)]
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return list(dict.fromkeys(tokens))
+
+
+def _encode(values: Iterable[Any]) -> Tuple[List[Any], np.ndarray]:
+    """将取值编码为整数（按首次出现顺序），返回 (取值表, 编码数组)"""
+    vocab: Dict[Any, int] = {}
+    codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int64)
+    return list(vocab), codes
+
+
+def _group_rows(codes: np.ndarray, rows: np.ndarray, size: int) -> List[np.ndarray]:
+    """按编码分组行号，每组内行号升序"""
+    order = np.lexsort((rows, codes))
+    bounds = np.searchsorted(codes[order], np.arange(size + 1))
+    rows = rows[order].astype(np.int32)
+    return [rows[bounds[i]:bounds[i + 1]] for i in range(size)]
+
+
+class CandidateSnapshot:
+    """候选人列式快照：数值列为NumPy数组，技能和职位/公司词为行号倒排表"""
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        experience: np.ndarray,
+        education: np.ndarray,
+        skills: Dict[str, np.ndarray],
+        positions: Dict[str, np.ndarray],
+        companies: Dict[str, np.ndarray],
+        generation: int = 0
+    ):
+        self.ids = ids
+        self.experience = experience
+        self.education = education
+        self.skills = skills
+        self.positions = positions
+        self.companies = companies
+        self.generation = generation
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _text_postings(values: List[Optional[str]]) -> Dict[str, np.ndarray]:
+        """相同文本只切词一次，再展开为行号倒排表"""
+        if not values:
+            return {}
+        unique, codes = _encode(v or "" for v in values)
+        groups = _group_rows(codes, np.arange(len(codes)), len(unique))
+        grouped: Dict[str, List[np.ndarray]] = {}
+        for value, rows in zip(unique, groups):
+            for token in text_tokens(value):
+                grouped.setdefault(token, []).append(rows)
+        return {token: np.sort(np.concatenate(parts)) for token, parts in grouped.items()}
+
+    @classmethod
+    def from_columns(
+        cls,
+        ids: Iterable[int],
+        experience: Iterable[Optional[int]],
+        education: Iterable[Optional[str]],
+        positions: Iterable[Optional[str]],
+        companies: Iterable[Optional[str]],
+        skill_pairs: Tuple[np.ndarray, np.ndarray],
+        generation: int = 0
+    ) -> "CandidateSnapshot":
+        """由列数据构建快照，skill_pairs 为 (candidate_id数组, 规范化技能数组)"""
+        ids = np.asarray(list(ids), dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        ids = ids[order]
+        experience = np.array(
+            [np.nan if e is None else e for e in experience], dtype=np.float32
+        )[order] if len(ids) else np.zeros(0, dtype=np.float32)
+        # 教育背景取值重复度高，按去重后的取值解析层次
+        education_values, education_codes = _encode(education)
+        levels = np.array([education_level(e) for e in education_values] or [-1], dtype=np.int8)
+        education = levels[education_codes][order] if len(ids) else np.zeros(0, dtype=np.int8)
+        positions, companies = list(positions), list(companies)
+        positions = [positions[i] for i in order]
+        companies = [companies[i] for i in order]
+
+        skill_ids, skill_names = skill_pairs
+        rows = np.searchsorted(ids, skill_ids)
+        valid = (rows < len(ids)) & (ids[np.minimum(rows, max(len(ids) - 1, 0))] == skill_ids) \
+            if len(ids) else np.zeros(len(skill_ids), dtype=bool)
+        skill_values, skill_codes = _encode(skill_names[valid])
+        skills = dict(zip(skill_values, _group_rows(skill_codes, rows[valid], len(skill_values))))
+
+        return cls(
+            ids=ids,
+            experience=experience,
+            education=education,
+            skills=skills,
+            positions=cls._text_postings(positions),
+            companies=cls._text_postings(companies),
+            generation=generation
+        )
+
+    @classmethod
+    def load(cls, db: Session, generation: int = 0, batch_size: int = 10000) -> "CandidateSnapshot":
+        """从数据库读取全部候选人构建快照"""
+        ids, experience, education, positions, companies = [], [], [], [], []
+        rows = db.execute(
+            select(
+                Candidate.id, Candidate.experience_years, Candidate.education,
+                Candidate.current_position, Candidate.current_company
+            )
+        ).yield_per(batch_size)
+        for candidate_id, years, edu, position, company in rows:
+            ids.append(candidate_id)
+            experience.append(years)
+            education.append(edu)
+            positions.append(position)
+            companies.append(company)
+
+        pairs = db.execute(select(CandidateSkill.candidate_id, CandidateSkill.skill_normalized)).all()
+        skill_pairs = (
+            np.array([p[0] for p in pairs], dtype=np.int64),
+            np.array([p[1] for p in pairs], dtype=object),
+        )
+        return cls.from_columns(ids, experience, education, positions, companies, skill_pairs, generation)
+
+
+class RuleCriteria:
+    """编译后的结构化条件（与 optimize_filter_criteria 的输出结构一致）"""
+
+    def __init__(self, criteria: Dict[str, Any]):
+        self.skills = sorted({normalize_skill(s) for s in criteria.get("skills") or [] if s and str(s).strip()})
+        self.min_experience = criteria.get("min_experience")
+        self.max_experience = criteria.get("max_experience")
+        self.education_level = education_level(criteria.get("education"))
+        keywords = [k for k in criteria.get("keywords") or [] if k and str(k).strip()]
+        # 通用关键词同时在职位和公司上匹配
+        self.position_keywords = [k for k in criteria.get("position_keywords") or [] if k and str(k).strip()] + keywords
+        self.company_keywords = [k for k in criteria.get("company_keywords") or [] if k and str(k).strip()] + keywords
+
+    def active_weights(self) -> Dict[str, float]:
+        """只保留条件中出现的维度，并缩放到总分100"""
+        active = {}
+        if self.skills:
+            active["skills"] = WEIGHTS["skills"]
+        if self.min_experience is not None or self.max_experience is not None:
+            active["experience"] = WEIGHTS["experience"]
+        if self.education_level >= 0:
+            active["education"] = WEIGHTS["education"]
+        if self.position_keywords:
+            active["position"] = WEIGHTS["position"]
+        if self.company_keywords:
+            active["company"] = WEIGHTS["company"]
+        total = sum(active.values())
+        return {k: v * 100.0 / total for k, v in active.items()} if total else {}
+
+
+class SnapshotNotReady(RuntimeError):
+    """评分快照尚未构建完成"""
+
+
+class RuleScoringEngine:
+    """基于规则的候选人评分（不调用LLM，结果确定）
+
+    在候选人列式快照上用NumPy向量化计算各维度得分（0-1），按权重合成0-100分。
+    快照在应用启动时构建，数据变化后于后台线程重建，重建期间继续使用旧快照；
+    请求处理中从不同步构建快照。评分是纯CPU计算，异步调用方应放到线程池中执行。
+    本进程的写入通过查询缓存的代数发现；多副本部署时设置 RULE_SCORING_REFRESH_SECONDS，
+    按间隔读取变更日志的最新ID，发现其他副本的写入后同样在后台重建。
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CandidateSnapshot] = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._change_id = 0  # 构建当前快照时变更日志的最新ID
+        self._checked_at = 0.0  # 上次读取变更日志的时间（monotonic）
+
+    # ---------- 快照 ----------
+
+    def rebuild(self, only_if_changed: bool = False) -> CandidateSnapshot:
+        """从数据库构建快照并替换当前快照（启动时或后台线程中调用）
+
+        only_if_changed 为True时，变更日志的最新ID与上次构建时相同则保留当前快照。
+        """
+        from app.crud.change_log import change_log_crud
+        from app.db.database import SessionLocal
+        generation = query_cache.generation
+        db = SessionLocal()
+        try:
+            change_id = change_log_crud.latest_id(db)
+            self._checked_at = time.monotonic()
+            if only_if_changed and self._snapshot is not None and change_id == self._change_id:
+                return self._snapshot
+            start = time.time()
+            snapshot = CandidateSnapshot.load(db, generation=generation)
+        finally:
+            db.close()
+        logger.info(f"评分快照构建完成: {len(snapshot)} 个候选人, 耗时 {time.time() - start:.2f}s")
+        self._snapshot = snapshot
+        self._change_id = change_id
+        return snapshot
+
+    def snapshot(self) -> CandidateSnapshot:
+        """返回当前快照，数据变化后在后台刷新；尚未构建时启动后台构建并抛出 SnapshotNotReady"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self._refresh_in_background()
+            raise SnapshotNotReady("评分快照正在构建，请稍后重试")
+        if snapshot.generation != query_cache.generation:
+            self._refresh_in_background()
+        elif self._change_check_due():
+            self._refresh_in_background(only_if_changed=True)
+        return snapshot
+
+    def _change_check_due(self) -> bool:
+        interval = settings.RULE_SCORING_REFRESH_SECONDS
+        return interval > 0 and time.monotonic() - self._checked_at >= interval
+
+    def _refresh_in_background(self, only_if_changed: bool = False) -> None:
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild(only_if_changed)
+            except Exception as e:
+                logger.error(f"评分快照重建失败: {str(e)}", exc_info=True)
+            finally:
+                self._rebuilding = False
+
+        threading.Thread(target=run, name="rule-scoring-snapshot", daemon=True).start()
+
+    # ---------- 评分 ----------
+
+    @staticmethod
+    def _keyword_score(postings: Dict[str, np.ndarray], keywords: List[str], size: int) -> np.ndarray:
+        """每个关键词按命中词元比例计分，取所有关键词中的最高分"""
+        best = np.zeros(size, dtype=np.float32)
+        for keyword in keywords:
+            tokens = text_tokens(keyword)
+            if not tokens:
+                continue
+            hits = np.zeros(size, dtype=np.float32)
+            for token in tokens:
+                rows = postings.get(token)
+                if rows is not None:
+                    hits[rows] += 1.0
+            np.maximum(best, hits / len(tokens), out=best)
+        return best
+
+    def _experience_score(self, snapshot: CandidateSnapshot, criteria: RuleCriteria) -> np.ndarray:
+        years = snapshot.experience
+        score = np.ones(len(snapshot), dtype=np.float32)
+        if criteria.min_experience is not None:
+            shortfall = np.clip(criteria.min_experience - years, 0, None)
+            score = np.minimum(score, 1.0 - EXPERIENCE_SHORTFALL_PENALTY * shortfall)
+        if criteria.max_experience is not None:
+            excess = np.clip(years - criteria.max_experience, 0, None)
+            score = np.minimum(score, criteria.max_experience / np.maximum(criteria.max_experience + excess, 1e-6))
+        # 工作年限未知的候选人该维度不得分
+        return np.nan_to_num(np.clip(score, 0.0, 1.0), nan=0.0)
+
+    def score_components(self, snapshot: CandidateSnapshot, criteria: RuleCriteria) -> Dict[str, np.ndarray]:
+        """计算各维度得分（0-1）"""
+        size = len(snapshot)
+        components: Dict[str, np.ndarray] = {}
+        weights = criteria.active_weights()
+
+        if "skills" in weights:
+            hits = np.zeros(size, dtype=np.float32)
+            for skill in criteria.skills:
+                rows = snapshot.skills.get(skill)
+                if rows is not None:
+                    hits[rows] += 1.0
+            components["skills"] = hits / len(criteria.skills)
+        if "experience" in weights:
+            components["experience"] = self._experience_score(snapshot, criteria)
+        if "education" in weights:
+            gap = (criteria.education_level - snapshot.education).astype(np.float32)
+            # 达到要求得满分，低一个层次得一半，未知或更低不得分
+            components["education"] = np.where(
+                snapshot.education < 0, 0.0, np.where(gap <= 0, 1.0, np.where(gap == 1, 0.5, 0.0))
+            ).astype(np.float32)
+        if "position" in weights:
+            components["position"] = self._keyword_score(snapshot.positions, criteria.position_keywords, size)
+        if "company" in weights:
+            components["company"] = self._keyword_score(snapshot.companies, criteria.company_keywords, size)
+        return components
+
+    def rank(
+        self,
+        criteria: Dict[str, Any],
+        *,
+        limit: int = 50,
+        min_score: float = 0.0,
+        candidate_ids: Optional[List[int]] = None
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """按规则得分排序，返回 (前limit个结果, 参与评分的候选人数)
+
+        每个结果包含 candidate_id、score（0-100）和各维度得分 breakdown。
+        快照尚未构建完成时抛出 SnapshotNotReady。
+        """
+        snapshot = self.snapshot()
+        compiled = RuleCriteria(criteria)
+        weights = compiled.active_weights()
+        size = len(snapshot)
+
+        mask = None
+        if candidate_ids is not None:
+            wanted = np.unique(np.asarray(candidate_ids, dtype=np.int64))
+            rows = np.searchsorted(snapshot.ids, wanted)
+            found = rows < size
+            rows = rows[found]
+            mask = np.zeros(size, dtype=bool)
+            mask[rows[snapshot.ids[rows] == wanted[found]]] = True
+        scored_count = int(mask.sum()) if mask is not None else size
+        if size == 0 or scored_count == 0:
+            return [], scored_count
+
+        components = self.score_components(snapshot, compiled)
+        total = np.zeros(size, dtype=np.float32)
+        for name, values in components.items():
+            total += weights[name] * values
+        if mask is not None:
+            total[~mask] = -1.0
+        total[total < min_score] = -1.0
+
+        k = min(limit, size)
+        top = np.argpartition(-total, k - 1)[:k]
+        # 同分按候选人ID升序，保证结果稳定
+        top = top[np.lexsort((snapshot.ids[top], -total[top]))]
+        results = []
+        for row in top:
+            if total[row] < 0:
+                continue
+            results.append({
+                "candidate_id": int(snapshot.ids[row]),
+                "score": round(float(total[row]), 2),
+                "breakdown": {
+                    name: round(float(weights[name] * values[row]), 2)
+                    for name, values in components.items()
+                },
+            })
+        return results, scored_count
+
+# 创建服务实例
+rule_scoring = RuleScoringEngine()
@@ -0,0 +1,89 @@
+import logging
+import threading
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.embedding_service import HashingEmbedder
+from app.services.vector_index import IndexLockedError, VectorIndex
+
+logger = logging.getLogger("app.services.semantic_search")
+
+class SemanticSearchService:
+    """简历语义检索服务：入库时向量化，查询时做近似最近邻检索，不调用LLM"""
+    
+    def __init__(self):
+        self.embedder = HashingEmbedder(dim=settings.SEMANTIC_EMBEDDING_DIM)
+        self.index = VectorIndex(
+            settings.VECTOR_INDEX_DIR,
+            dim=settings.SEMANTIC_EMBEDDING_DIM,
+            nprobe=settings.VECTOR_INDEX_NPROBE,
+            train_min=settings.VECTOR_INDEX_TRAIN_MIN
+        )
+        self.ready = False
+        self._training = False
+    
+    def load(self) -> None:
+        """加载向量索引，数据量达到阈值时在后台线程训练IVF
+        
+        索引文件只能由一个进程打开，多worker部署时只有先启动的worker提供语义检索。
+        """
+        if not settings.SEMANTIC_SEARCH_ENABLED:
+            logger.info("语义检索已关闭（SEMANTIC_SEARCH_ENABLED=false），不打开向量索引")
+            return
+        try:
+            self.index.load()
+        except IndexLockedError as e:
+            logger.error(f"{str(e)}，本进程不提供语义检索（向量索引只支持单进程）")
+            return
+        self.ready = True
+        self.maybe_train()
+    
+    def maybe_train(self) -> None:
+        """需要时在后台线程（重新）训练，训练期间查询继续使用旧结构"""
+        if self._training or not self.index.needs_training():
+            return
+        self._training = True
+        
+        def run():
+            try:
+                self.index.train()
+            except Exception as e:
+                logger.error(f"向量索引训练失败: {str(e)}", exc_info=True)
+            finally:
+                self._training = False
+        
+        threading.Thread(target=run, name="vector-index-train", daemon=True).start()
+    
+    def build_document(
+        self,
+        raw_text: Optional[str],
+        current_position: Optional[str] = None,
+        current_company: Optional[str] = None,
+        skills: Optional[List[str]] = None
+    ) -> str:
+        """拼接用于向量化的文本，职位和技能放在前面并重复一次以提高权重"""
+        header = " ".join(filter(None, [current_position, current_company, " ".join(skills or [])]))
+        return "\n".join(filter(None, [header, header, raw_text]))
+    
+    def index_candidate(self, candidate_id: int, document: str) -> None:
+        """向量化并写入候选人文档"""
+        if not self.ready:
+            return
+        self.index.upsert(candidate_id, self.embedder.embed(document))
+        self.maybe_train()
+    
+    def remove_candidate(self, candidate_id: int) -> None:
+        if self.ready:
+            self.index.remove(candidate_id)
+    
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """返回 (candidate_id, 相似度) 列表，相似度为余弦值"""
+        if not self.ready:
+            return []
+        vector = self.embedder.embed(query)
+        if not vector.any():
+            return []
+        return self.index.search(vector, k=limit)
+
+# 创建服务实例
+semantic_search = SemanticSearchService()
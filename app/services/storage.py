@@ -0,0 +1,376 @@
+import logging
+import os
+import shutil
+import uuid
+from typing import AsyncIterator, Iterable, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.services.storage")
+
+# 流式读写每次处理的字节数
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+class StoredObject(NamedTuple):
+    """存储中的一个对象"""
+    key: str
+    size: int
+    modified: float  # 最后修改时间（Unix时间戳）
+
+class StorageBackend:
+    """文件存储后端接口
+
+    对象以键（如 ab/cd/<sha256>）寻址，所有IO方法都是异步的。
+    location 返回记录在数据库中、便于人工定位的对象位置。
+    """
+
+    name = "base"
+
+    def location(self, key: str) -> str:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """对象在本机文件系统上的路径，不在本机时返回None"""
+        return None
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        """对象大小和修改时间，不存在时返回None"""
+        raise NotImplementedError
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """流式写入对象，返回写入的字节数"""
+        raise NotImplementedError
+
+    async def put_file(self, key: str, path: str, move: bool = False) -> None:
+        """写入本地文件，move 为True时写入后删除源文件"""
+        async def read_chunks():
+            with open(path, "rb") as f:
+                while True:
+                    chunk = await run_in_threadpool(f.read, STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        await self.put_stream(key, read_chunks())
+        if move:
+            os.remove(path)
+
+    async def get_stream(
+        self, key: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """流式读取对象，start/end 为闭区间字节范围"""
+        raise NotImplementedError
+        yield b""  # pragma: no cover
+
+    async def download_to(self, key: str, path: str) -> None:
+        """下载对象到本地文件"""
+        with open(path, "wb") as f:
+            async for chunk in self.get_stream(key):
+                await run_in_threadpool(f.write, chunk)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """删除对象（不存在的忽略），返回删除的数量"""
+        raise NotImplementedError
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        """按键的字典序逐个列出对象（分页读取，不一次性加载全部）"""
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    async def presigned_url(
+        self, key: str, *, filename: str, media_type: str, expires: int
+    ) -> Optional[str]:
+        """可直接从存储下载的临时URL，不支持时返回None"""
+        return None
+
+class LocalStorageBackend(StorageBackend):
+    """本地文件系统存储（root/ab/cd/<sha256>）"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def location(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self.location(key)
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            result = await run_in_threadpool(os.stat, self.location(key))
+        except FileNotFoundError:
+            return None
+        return StoredObject(key, result.st_size, result.st_mtime)
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        path = self.location(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{uuid.uuid4().hex}.part"
+        size = 0
+        try:
+            with open(temp, "wb") as f:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    await run_in_threadpool(f.write, chunk)
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return size
+
+    async def put_file(self, key: str, path: str, move: bool = False) -> None:
+        target = self.location(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if move:
+            os.replace(path, target)
+            return
+        temp = f"{target}.{uuid.uuid4().hex}.part"
+        await run_in_threadpool(shutil.copyfile, path, temp)
+        os.replace(temp, target)
+
+    async def get_stream(
+        self, key: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        with open(self.location(key), "rb") as f:
+            if start:
+                f.seek(start)
+            remaining = None if end is None else end - (start or 0) + 1
+            while remaining is None or remaining > 0:
+                size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+                chunk = await run_in_threadpool(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    async def download_to(self, key: str, path: str) -> None:
+        await run_in_threadpool(shutil.copyfile, self.location(key), path)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        def remove_all():
+            removed = 0
+            for key in keys:
+                try:
+                    os.remove(self.location(key))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+            return removed
+        return await run_in_threadpool(remove_all)
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        """遍历两级分片目录，每次只读取一个目录的条目"""
+        def entries(path):
+            try:
+                with os.scandir(path) as it:
+                    return sorted((entry.name, entry.is_dir(), entry.path) for entry in it)
+            except FileNotFoundError:
+                return []
+
+        for first, is_dir, first_path in await run_in_threadpool(entries, self.root):
+            if not is_dir or len(first) != 2:
+                continue
+            for second, is_dir, second_path in await run_in_threadpool(entries, first_path):
+                if not is_dir or len(second) != 2:
+                    continue
+                for name, is_dir, path in await run_in_threadpool(entries, second_path):
+                    key = f"{first}/{second}/{name}"
+                    if is_dir or name.endswith(".part") or not key.startswith(prefix):
+                        continue
+                    try:
+                        result = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield StoredObject(key, result.st_size, result.st_mtime)
+
+class S3StorageBackend(StorageBackend):
+    """S3兼容的对象存储（AWS S3、MinIO等），依赖可选的 aioboto3
+
+    大于阈值的文件分片上传；下载可生成预签名URL，由客户端直接从存储读取。
+    每次操作创建独立的客户端，可以在任意事件循环中使用。
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        *,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunk_size: int = 8 * 1024 * 1024
+    ):
+        try:
+            import aioboto3
+        except ImportError:
+            raise RuntimeError("S3存储需要安装 aioboto3（poetry install -E s3）")
+        self.bucket = bucket
+        self.prefix = prefix
+        self.endpoint_url = endpoint_url
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunk_size = multipart_chunk_size
+        self.session = aioboto3.Session(
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            region_name=region
+        )
+
+    def _client(self):
+        return self.session.client("s3", endpoint_url=self.endpoint_url)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self._object_key(key)}"
+
+    @staticmethod
+    def _is_not_found(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    async def stat(self, key: str) -> Optional[StoredObject]:
+        async with self._client() as s3:
+            try:
+                head = await s3.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            except Exception as e:
+                if self._is_not_found(e):
+                    return None
+                raise
+        return StoredObject(key, head["ContentLength"], head["LastModified"].timestamp())
+
+    async def put_stream(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """不超过阈值时一次 PutObject，否则按分片大小分片上传，失败时中止分片上传"""
+        object_key = self._object_key(key)
+        buffer = bytearray()
+        size = 0
+        upload_id = None
+        parts = []
+        async with self._client() as s3:
+            try:
+                async for chunk in chunks:
+                    buffer.extend(chunk)
+                    size += len(chunk)
+                    if upload_id is None and len(buffer) <= self.multipart_threshold:
+                        continue
+                    if upload_id is None:
+                        upload = await s3.create_multipart_upload(Bucket=self.bucket, Key=object_key)
+                        upload_id = upload["UploadId"]
+                    while len(buffer) >= self.multipart_chunk_size:
+                        part = bytes(buffer[:self.multipart_chunk_size])
+                        del buffer[:self.multipart_chunk_size]
+                        parts.append(await self._upload_part(s3, object_key, upload_id, len(parts) + 1, part))
+
+                if upload_id is None:
+                    await s3.put_object(Bucket=self.bucket, Key=object_key, Body=bytes(buffer))
+                    return size
+                if buffer or not parts:
+                    parts.append(await self._upload_part(s3, object_key, upload_id, len(parts) + 1, bytes(buffer)))
+                await s3.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts}
+                )
+                return size
+            except BaseException:
+                if upload_id is not None:
+                    try:
+                        await s3.abort_multipart_upload(Bucket=self.bucket, Key=object_key, UploadId=upload_id)
+                    except Exception:
+                        logger.warning(f"中止分片上传失败: {object_key}", exc_info=True)
+                raise
+
+    async def _upload_part(self, s3, object_key: str, upload_id: str, number: int, body: bytes) -> dict:
+        response = await s3.upload_part(
+            Bucket=self.bucket, Key=object_key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    async def get_stream(
+        self, key: str, start: Optional[int] = None, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        params = {"Bucket": self.bucket, "Key": self._object_key(key)}
+        if start is not None or end is not None:
+            params["Range"] = f"bytes={start or 0}-{'' if end is None else end}"
+        async with self._client() as s3:
+            response = await s3.get_object(**params)
+            body = response["Body"]
+            try:
+                async for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                body.close()
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        removed = 0
+        async with self._client() as s3:
+            # DeleteObjects 每次最多1000个键
+            for i in range(0, len(keys), 1000):
+                batch = keys[i:i + 1000]
+                response = await s3.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": self._object_key(key)} for key in batch], "Quiet": True}
+                )
+                for error in response.get("Errors", []):
+                    logger.warning(f"删除对象失败: {error.get('Key')}, {error.get('Message')}")
+                removed += len(batch) - len(response.get("Errors", []))
+        return removed
+
+    async def list_objects(self, prefix: str = "") -> AsyncIterator[StoredObject]:
+        async with self._client() as s3:
+            paginator = s3.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self.bucket, Prefix=self._object_key(prefix)):
+                for item in page.get("Contents", []):
+                    yield StoredObject(
+                        item["Key"][len(self.prefix):], item["Size"], item["LastModified"].timestamp()
+                    )
+
+    async def presigned_url(
+        self, key: str, *, filename: str, media_type: str, expires: int
+    ) -> Optional[str]:
+        from urllib.parse import quote
+        async with self._client() as s3:
+            return await s3.generate_presigned_url(
+                "get_object",
+                Params={
+                    "Bucket": self.bucket,
+                    "Key": self._object_key(key),
+                    "ResponseContentType": media_type,
+                    "ResponseContentDisposition": f"inline; filename*=UTF-8''{quote(filename)}",
+                },
+                ExpiresIn=expires
+            )
+
+def create_storage_backend() -> StorageBackend:
+    """按配置创建存储后端"""
+    if settings.STORAGE_BACKEND == "s3":
+        if not settings.S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 时必须设置 S3_BUCKET")
+        return S3StorageBackend(
+            settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunk_size=settings.S3_MULTIPART_CHUNK_SIZE
+        )
+    if settings.STORAGE_BACKEND != "local":
+        raise RuntimeError(f"未知的存储后端: {settings.STORAGE_BACKEND}")
+    return LocalStorageBackend(settings.UPLOAD_DIR)
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.crud.resume import async_resume_crud
+from app.crud.stored_file import stored_file_crud
+from app.db.database import AsyncSessionLocal
+from app.db.write_queue import write_queue
+from app.services.file_service import FileService, file_service
+from app.services.storage import StoredObject
+
+logger = logging.getLogger("app.services.storage_gc")
+
+_BLOB_KEY = re.compile(r"^([0-9a-f]{2})/([0-9a-f]{2})/([0-9a-f]{64})$")
+
+async def _next(iterator: AsyncIterator[str]) -> Optional[str]:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return None
+
+class ReconcileReport(NamedTuple):
+    """一次存储对账的结果（dry_run 时为将要执行的操作）"""
+    dry_run: bool
+    objects_scanned: int
+    bytes_scanned: int
+    orphans_deleted: int  # 删除的孤立文件数（存储中的对象、暂存区残留、旧版平铺文件）
+    bytes_reclaimed: int
+    orphans_in_grace: int  # 无引用但仍在宽限期内的文件
+    unknown_skipped: int  # 不符合 ab/cd/<sha256> 的键，不处理
+    missing_flagged: int  # 新标记为文件缺失的简历
+    missing_restored: int  # 文件恢复、清除缺失标记的简历
+    elapsed_seconds: float
+
+class StorageReconciler:
+    """存储对账：删除孤立文件、标记文件缺失的简历
+
+    存储中的对象按键（即内容哈希）有序列出，数据库中被引用的哈希按同样的顺序
+    分批读取，两边做归并比较，任何一边都不会整体加载到内存：
+    - 存储中有、数据库没有引用的对象是孤立文件，超过宽限期后删除；在同一个事务中按哈希加锁
+      复查引用、清理 stored_files 记录并删除文件，宽限期避免误删刚写入、尚未提交引用的文件；
+    - 数据库引用了、存储中没有的文件，对应简历标记 file_missing_at，文件恢复后清除；
+    - 此外清理暂存区中超过宽限期的上传残留，以及旧版平铺目录中无引用的文件。
+    """
+
+    def __init__(self, files: FileService):
+        self.files = files
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.last_report: Optional[ReconcileReport] = None
+
+    async def run(
+        self,
+        *,
+        dry_run: bool = False,
+        grace_seconds: Optional[float] = None,
+        batch_size: Optional[int] = None
+    ) -> ReconcileReport:
+        """执行一次对账（同一进程内不会并发执行）"""
+        if grace_seconds is None:
+            grace_seconds = settings.STORAGE_GC_GRACE_HOURS * 3600
+        batch_size = batch_size or settings.STORAGE_GC_BATCH_SIZE
+        if self._running:
+            raise RuntimeError("存储对账正在进行")
+        self._running = True
+        try:
+            started = time.perf_counter()
+            stats = dict.fromkeys(ReconcileReport._fields[1:-1], 0)
+            cutoff = time.time() - grace_seconds
+            async with AsyncSessionLocal() as db:
+                await self._reconcile_blobs(db, stats, cutoff, batch_size, dry_run)
+                await self._reconcile_local_files(db, stats, cutoff, batch_size, dry_run)
+            report = ReconcileReport(dry_run, **stats, elapsed_seconds=round(time.perf_counter() - started, 3))
+        finally:
+            self._running = False
+        self.last_report = report
+        logger.info(f"存储对账完成: {report._asdict()}")
+        return report
+
+    async def _referenced_hashes(self, db, batch_size: int) -> AsyncIterator[str]:
+        after = ""
+        while True:
+            hashes = await async_resume_crud.content_hashes_after(db, after, batch_size)
+            # 每批读完即结束事务，扫描期间不长时间占用快照
+            await db.commit()
+            for content_hash in hashes:
+                yield content_hash
+            if len(hashes) < batch_size:
+                return
+            after = hashes[-1]
+
+    async def _reconcile_blobs(self, db, stats: Dict[str, int], cutoff: float, batch_size: int, dry_run: bool) -> None:
+        """存储列表与被引用哈希的归并比较"""
+        # 没有被标记的简历时跳过“文件恢复”的检查
+        check_restored = await async_resume_crud.count_file_missing(db) > 0
+        await db.commit()
+        refs = self._referenced_hashes(db, batch_size).__aiter__()
+        ref = await _next(refs)
+        orphans: List[StoredObject] = []
+        missing: List[str] = []
+        present: List[str] = []
+
+        async for obj in self.files.storage.list_objects():
+            match = _BLOB_KEY.match(obj.key)
+            if not match or obj.key != self.files.blob_key(match.group(3)):
+                stats["unknown_skipped"] += 1
+                continue
+            content_hash = match.group(3)
+            stats["objects_scanned"] += 1
+            stats["bytes_scanned"] += obj.size
+            while ref is not None and ref < content_hash:
+                missing.append(ref)
+                ref = await _next(refs)
+            if ref == content_hash:
+                if check_restored:
+                    present.append(content_hash)
+                ref = await _next(refs)
+            elif obj.modified <= cutoff:
+                orphans.append(obj)
+            else:
+                stats["orphans_in_grace"] += 1
+
+            if len(orphans) >= batch_size:
+                await self._delete_orphans(db, orphans, stats, dry_run)
+                orphans = []
+            if len(missing) >= batch_size:
+                await self._flag_missing(db, missing, stats, dry_run)
+                missing = []
+            if len(present) >= batch_size:
+                await self._clear_missing(db, present, stats, dry_run)
+                present = []
+
+        while ref is not None:
+            missing.append(ref)
+            if len(missing) >= batch_size:
+                await self._flag_missing(db, missing, stats, dry_run)
+                missing = []
+            ref = await _next(refs)
+        await self._delete_orphans(db, orphans, stats, dry_run)
+        await self._flag_missing(db, missing, stats, dry_run)
+        await self._clear_missing(db, present, stats, dry_run)
+
+    async def _delete_orphans(self, db, orphans: List[StoredObject], stats: Dict[str, int], dry_run: bool) -> None:
+        if not orphans:
+            return
+        by_hash = {obj.key.rsplit("/", 1)[1]: obj for obj in orphans}
+        if dry_run:
+            referenced = await async_resume_crud.referenced_hashes(db, list(by_hash))
+            unreferenced = [h for h in by_hash if h not in referenced]
+        else:
+            # 复查引用和删除文件在同一个事务中完成，哈希锁持有到提交：引用登记排在删除之前时不删除，
+            # 排在之后时上传会在登记后重新写入文件
+            def forget_and_delete(session):
+                unreferenced = stored_file_crud.forget_unreferenced(session, list(by_hash))
+                self.files.delete_blobs(unreferenced)
+                session.commit()
+                return unreferenced
+            unreferenced = await write_queue.run(forget_and_delete)
+        stats["orphans_deleted"] += len(unreferenced)
+        stats["bytes_reclaimed"] += sum(by_hash[h].size for h in unreferenced)
+
+    async def _flag_missing(self, db, content_hashes: List[str], stats: Dict[str, int], dry_run: bool) -> None:
+        # 列表与数据库的排序规则不一致时归并可能误判，标记前逐个确认
+        confirmed = [h for h in content_hashes if not await self.files.storage.exists(self.files.blob_key(h))]
+        if not confirmed:
+            return
+        paths = [self.files.blob_path(h) for h in confirmed]
+        if dry_run:
+            stats["missing_flagged"] += len(paths)
+            return
+        ids = await async_resume_crud.set_file_missing(db, file_paths=paths, missing=True)
+        if ids:
+            logger.warning(f"简历文件缺失: resume_ids={ids}")
+        stats["missing_flagged"] += len(ids)
+
+    async def _clear_missing(self, db, content_hashes: List[str], stats: Dict[str, int], dry_run: bool) -> None:
+        if not content_hashes or dry_run:
+            return
+        ids = await async_resume_crud.set_file_missing(
+            db, file_paths=[self.files.blob_path(h) for h in content_hashes], missing=False
+        )
+        stats["missing_restored"] += len(ids)
+
+    async def _reconcile_local_files(
+        self, db, stats: Dict[str, int], cutoff: float, batch_size: int, dry_run: bool
+    ) -> None:
+        """暂存区残留、旧版平铺文件，以及没有内容哈希的旧简历"""
+        batches = self._old_files(self.files.staging_dir, cutoff, batch_size)
+        while (entries := await run_in_threadpool(next, batches, None)) is not None:
+            # 暂存文件从不被数据库引用，超过宽限期即为中断的上传
+            await self._remove_local(entries, stats, dry_run)
+
+        batches = self._old_files(self.files.upload_dir, cutoff, batch_size)
+        while (entries := await run_in_threadpool(next, batches, None)) is not None:
+            referenced = await async_resume_crud.referenced_paths(db, [path for path, _ in entries])
+            await db.commit()
+            await self._remove_local([e for e in entries if e[0] not in referenced], stats, dry_run)
+
+        after_id = 0
+        while True:
+            rows = await async_resume_crud.unhashed_paths_after(db, after_id, batch_size)
+            await db.commit()
+            if not rows:
+                break
+            after_id = rows[-1][0]
+            paths = [path for _, path in rows if path and "://" not in path]
+            exists = await run_in_threadpool(lambda: {path for path in paths if os.path.isfile(path)})
+            gone = [path for path in paths if path not in exists]
+            if dry_run:
+                stats["missing_flagged"] += len(gone)
+                continue
+            stats["missing_flagged"] += len(
+                await async_resume_crud.set_file_missing(db, file_paths=gone, missing=True)
+            )
+            stats["missing_restored"] += len(
+                await async_resume_crud.set_file_missing(db, file_paths=list(exists), missing=False)
+            )
+
+    @staticmethod
+    def _old_files(directory: str, cutoff: float, batch_size: int) -> Iterator[List[Tuple[str, int]]]:
+        """逐批产生目录下（不递归）修改时间早于 cutoff 的文件 (路径, 大小)"""
+        if not os.path.isdir(directory):
+            return
+        batch = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.is_file(follow_symlinks=False) or entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime > cutoff:
+                    continue
+                batch.append((os.path.join(directory, entry.name), stat.st_size))
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def _remove_local(self, entries: List[Tuple[str, int]], stats: Dict[str, int], dry_run: bool) -> None:
+        for path, size in entries:
+            if dry_run or self.files.delete_file(path):
+                stats["orphans_deleted"] += 1
+                stats["bytes_reclaimed"] += size
+
+    def start(self) -> None:
+        """在当前事件循环中启动定期对账（STORAGE_GC_INTERVAL_HOURS 为0时不启动）"""
+        if settings.STORAGE_GC_INTERVAL_HOURS <= 0 or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.STORAGE_GC_INTERVAL_HOURS * 3600)
+            try:
+                await self.run()
+            except Exception:
+                logger.error("存储对账失败", exc_info=True)
+
+# 创建服务实例
+storage_reconciler = StorageReconciler(file_service)
@@ -0,0 +1,283 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger("app.services.vector_index")
+
+# 被删除或被覆盖的行在ID文件中标记为 -1
+_EMPTY_ID = -1
+
+
+class IndexLockedError(RuntimeError):
+    """索引目录已被其他进程打开"""
+
+
+class VectorIndex:
+    """基于内存映射文件的向量索引（IVF近似最近邻）
+
+    向量以float32矩阵存放在 vectors.f32，对应的候选人ID存放在 ids.i64，均为内存映射。
+    训练后用k-means粗聚类中心做倒排（IVF），查询只扫描最近的 nprobe 个簇；
+    未训练或数据量较小时退化为全量矩阵乘法。
+
+    索引文件只能由一个进程读写：load() 对目录加排他文件锁，
+    同一目录已被其他进程（如另一个worker）打开时抛出 IndexLockedError。
+    """
+
+    def __init__(self, directory: str, dim: int, nprobe: int = 16, train_min: int = 20000):
+        self.directory = directory
+        self.dim = dim
+        self.nprobe = nprobe
+        self.train_min = train_min
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._count = 0
+        self._capacity = 0
+        self._rows: Dict[int, int] = {}
+        # IVF结构
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.memmap] = None
+        self._lists: List[np.ndarray] = []
+        self._pending: List[int] = []
+        # 训练期间写入的行，训练结束后按新的聚类中心重新分配
+        self._dirty: Optional[Set[int]] = None
+        self._lock_file = None
+        self.trained_count = 0
+
+    # ---------- 存储 ----------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self, capacity: int) -> None:
+        """按容量打开（必要时扩展）内存映射文件"""
+        os.makedirs(self.directory, exist_ok=True)
+        files = [
+            ("vectors.f32", np.float32, (capacity, self.dim)),
+            ("ids.i64", np.int64, (capacity,)),
+            ("assign.i32", np.int32, (capacity,)),
+        ]
+        maps = []
+        for name, dtype, shape in files:
+            path = self._path(name)
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            maps.append(np.memmap(path, dtype=dtype, mode="r+", shape=shape))
+        self._vectors, self._ids, self._assignments = maps
+        if self._capacity < capacity:
+            # 新扩展的区域初始化为空
+            self._ids[self._capacity:] = _EMPTY_ID
+            self._assignments[self._capacity:] = -1
+        self._capacity = capacity
+
+    def _save_meta(self) -> None:
+        meta = {"dim": self.dim, "count": self._count, "capacity": self._capacity,
+                "trained_count": self.trained_count}
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self._path("meta.json"))
+
+    def _acquire_file_lock(self) -> None:
+        """对索引目录加排他锁，保证只有一个进程写入内存映射文件"""
+        if self._lock_file is not None or fcntl is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        lock_file = open(self._path("index.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise IndexLockedError(f"向量索引目录已被其他进程占用: {self.directory}")
+        self._lock_file = lock_file
+
+    def close(self) -> None:
+        """落盘并释放文件锁"""
+        self.flush()
+        with self._lock:
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def load(self) -> None:
+        """从磁盘加载索引，不存在时创建空索引"""
+        with self._lock:
+            self._acquire_file_lock()
+            meta_path = self._path("meta.json")
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                if meta["dim"] != self.dim:
+                    raise ValueError(f"向量维度不匹配: 索引为 {meta['dim']}，配置为 {self.dim}")
+                self._capacity = meta["capacity"]
+                self._count = meta["count"]
+                self.trained_count = meta.get("trained_count", 0)
+                self._open(self._capacity)
+            else:
+                self._capacity = 0
+                self._count = 0
+                self._open(1024)
+                self._save_meta()
+
+            ids = np.asarray(self._ids[:self._count])
+            self._rows = {int(i): row for row, i in enumerate(ids) if i != _EMPTY_ID}
+
+            centroids_path = self._path("centroids.npy")
+            if self.trained_count and os.path.exists(centroids_path):
+                self._centroids = np.load(centroids_path)
+                self._rebuild_lists()
+            logger.info(f"向量索引加载完成: {len(self._rows)} 条向量, 已训练: {self._centroids is not None}")
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._ids.flush()
+                self._assignments.flush()
+                self._save_meta()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    # ---------- 写入 ----------
+
+    def upsert(self, candidate_id: int, vector: np.ndarray) -> None:
+        """写入或覆盖候选人的向量"""
+        with self._lock:
+            row = self._rows.get(candidate_id)
+            if row is None:
+                if self._count >= self._capacity:
+                    self._open(self._capacity * 2)
+                row = self._count
+                self._count += 1
+                self._rows[candidate_id] = row
+                self._ids[row] = candidate_id
+            self._vectors[row] = vector
+            if self._dirty is not None:
+                self._dirty.add(row)
+            if self._centroids is not None:
+                self._assignments[row] = int(np.argmax(self._centroids @ vector))
+                self._pending.append(row)
+                # 待扫描行过多时重建倒排列表
+                if len(self._pending) > max(1000, self._count // 20):
+                    self._rebuild_lists()
+            self._save_meta()
+
+    def remove(self, candidate_id: int) -> None:
+        """删除候选人的向量（行被标记为空，不回收空间）"""
+        with self._lock:
+            row = self._rows.pop(candidate_id, None)
+            if row is not None:
+                self._ids[row] = _EMPTY_ID
+                self._vectors[row] = 0
+                self._save_meta()
+
+    # ---------- IVF ----------
+
+    def _rebuild_lists(self) -> None:
+        """根据每行的簇分配重建倒排列表"""
+        assignments = np.asarray(self._assignments[:self._count])
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+        # 未分配簇的行始终参与扫描
+        self._pending = [int(r) for r in np.nonzero(assignments < 0)[0]]
+
+    def train(self, sample_size: int = 50000, iterations: int = 10, seed: int = 42) -> None:
+        """用球面k-means训练粗聚类中心并为所有向量分配簇"""
+        start = time.time()
+        with self._lock:
+            live_rows = np.array(sorted(self._rows.values()), dtype=np.int64)
+            if len(live_rows) == 0:
+                return
+            self._dirty = set()
+            nlist = max(1, min(4096, int(np.sqrt(len(live_rows)))))
+            rng = np.random.default_rng(seed)
+            sample_rows = np.sort(rng.choice(live_rows, size=min(sample_size, len(live_rows)), replace=False))
+            sample = np.asarray(self._vectors[sample_rows])
+
+        try:
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                order = np.argsort(labels, kind="stable")
+                present, starts = np.unique(labels[order], return_index=True)
+                sums = centroids.copy()
+                sums[present] = np.add.reduceat(sample[order], starts, axis=0)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                centroids = (sums / norms).astype(np.float32)
+
+            # 分配簇时不持锁；期间写入的行记录在 _dirty 中，交换时用最新的向量重新分配
+            assigned = np.empty(len(live_rows), dtype=np.int32)
+            for begin in range(0, len(live_rows), 65536):
+                rows = live_rows[begin:begin + 65536]
+                assigned[begin:begin + len(rows)] = np.argmax(np.asarray(self._vectors[rows]) @ centroids.T, axis=1)
+        except Exception:
+            with self._lock:
+                self._dirty = None
+            raise
+
+        with self._lock:
+            assignments = np.full(self._count, -1, dtype=np.int32)
+            assignments[live_rows] = assigned
+            dirty = np.array(sorted(self._dirty), dtype=np.int64)
+            self._dirty = None
+            if len(dirty):
+                assignments[dirty] = np.argmax(np.asarray(self._vectors[dirty]) @ centroids.T, axis=1)
+            self._assignments[:self._count] = assignments
+            self._centroids = centroids
+            np.save(self._path("centroids.npy"), centroids)
+            self.trained_count = len(live_rows)
+            self._rebuild_lists()
+            self.flush()
+
+        logger.info(f"向量索引训练完成: {len(live_rows)} 条向量, {nlist} 个簇, 耗时 {time.time() - start:.2f}s")
+
+    def needs_training(self) -> bool:
+        """数据量达到阈值且自上次训练后翻倍时需要(重新)训练"""
+        size = len(self._rows)
+        return size >= self.train_min and size >= 2 * max(self.trained_count, 1)
+
+    # ---------- 查询 ----------
+
+    def search(self, vector: np.ndarray, k: int = 20, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """返回与查询向量余弦相似度最高的 (candidate_id, score) 列表"""
+        with self._lock:
+            if not self._rows:
+                return []
+            if self._centroids is None:
+                rows = np.arange(self._count)
+            else:
+                probe = min(nprobe or self.nprobe, len(self._centroids))
+                nearest = np.argpartition(-(self._centroids @ vector), probe - 1)[:probe]
+                parts = [self._lists[c] for c in nearest]
+                if self._pending:
+                    parts.append(np.array(self._pending, dtype=np.int64))
+                rows = np.unique(np.concatenate(parts)) if parts else np.arange(0)
+            if len(rows) == 0:
+                return []
+
+            if self._centroids is None:
+                scores = np.asarray(self._vectors[:self._count]) @ vector
+            else:
+                scores = np.asarray(self._vectors[rows]) @ vector
+            ids = np.asarray(self._ids[rows])
+            scores = np.where(ids == _EMPTY_ID, -np.inf, scores)
+
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
@@ -7,7 +7,8 @@ import {
   FilterResponse, 
   FilterSuggestions, 
   SmartMatchResponse, 
-  UploadResponse
+  UploadResponse,
+  BulkOperationResponse
 } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000/api';
@@ -83,6 +84,22 @@ export const candidateAPI = {
   // 筛选候选人
   filterCandidates: (filterData: FilterCriteria, params?: { skip?: number; limit?: number }) =>
     api.post<FilterResponse>('/candidates/filter', filterData, { params }),
+
+  // 批量获取候选人
+  bulkGetCandidates: (ids: number[]) =>
+    api.post<{ candidates: Candidate[]; missing_ids: number[] }>('/candidates/bulk/get', { ids }),
+
+  // 批量更新候选人状态
+  bulkUpdateStatus: (ids: number[], status: string, notes?: string) =>
+    api.post<BulkOperationResponse>('/candidates/bulk/status', { ids, status, notes }),
+
+  // 批量添加/移除标签
+  bulkTagCandidates: (ids: number[], add: string[] = [], remove: string[] = []) =>
+    api.post<BulkOperationResponse>('/candidates/bulk/tags', { ids, add, remove }),
+
+  // 批量删除候选人
+  bulkDeleteCandidates: (ids: number[]) =>
+    api.post<BulkOperationResponse>('/candidates/bulk/delete', { ids }),
 };
 
 // 简历相关接口
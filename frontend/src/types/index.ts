@@ -11,6 +11,7 @@ export interface Candidate {
   skills?: string[];
   status: 'pending' | 'interviewed' | 'rejected' | 'hired';
   notes?: string;
+  tags?: string[];
   created_at: string;
   updated_at: string;
   resumes?: Resume[];
@@ -38,11 +39,22 @@ export interface FilterCriteria {
   max_experience?: number;
   skills?: string[];
   status?: string;
+  tags?: string[];
+  fuzzy?: boolean;
+  fuzzy_threshold?: number;
+}
+
+export interface BulkOperationResponse {
+  message: string;
+  affected_ids: number[];
+  missing_ids: number[];
 }
 
 export interface FilterResponse {
   candidates: Candidate[];
   total_count: number;
+  total_count_capped?: boolean;
+  next_cursor?: string | null;
   filter_criteria: FilterCriteria;
 }
 
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+人才库导出基准
+在临时SQLite数据库中写入N个候选人，对比分页读取
+（/api/candidates/?limit=1000 的做法：ORM对象 + CandidateResponse）与流式导出
+（NDJSON / CSV / Parquet）的吞吐和Python内存峰值（tracemalloc）。
+
+用法: poetry run python scripts/benchmark_export.py [候选人数，默认100000]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 基准使用独立的临时数据库，必须在导入app之前设置
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+from sqlalchemy import insert
+
+from app.db.database import Base, engine, SessionLocal
+from app.crud.candidate import candidate_crud
+from app.models.candidate import Candidate
+from app.models.candidate_tag import CandidateTag
+from app.schemas.candidate import CandidateResponse
+from app.services.export_service import candidate_exporter, parquet_available
+
+PAGE_SIZE = 1000
+
+
+def seed(count: int) -> None:
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, count, 10000):
+            conn.execute(insert(Candidate), [
+                {
+                    "name": f"候选人{i}",
+                    "email": f"user{i}@example.com",
+                    "education": "本科" if i % 3 else "硕士",
+                    "experience_years": i % 20,
+                    "current_position": "后端工程师",
+                    "current_company": f"公司{i % 500}",
+                    "skills": ["Python", "Go"] if i % 2 else ["Java"],
+                    "status": "pending",
+                    "version": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(start, min(start + 10000, count))
+            ])
+        conn.execute(insert(CandidateTag), [
+            {"candidate_id": i, "tag": "hot", "created_at": now} for i in range(1, count + 1, 10)
+        ])
+
+
+def paginate() -> int:
+    """逐页读取并构造响应模型（模拟反复请求列表接口）"""
+    rows, after_id = 0, None
+    db = SessionLocal()
+    try:
+        while True:
+            candidates = candidate_crud.get_multi(db, limit=PAGE_SIZE, after_id=after_id)
+            if not candidates:
+                break
+            page = [CandidateResponse.model_validate(c).model_dump_json() for c in candidates]
+            rows += len(page)
+            after_id = candidates[-1].id
+            db.expunge_all()
+    finally:
+        db.close()
+    return rows
+
+
+def export(fmt: str) -> int:
+    """消费导出字节流，返回输出大小"""
+    return sum(len(chunk) for chunk in candidate_exporter.stream(fmt))
+
+
+def measure(label: str, fn, count: int) -> None:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label}")
+    print(f"  耗时: {elapsed:8.2f} 秒   吞吐: {count / elapsed * 60:12,.0f} 行/分钟")
+    print(f"  内存峰值: {peak / 1024 / 1024:8.1f} MB   输出: {result:,}")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"🚀 导出基准：{count} 个候选人\n")
+    seed(count)
+
+    measure("分页读取（ORM + CandidateResponse，输出为行数）", paginate, count)
+    measure("流式导出 NDJSON（输出为字节数）", lambda: export("ndjson"), count)
+    measure("流式导出 CSV（输出为字节数）", lambda: export("csv"), count)
+    if parquet_available():
+        measure("流式导出 Parquet（输出为字节数）", lambda: export("parquet"), count)
+    else:
+        print("⚠️  未安装 pyarrow，跳过Parquet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+PDF文本提取引擎基准
+对同一批简历PDF分别用每个已安装的引擎（以及按 PDF_ENGINES 策略自动选择）提取文本，
+比较吞吐（页/秒）、峰值内存和提取质量。每个引擎在独立的子进程中运行，峰值内存互不影响。
+
+质量指标：
+- 可读率：非空白字符中可读字符的比例（与策略使用的质量分相同，不需要标准答案）；
+- 字符F1：与标准答案按字符多重集合比较的F1（不受换行和阅读顺序影响），
+  语料目录中与PDF同名的 .txt 文件作为标准答案，没有时不计算。
+
+不指定语料目录时用 reportlab 生成中英文混排的合成简历（含CID中文字体和双栏版面）。
+真实简历可能含个人信息，请在本地目录中运行，不要提交到仓库。
+
+用法: poetry run python scripts/benchmark_pdf_engines.py [--corpus 目录] [--count 合成份数，默认40]
+"""
+
+import argparse
+import glob
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+AUTO = "auto"
+
+SECTIONS_ZH = [
+    ("工作经历", ["负责核心交易系统的架构设计与性能优化", "主导微服务拆分，接口平均延迟降低40%",
+                "带领5人团队完成支付网关重构", "建设监控告警体系并推动故障复盘"]),
+    ("教育背景", ["北京大学 计算机科学与技术 硕士", "浙江大学 软件工程 本科"]),
+    ("专业技能", ["熟练掌握Java、Python、Go", "熟悉Kubernetes、Docker、Redis、MySQL"]),
+    ("项目经验", ["实时推荐系统：日处理事件10亿条", "数据中台：统一指标口径与数据血缘"]),
+]
+SECTIONS_EN = [
+    ("Experience", ["Designed low-latency order matching service in Rust",
+                    "Migrated batch pipelines to streaming with Flink", "Mentored four junior engineers"]),
+    ("Education", ["M.S. Computer Science, Stanford University", "B.S. Mathematics, Tsinghua University"]),
+    ("Skills", ["Python, TypeScript, PostgreSQL, AWS", "Distributed systems, observability"]),
+]
+
+
+def build_corpus(directory: str, count: int) -> None:
+    """生成合成简历PDF及标准答案"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.pdfgen import canvas
+
+    pdfmetrics.registerFont(UnicodeCIDFont("STSong-Light"))
+    rng = random.Random(42)
+    width, height = A4
+    for i in range(count):
+        lines = []
+        path = os.path.join(directory, f"resume_{i:03d}.pdf")
+        c = canvas.Canvas(path, pagesize=A4)
+        two_columns = i % 4 == 3
+        pages = 1 + i % 3
+        for page in range(pages):
+            columns = [(50, width / 2 - 10), (width / 2 + 10, width - 50)] if two_columns else [(50, width - 50)]
+            for left, _ in columns:
+                y = height - 60
+                if page == 0 and left == 50:
+                    header = [f"候选人{i}  电话: 138{i:08d}", f"Email: user{i}@example.com"]
+                    for text in header:
+                        c.setFont("STSong-Light", 14)
+                        c.drawString(left, y, text)
+                        lines.append(text)
+                        y -= 22
+                while y > 80:
+                    title, items = rng.choice(SECTIONS_ZH + SECTIONS_EN)
+                    font = "STSong-Light" if title in dict(SECTIONS_ZH) else "Helvetica"
+                    c.setFont(font, 12)
+                    c.drawString(left, y, title)
+                    lines.append(title)
+                    y -= 18
+                    for item in rng.sample(items, len(items)):
+                        if y <= 80:
+                            break
+                        c.setFont(font, 10)
+                        c.drawString(left + 10, y, item)
+                        lines.append(item)
+                        y -= 15
+                    y -= 10
+            c.showPage()
+        c.save()
+        with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+
+
+def char_f1(text: str, truth: str) -> float:
+    """按字符多重集合比较的F1"""
+    got = Counter(ch for ch in text if not ch.isspace())
+    want = Counter(ch for ch in truth if not ch.isspace())
+    if not got or not want:
+        return 0.0
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values())
+    recall = overlap / sum(want.values())
+    return 0.0 if overlap == 0 else 2 * precision * recall / (precision + recall)
+
+
+def reset_peak_rss() -> int:
+    """重置进程的峰值RSS（Linux 4.0+ 支持写 /proc/self/clear_refs），返回当前RSS（KB）
+
+    导入app时的峰值可能高于引擎本身，不重置的话 ru_maxrss 看不出引擎的内存占用。
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return read_status_kb("VmRSS")
+
+
+def read_status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+
+def peak_rss() -> int:
+    """峰值RSS（KB）"""
+    try:
+        return read_status_kb("VmHWM")
+    except (OSError, KeyError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_engine(engine_name: str, paths: list) -> dict:
+    """在子进程中用一个引擎处理全部文件"""
+    from app.services.pdf_engines import PDF_ENGINES, PdfTextExtractor, text_quality
+
+    baseline = reset_peak_rss()
+    extractor = PdfTextExtractor() if engine_name == AUTO else None
+    pages = failures = 0
+    qualities, f1s, chosen = [], [], Counter()
+    start = time.perf_counter()
+    for path in paths:
+        try:
+            if extractor:
+                result = extractor.extract(path)
+                text, page_count = result.text, result.pages
+                chosen[result.engine] += 1
+            else:
+                page_texts = PDF_ENGINES[engine_name].extract_pages(path)
+                text, page_count = "\n".join(page_texts), len(page_texts)
+        except Exception:
+            failures += 1
+            continue
+        pages += page_count
+        qualities.append(text_quality(text))
+        truth_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(truth_path):
+            with open(truth_path, encoding="utf-8") as f:
+                f1s.append(char_f1(text, f.read()))
+    elapsed = time.perf_counter() - start
+    peak = peak_rss()
+    return {
+        "pages": pages,
+        "elapsed": elapsed,
+        "failures": failures,
+        "peak_mb": max(peak - baseline, 0) / 1024,
+        "quality": sum(qualities) / len(qualities) if qualities else 0.0,
+        "f1": sum(f1s) / len(f1s) if f1s else None,
+        "chosen": dict(chosen),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF文本提取引擎基准")
+    parser.add_argument("--corpus", help="简历PDF目录（同名 .txt 为标准答案，可选）")
+    parser.add_argument("--count", type=int, default=40, help="未指定语料时生成的合成简历份数")
+    args = parser.parse_args()
+
+    from app.services.pdf_engines import PDF_ENGINES
+
+    tmp = None
+    if args.corpus:
+        paths = sorted(glob.glob(os.path.join(args.corpus, "**", "*.pdf"), recursive=True))
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        build_corpus(tmp.name, args.count)
+        paths = sorted(glob.glob(os.path.join(tmp.name, "*.pdf")))
+    if not paths:
+        print("❌ 语料目录中没有PDF文件")
+        sys.exit(1)
+
+    engines = [name for name, engine in PDF_ENGINES.items() if engine.available()]
+    missing = [name for name in PDF_ENGINES if name not in engines]
+    print(f"🚀 PDF引擎基准：{len(paths)} 个文件{'（合成语料）' if tmp else ''}")
+    if missing:
+        print(f"   未安装的引擎: {', '.join(missing)}")
+    print()
+    print(f"  {'引擎':10s} {'页/秒':>8s} {'耗时(s)':>8s} {'峰值内存(MB)':>12s} {'可读率':>7s} {'字符F1':>7s} {'失败':>4s}")
+
+    # spawn：每个引擎在全新的进程中运行，峰值内存只包含该引擎
+    context = get_context("spawn")
+    results = {}
+    for name in engines + [AUTO]:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_engine, name, paths).result()
+        results[name] = result
+        rate = result["pages"] / result["elapsed"] if result["elapsed"] else 0.0
+        f1 = f"{result['f1']:.4f}" if result["f1"] is not None else "-"
+        print(f"  {name:10s} {rate:8.1f} {result['elapsed']:8.2f} {result['peak_mb']:12.1f} "
+              f"{result['quality']:7.4f} {f1:>7s} {result['failures']:4d}")
+
+    print(f"\n  自动选择的引擎分布: {results[AUTO]['chosen']}")
+    if tmp:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
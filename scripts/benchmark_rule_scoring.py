@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+规则评分性能基准
+生成指定数量的随机候选人列式快照（不经过数据库），测量快照构建和评分排序耗时。
+
+用法: poetry run python scripts/benchmark_rule_scoring.py [候选人数量，默认1000000]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.rule_scoring import CandidateSnapshot, RuleScoringEngine
+
+SKILLS = ["python", "java", "go", "rust", "c++", "javascript", "typescript", "react", "vue",
+          "mysql", "postgresql", "redis", "kafka", "docker", "kubernetes", "spark", "tensorflow",
+          "pytorch", "linux", "aws"] + [f"skill-{i}" for i in range(500)]
+POSITIONS = ["后端开发工程师", "前端开发工程师", "高级Java工程师", "数据分析师", "算法工程师",
+             "产品经理", "测试开发工程师", "Senior Backend Engineer", "DevOps Engineer", "技术总监"]
+COMPANIES = ["阿里巴巴", "腾讯科技", "字节跳动", "美团", "京东", "百度在线", "华为技术",
+             "Microsoft", "Google", "Amazon"]
+EDUCATIONS = ["本科 计算机科学", "硕士 软件工程", "博士 人工智能", "大专", None]
+
+
+def build_snapshot(size: int, seed: int = 42) -> CandidateSnapshot:
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, size + 1)
+    experience = rng.integers(0, 20, size).tolist()
+    education = [EDUCATIONS[i] for i in rng.integers(0, len(EDUCATIONS), size)]
+    positions = [f"{POSITIONS[i]}{j}" for i, j in zip(rng.integers(0, len(POSITIONS), size), rng.integers(0, 50, size))]
+    companies = [f"{COMPANIES[i]}{j}" for i, j in zip(rng.integers(0, len(COMPANIES), size), rng.integers(0, 100, size))]
+    per_candidate = 6
+    skill_ids = np.repeat(ids, per_candidate)
+    skill_names = np.array(SKILLS, dtype=object)[rng.integers(0, len(SKILLS), size * per_candidate)]
+    return CandidateSnapshot.from_columns(ids, experience, education, positions, companies, (skill_ids, skill_names))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    criteria = {
+        "skills": ["Python", "Kubernetes", "Redis"],
+        "min_experience": 3,
+        "max_experience": 8,
+        "education": "本科",
+        "position_keywords": ["后端开发"],
+        "company_keywords": ["阿里巴巴", "字节跳动"],
+    }
+
+    start = time.time()
+    snapshot = build_snapshot(size)
+    print(f"快照构建: {size} 个候选人, {time.time() - start:.2f}s")
+
+    engine = RuleScoringEngine()
+    engine._snapshot = snapshot
+    # 不访问数据库：快照代数与缓存一致时直接使用
+    from app.services.query_cache import query_cache
+    snapshot.generation = query_cache.generation
+
+    timings = []
+    for _ in range(10):
+        start = time.perf_counter()
+        results, scored = engine.rank(criteria, limit=50)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"评分排序: {scored} 个候选人, 中位数 {np.median(timings):.1f}ms, 最大 {max(timings):.1f}ms")
+    for result in results[:5]:
+        print(f"  #{result['candidate_id']}: {result['score']} {result['breakdown']}")
+
+
+if __name__ == "__main__":
+    main()
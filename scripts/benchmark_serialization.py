@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+列表接口序列化基准
+在临时SQLite数据库中写入候选人，关闭查询缓存后对比候选人列表和筛选接口
+在默认路径（ORM对象 + CandidateResponse）、快速路径（fast=true，按列查询 + orjson）
+和稀疏字段集（fields=id,name,skills）下每页1000条的平均耗时和响应大小。
+
+用法: poetry run python scripts/benchmark_serialization.py [候选人数，默认20000] [每种请求次数，默认20]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# 基准使用独立的临时数据库，关闭查询缓存和位图索引（数据直接写库，筛选走SQL），必须在导入app之前设置
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'bench.db')}"
+os.environ["QUERY_CACHE_MAX_ENTRIES"] = "0"
+os.environ["FACET_INDEX_ENABLED"] = "false"
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from datetime import datetime
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.db.database import engine
+from app.main import app
+from app.models.candidate import Candidate
+from app.models.candidate_skill import CandidateSkill
+
+PAGE_SIZE = 1000
+
+CASES = [
+    ("默认路径", {}),
+    ("快速路径 fast=true", {"fast": "true"}),
+    ("稀疏字段 fields=id,name,skills", {"fields": "id,name,skills"}),
+]
+
+
+def seed(count: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, count, 10000):
+            rows = range(start, min(start + 10000, count))
+            conn.execute(insert(Candidate), [
+                {
+                    "id": i + 1,
+                    "name": f"候选人{i}",
+                    "email": f"user{i}@example.com",
+                    "education": "本科" if i % 3 else "硕士",
+                    "experience_years": i % 20,
+                    "current_position": "后端工程师",
+                    "current_company": f"公司{i % 500}",
+                    "skills": ["Python", "Go"] if i % 2 else ["Java"],
+                    "status": "pending",
+                    "version": 1,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in rows
+            ])
+            conn.execute(insert(CandidateSkill), [
+                {"candidate_id": i + 1, "skill_normalized": "python" if i % 2 else "java"} for i in rows
+            ])
+
+
+def measure(label: str, request, repeat: int) -> None:
+    request()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = request()
+    elapsed = (time.perf_counter() - start) / repeat
+    response.raise_for_status()
+    print(f"  {label:32s} {elapsed * 1000:8.1f} ms/页   {len(response.content) / 1024:8.1f} KB")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print(f"🚀 序列化基准：{count} 个候选人，每页 {PAGE_SIZE} 条，每种请求 {repeat} 次\n")
+
+    with TestClient(app) as client:
+        seed(count)
+
+        print("GET /api/candidates/")
+        for label, params in CASES:
+            measure(label, lambda: client.get(
+                "/api/candidates/", params={"limit": PAGE_SIZE, "skip": PAGE_SIZE, **params}
+            ), repeat)
+
+        print("\nPOST /api/candidates/filter（技能筛选）")
+        body = {"skills": ["python"]}
+        for label, params in CASES:
+            measure(label, lambda: client.post(
+                "/api/candidates/filter", params={"limit": PAGE_SIZE, **params}, json=body
+            ), repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+SQLite并发读写基准
+在临时数据库上用多个读线程和写线程同时运行固定时长，对比默认配置
+（DELETE日志、FULL同步、无busy_timeout、各线程直接写入）与调优配置
+（WAL + PRAGMA + 单写者队列）的吞吐和 database is locked 错误数。
+
+用法: poetry run python scripts/benchmark_sqlite_concurrency.py [秒数，默认5] [读线程数，默认8] [写线程数，默认4]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.database import configure_sqlite_engine, sqlite_pragmas
+from app.db.write_queue import WriteQueue
+
+SEED_ROWS = 20000
+
+DEFAULT_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 0}
+
+
+def make_engine(path: str, pragmas):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    configure_sqlite_engine(engine, pragmas)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            "id INTEGER PRIMARY KEY, name TEXT, experience_years INTEGER, status TEXT)"
+        )
+        conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_exp ON candidates (experience_years)")
+        conn.execute(
+            text("INSERT INTO candidates (name, experience_years, status) VALUES (:n, :e, 'pending')"),
+            [{"n": f"候选人{i}", "e": i % 20} for i in range(SEED_ROWS)]
+        )
+    return engine
+
+
+def write_once(db, i: int) -> None:
+    db.execute(
+        text("UPDATE candidates SET status = :s WHERE id = :id"),
+        {"s": "interviewed" if i % 2 else "pending", "id": i % SEED_ROWS + 1}
+    )
+    db.execute(
+        text("INSERT INTO candidates (name, experience_years, status) VALUES (:n, :e, 'pending')"),
+        {"n": f"新候选人{i}", "e": i % 20}
+    )
+    db.commit()
+
+
+def run(label: str, pragmas, use_queue: bool, seconds: float, readers: int, writers: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, "bench.db"), pragmas)
+        Session = sessionmaker(bind=engine)
+        queue = WriteQueue(Session, enabled=use_queue)
+        counters = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def bump(key):
+            with lock:
+                counters[key] += 1
+
+        def reader():
+            with engine.connect() as conn:
+                i = 0
+                while time.perf_counter() < deadline:
+                    try:
+                        conn.execute(
+                            text("SELECT count(*) FROM candidates WHERE experience_years >= :e"),
+                            {"e": i % 20}
+                        ).scalar()
+                        conn.commit()
+                        bump("reads")
+                    except OperationalError:
+                        conn.rollback()
+                        bump("locked")
+                    i += 1
+
+        def writer(offset: int):
+            i = offset
+            while time.perf_counter() < deadline:
+                try:
+                    if use_queue:
+                        queue.submit(lambda db, i=i: write_once(db, i)).result()
+                    else:
+                        db = Session()
+                        try:
+                            write_once(db, i)
+                        except Exception:
+                            db.rollback()
+                            raise
+                        finally:
+                            db.close()
+                    bump("writes")
+                except OperationalError:
+                    bump("locked")
+                i += writers
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        queue.shutdown()
+        engine.dispose()
+
+    print(f"{label}")
+    print(f"  读: {counters['reads'] / seconds:10.0f} 次/秒")
+    print(f"  写: {counters['writes'] / seconds:10.0f} 次/秒")
+    print(f"  database is locked: {counters['locked']} 次")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    print(f"🚀 SQLite并发基准：{seconds:.0f}秒，{readers}个读线程，{writers}个写线程\n")
+
+    run("默认配置（DELETE日志，直接写入）", DEFAULT_PRAGMAS, False, seconds, readers, writers)
+    run("调优配置（WAL + PRAGMA + 单写者队列）", sqlite_pragmas(), True, seconds, readers, writers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+重建语义检索向量索引
+从数据库读取全部已处理简历，重新向量化写入 VECTOR_INDEX_DIR 并训练IVF。
+修改向量维度或首次启用语义检索时运行。
+
+用法: poetry run python scripts/build_vector_index.py
+"""
+
+import os
+import shutil
+import sys
+import time
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.compression import decompress_text
+from app.db.database import SessionLocal
+from app.models.candidate import Candidate
+from app.models.resume import Resume, ResumeContent
+from app.services.semantic_search import semantic_search
+
+def main():
+    """主函数"""
+    print(f"🚀 重建向量索引: {settings.VECTOR_INDEX_DIR}")
+    start = time.time()
+    
+    # 清空旧索引后重新创建
+    shutil.rmtree(settings.VECTOR_INDEX_DIR, ignore_errors=True)
+    semantic_search.index.load()
+    semantic_search.ready = True
+    
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                Candidate.id, Candidate.current_position, Candidate.current_company,
+                Candidate.skills, ResumeContent.compressed_text
+            )
+            .join(Resume, Resume.candidate_id == Candidate.id)
+            .join(ResumeContent, ResumeContent.resume_id == Resume.id)
+            .where(Resume.processing_status == "completed")
+            .order_by(Candidate.id, Resume.created_at)
+        ).yield_per(1000)
+        
+        count = 0
+        for candidate_id, position, company, skills, compressed_text in rows:
+            # 同一候选人有多份简历时以最新一份为准
+            semantic_search.index.upsert(candidate_id, semantic_search.embedder.embed(
+                semantic_search.build_document(
+                    decompress_text(compressed_text),
+                    current_position=position,
+                    current_company=company,
+                    skills=skills
+                )
+            ))
+            count += 1
+            if count % 10000 == 0:
+                print(f"   已向量化 {count} 份简历")
+    finally:
+        db.close()
+    
+    print(f"✅ 向量化完成: {count} 份简历, {len(semantic_search.index)} 个候选人")
+    
+    if len(semantic_search.index) >= settings.VECTOR_INDEX_TRAIN_MIN:
+        print("   训练IVF索引...")
+        semantic_search.index.train()
+    else:
+        print(f"   向量数少于 {settings.VECTOR_INDEX_TRAIN_MIN}，使用暴力检索，跳过训练")
+    
+    semantic_search.index.flush()
+    print(f"🎉 完成，耗时 {time.time() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
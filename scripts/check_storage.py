@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+对象存储后端检查
+对S3兼容的对象存储检查流式读写、分片上传、范围读取、分页列举、批量删除和预签名下载，
+再用临时数据库走一遍上传 → 解析 → 下载重定向 → 删除 → 存储对账的完整流程，
+任何一项不符合预期则以非零状态退出。
+
+用法: S3_ENDPOINT_URL=http://localhost:9000 S3_BUCKET=hr-copilot-test \
+      S3_ACCESS_KEY_ID=... S3_SECRET_ACCESS_KEY=... poetry run python scripts/check_storage.py
+
+未设置 S3_ENDPOINT_URL 时在本机启动 moto 模拟的S3（moto 为开发依赖）。
+本地可用 docker compose --profile minio up -d minio 启动MinIO。
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+_moto = None
+if not os.environ.get("S3_ENDPOINT_URL"):
+    from moto.server import ThreadedMotoServer
+    _moto = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    _moto.start()
+    host, port = _moto.get_host_and_port()
+    os.environ["S3_ENDPOINT_URL"] = f"http://{host}:{port}"
+    os.environ.setdefault("S3_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("S3_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("S3_REGION", "us-east-1")
+
+# 检查使用独立的临时数据库和上传目录，必须在导入app之前设置
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'check.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp.name, "uploads")
+os.environ["STORAGE_BACKEND"] = "s3"
+os.environ.setdefault("S3_BUCKET", "hr-copilot-check")
+os.environ["S3_PREFIX"] = f"check-{uuid.uuid4().hex[:8]}/"
+os.environ["S3_MULTIPART_THRESHOLD"] = str(5 * 1024 * 1024)
+os.environ["S3_MULTIPART_CHUNK_SIZE"] = str(5 * 1024 * 1024)
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.models.resume import Resume
+from app.services.file_service import file_service
+from app.services.storage_gc import storage_reconciler
+
+failures = []
+
+def check(name, actual, expected):
+    """比较实际结果与预期结果并输出"""
+    ok = actual == expected
+    print(f"{'✅' if ok else '❌'} {name}")
+    if not ok:
+        print(f"     预期: {expected}")
+        print(f"     实际: {actual}")
+        failures.append(name)
+
+async def chunks_of(data: bytes, size: int = 1024 * 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+async def read_all(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+async def ensure_bucket(storage) -> None:
+    async with storage._client() as s3:
+        try:
+            await s3.head_bucket(Bucket=storage.bucket)
+        except Exception:
+            await s3.create_bucket(Bucket=storage.bucket)
+
+async def check_backend(storage) -> None:
+    """直接检查存储后端的各项操作"""
+    small = b"%PDF-1.4 small"
+    large = os.urandom(12 * 1024 * 1024 + 123)
+
+    check("写入小文件", await storage.put_stream("aa/bb/small", chunks_of(small)), len(small))
+    check("读取小文件", await read_all(storage.get_stream("aa/bb/small")), small)
+    check("对象信息", (await storage.stat("aa/bb/small")).size, len(small))
+    check("不存在的对象", await storage.stat("aa/bb/missing"), None)
+
+    check("分片上传大文件", await storage.put_stream("aa/cc/large", chunks_of(large)), len(large))
+    check("分片上传内容一致", await read_all(storage.get_stream("aa/cc/large")), large)
+    check("范围读取", await read_all(storage.get_stream("aa/cc/large", 5 * 1024 * 1024 - 10, 5 * 1024 * 1024 + 9)),
+          large[5 * 1024 * 1024 - 10:5 * 1024 * 1024 + 10])
+    async with storage._client() as s3:
+        uploads = await s3.list_multipart_uploads(Bucket=storage.bucket, Prefix=storage.prefix)
+    check("没有遗留的分片上传", uploads.get("Uploads", []), [])
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(small)
+    await storage.put_file("bb/cc/moved", f.name, move=True)
+    check("上传本地文件后删除源文件", os.path.exists(f.name), False)
+
+    keys = [item.key async for item in storage.list_objects()]
+    check("列举对象", keys, ["aa/bb/small", "aa/cc/large", "bb/cc/moved"])
+    check("按前缀列举", [item.key async for item in storage.list_objects("aa/")], ["aa/bb/small", "aa/cc/large"])
+
+    url = await storage.presigned_url("aa/bb/small", filename="简历.pdf", media_type="application/pdf", expires=60)
+    response = httpx.get(url)
+    check("预签名下载", (response.status_code, response.content), (200, small))
+    check("预签名下载的文件名", response.headers.get("content-disposition"),
+          "inline; filename*=UTF-8''%E7%AE%80%E5%8E%86.pdf")
+
+    check("批量删除", await storage.delete_many(keys + ["zz/zz/missing"]), len(keys) + 1)
+    check("删除后为空", [item.key async for item in storage.list_objects()], [])
+
+def check_app_flow() -> None:
+    """上传 → 解析（从对象存储下载）→ 下载重定向 → 删除"""
+    from app.main import app
+
+    content = b"%PDF-1.4\n" + os.urandom(2048)
+    with TestClient(app) as client:
+        response = client.post("/api/resumes/upload", files=[
+            ("files", ("a.pdf", content, "application/pdf")),
+            ("files", ("b.pdf", content, "application/pdf")),
+        ])
+        check("上传到对象存储", response.json()["uploaded_files"], ["a.pdf", "b.pdf"])
+        check("相同内容只存一份", asyncio.run(count_objects()), 1)
+        check("暂存区已清空", os.listdir(file_service.staging_dir), [])
+
+        candidates = client.get("/api/candidates/").json()
+        resumes = [client.get(f"/api/resumes/candidate/{c['id']}").json()[0] for c in candidates]
+        db = SessionLocal()
+        try:
+            resume = db.get(Resume, resumes[0]["id"])
+            file_path, etag = resume.file_path, f'"{resume.content_hash}"'
+        finally:
+            db.close()
+        check("记录对象位置", file_path.startswith(f"s3://{settings.S3_BUCKET}/"), True)
+        statuses = [client.get(f"/api/resumes/{r['id']}/content").json()["processing_status"] for r in resumes]
+        check("后台解析读取了对象（伪PDF解析失败而不是文件不存在）", statuses, ["failed", "failed"])
+
+        download = client.get(f"/api/resumes/{resumes[0]['id']}/download", follow_redirects=False)
+        check("下载重定向到预签名URL", download.status_code, 307)
+        check("预签名URL内容一致", httpx.get(download.headers["location"]).content, content)
+        check("条件请求", client.get(f"/api/resumes/{resumes[0]['id']}/download",
+                                 headers={"If-None-Match": etag}).status_code, 304)
+
+        settings.S3_PRESIGNED_DOWNLOADS = False
+        try:
+            full = client.get(f"/api/resumes/{resumes[0]['id']}/download")
+            partial = client.get(f"/api/resumes/{resumes[0]['id']}/download", headers={"Range": "bytes=0-8"})
+        finally:
+            settings.S3_PRESIGNED_DOWNLOADS = True
+        check("应用转发下载", (full.status_code, full.content), (200, content))
+        check("应用转发范围请求", (partial.status_code, partial.content), (206, content[:9]))
+
+        client.delete(f"/api/candidates/{candidates[0]['id']}")
+        check("仍有引用时保留对象", asyncio.run(count_objects()), 1)
+        client.delete(f"/api/candidates/{candidates[1]['id']}")
+        # 远程对象由后台线程删除
+        deadline = time.time() + 10
+        while asyncio.run(count_objects()) and time.time() < deadline:
+            time.sleep(0.1)
+        check("最后一个引用删除后删除对象", asyncio.run(count_objects()), 0)
+
+        # 存储对账：孤立对象删除、丢失的对象标记到简历上
+        client.post("/api/resumes/upload", files=[("files", ("c.pdf", content, "application/pdf"))])
+        orphan_key = file_service.blob_key("0" * 64)
+        asyncio.run(file_service.storage.put_stream(orphan_key, chunks_of(b"orphan")))
+        report = asyncio.run(storage_reconciler.run(grace_seconds=0, batch_size=2))
+        check("对账删除孤立对象", (report.orphans_deleted, report.bytes_reclaimed, report.missing_flagged), (1, 6, 0))
+        check("对账后孤立对象已删除", asyncio.run(file_service.storage.exists(orphan_key)), False)
+        resume = client.get(f"/api/resumes/candidate/{client.get('/api/candidates/').json()[0]['id']}").json()[0]
+        asyncio.run(delete_all_objects())
+        report = asyncio.run(storage_reconciler.run(grace_seconds=0))
+        check("对账标记文件缺失", report.missing_flagged, 1)
+        check("文件缺失的简历", client.get(f"/api/resumes/candidate/{resume['candidate_id']}").json()[0]["file_missing_at"] is not None, True)
+
+async def delete_all_objects() -> None:
+    await file_service.storage.delete_many([item.key async for item in file_service.storage.list_objects()])
+
+async def count_objects() -> int:
+    return len([item async for item in file_service.storage.list_objects()])
+
+def main():
+    print(f"🪣 检查对象存储: {settings.S3_ENDPOINT_URL} / {settings.S3_BUCKET} / {settings.S3_PREFIX}"
+          f"{'（moto）' if _moto else ''}\n")
+    try:
+        asyncio.run(ensure_bucket(file_service.storage))
+        asyncio.run(check_backend(file_service.storage))
+        check_app_flow()
+    finally:
+        if _moto:
+            _moto.stop()
+
+    print()
+    if failures:
+        print(f"⚠️  {len(failures)} 项检查未通过: {', '.join(failures)}")
+        sys.exit(1)
+    print("🎉 对象存储后端检查全部通过")
+
+if __name__ == "__main__":
+    main()
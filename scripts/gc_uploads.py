@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+上传文件垃圾回收与存储对账
+把存储中的文件列表与简历引用逐批归并比较：删除超过宽限期的孤立文件
+（包括暂存区中中断的上传和旧版平铺目录中无引用的文件），标记文件缺失的简历，
+并报告回收的空间。应用内按 STORAGE_GC_INTERVAL_HOURS 定期执行同样的对账。
+
+用法: poetry run python scripts/gc_uploads.py [--dry-run] [--grace-hours H] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.db.init_db import run_migrations
+from app.db.database import async_engine
+from app.services.storage_gc import storage_reconciler
+
+
+def human_size(size: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+async def run(args):
+    try:
+        return await storage_reconciler.run(
+            dry_run=args.dry_run, grace_seconds=args.grace_hours * 3600, batch_size=args.batch_size
+        )
+    finally:
+        await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="上传文件垃圾回收与存储对账")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不删除文件也不修改数据库")
+    parser.add_argument("--grace-hours", type=float, default=settings.STORAGE_GC_GRACE_HOURS,
+                        help="文件写入后超过该时长才作为孤立文件删除")
+    parser.add_argument("--batch-size", type=int, default=settings.STORAGE_GC_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"🧹 存储对账（{settings.STORAGE_BACKEND}，宽限期 {args.grace_hours:g} 小时）...")
+    run_migrations()
+    report = asyncio.run(run(args))
+
+    action = "可删除" if args.dry_run else "已删除"
+    print(f"   扫描 {report.objects_scanned} 个文件，共 {human_size(report.bytes_scanned)}")
+    print(f"   {action} {report.orphans_deleted} 个孤立文件，回收 {human_size(report.bytes_reclaimed)}")
+    print(f"   宽限期内的无引用文件 {report.orphans_in_grace} 个，无法识别的键 {report.unknown_skipped} 个")
+    print(f"   文件缺失的简历 {report.missing_flagged} 份，文件已恢复 {report.missing_restored} 份")
+    print(f"✅ 对账完成，耗时 {report.elapsed_seconds:.1f}s")
+    if report.missing_flagged:
+        print("⚠️  有简历的文件缺失，见 resumes.file_missing_at")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
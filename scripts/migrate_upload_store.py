@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+上传文件迁移到按内容寻址的存储
+把 uploads/<uuid>.<ext> 平铺存放的简历文件搬到当前存储后端的 ab/cd/<sha256>
+（本地为 uploads/ab/cd/<sha256>，STORAGE_BACKEND=s3 时上传到对象存储），更新 resumes.file_path、回填 content_hash 并登记 stored_files 引用计数，相同内容只保留一份。
+
+可重复执行：只处理 content_hash 为空的简历。每批先把文件复制到存储位置，
+数据库提交后才删除旧文件，中途失败不会丢失文件。
+
+用法: poetry run python scripts/migrate_upload_store.py [--dry-run] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+
+# 添加app目录到Python路径
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.database import SessionLocal
+from app.db.init_db import run_migrations
+from app.crud.stored_file import stored_file_crud
+from app.models.resume import Resume
+from app.services.file_service import file_service
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def place_blob(source: str, content_hash: str) -> str:
+    """把文件复制到存储（已存在时跳过），返回存储位置"""
+    key = file_service.blob_key(content_hash)
+    if not await file_service.storage.exists(key):
+        await file_service.storage.put_file(key, source)
+    return file_service.blob_path(content_hash)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="上传文件迁移到按内容寻址的存储")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不修改文件和数据库")
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    print("📦 迁移上传文件到内容寻址存储...")
+    run_migrations()
+    db = SessionLocal()
+    migrated = missing = 0
+    hashes = set()
+    last_id = 0
+    try:
+        while True:
+            resumes = (
+                db.query(Resume)
+                .filter(Resume.content_hash.is_(None), Resume.id > last_id)
+                .order_by(Resume.id)
+                .limit(args.batch_size)
+                .all()
+            )
+            if not resumes:
+                break
+            last_id = resumes[-1].id
+
+            old_paths = []
+            for resume in resumes:
+                if not resume.file_path or not os.path.isfile(resume.file_path):
+                    print(f"⚠️  简历 {resume.id} 的文件不存在，跳过: {resume.file_path}")
+                    missing += 1
+                    continue
+                content_hash = file_sha256(resume.file_path)
+                hashes.add(content_hash)
+                migrated += 1
+                if args.dry_run:
+                    continue
+                new_path = asyncio.run(place_blob(resume.file_path, content_hash))
+                if os.path.abspath(new_path) != os.path.abspath(resume.file_path):
+                    old_paths.append(resume.file_path)
+                stored_file_crud.acquire(db, content_hash=content_hash, size=os.path.getsize(resume.file_path))
+                resume.file_path = new_path
+                resume.content_hash = content_hash
+
+            if args.dry_run:
+                db.expunge_all()
+                continue
+            db.commit()
+            db.expunge_all()
+            # 数据库已指向新路径，旧文件可以删除
+            for path in old_paths:
+                file_service.delete_file(path)
+            print(f"   已处理到简历 {last_id}，累计迁移 {migrated} 份")
+    finally:
+        db.close()
+
+    action = "可迁移" if args.dry_run else "已迁移"
+    print(f"✅ {action} {migrated} 份简历，去重后 {len(hashes)} 个文件，{missing} 份文件缺失")
+    if missing:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
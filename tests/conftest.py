@@ -0,0 +1,69 @@
+"""测试公共配置
+
+测试使用临时目录中的SQLite数据库、上传目录和向量索引目录。
+app 的配置和数据库引擎在导入时创建，环境变量必须在导入 app 之前设置。
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.TemporaryDirectory(prefix="hr-copilot-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp.name, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(_tmp.name, "uploads")
+os.environ["VECTOR_INDEX_DIR"] = os.path.join(_tmp.name, "vectors")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["STORAGE_GC_INTERVAL_HOURS"] = "0"
+# litellm 导入时不联网拉取模型价格表
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+import app.models  # noqa: E402,F401  注册全部模型
+from app.db.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.db.fulltext import candidate_fulltext  # noqa: E402
+from app.db.init_db import run_migrations  # noqa: E402
+from app.services.facet_index import facet_index  # noqa: E402
+from app.services.query_cache import query_cache  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """迁移到最新版本并创建全文索引（整个测试会话一次）"""
+    run_migrations()
+    candidate_fulltext.ensure_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+def clear_database() -> None:
+    """删除全部业务数据，保留表结构"""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+        if candidate_fulltext.available:
+            conn.execute(text("DELETE FROM candidates_fts"))
+
+
+@pytest.fixture
+def db():
+    """同步数据库会话；测试结束后清空数据和进程内索引、缓存"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        clear_database()
+        facet_index._reset()
+        facet_index.ready = False
+        query_cache.invalidate()
+
+
+@pytest_asyncio.fixture
+async def async_db():
+    """异步数据库会话（每个测试的事件循环不同，结束后释放连接池）"""
+    from app.db.database import AsyncSessionLocal
+    async with AsyncSessionLocal() as session:
+        yield session
+    await async_engine.dispose()
@@ -0,0 +1,96 @@
+"""分面位图索引：位图运算，以及与SQL筛选路径的结果一致性"""
+
+import random
+
+import pytest
+
+from app.crud.candidate import candidate_crud
+from app.schemas.candidate import CandidateCreate, CandidateUpdate
+from app.services.facet_index import Bitmap, facet_index
+
+STATUSES = ["pending", "interviewed", "rejected", "hired"]
+SKILLS = ["Python", "Java", "Go", "React", "Docker", "k8s"]
+EDUCATIONS = [None, "本科 计算机", "硕士", "大专", "北京大学 博士", "本科/硕士"]
+
+CRITERIA = [
+    {},
+    {"status": "hired"},
+    {"skills": ["python"]},
+    {"skills": ["Python", "docker"]},
+    {"skills": ["go", "React"], "skill_match": "any"},
+    {"skills": ["Rust"]},
+    {"min_experience": 3},
+    {"max_experience": 2},
+    {"min_experience": 2, "max_experience": 5},
+    {"education": "本科"},
+    {"education": "硕士", "status": "pending", "min_experience": 1},
+    {"skills": ["java", "k8s"], "skill_match": "any", "max_experience": 10, "education": "博士"},
+]
+
+
+def test_bitmap_operations_and_slice():
+    a = Bitmap.from_ids([1, 5, 70000, 70001, 200000])
+    b = Bitmap.from_ids([5, 70001, 300000])
+    assert list(a & b) == [5, 70001]
+    assert list(a | b) == [1, 5, 70000, 70001, 200000, 300000]
+    assert len(a) == 5 and 70000 in a and 2 not in a
+
+    a.discard(70000)
+    a.add(3)
+    assert list(a) == [1, 3, 5, 70001, 200000]
+    assert a.slice(skip=1, limit=2) == [3, 5]
+    assert a.slice(limit=2, after=5) == [70001, 200000]
+    assert a.slice(skip=1, limit=10, after=3) == [70001, 200000]
+    assert a.slice(limit=10, after=200000) == []
+
+
+@pytest.fixture
+def candidates(db):
+    """随机生成的候选人（固定种子），构建分面索引"""
+    rng = random.Random(28)
+    ids = []
+    for i in range(120):
+        candidate = candidate_crud.create(db, obj_in=CandidateCreate(
+            name=f"候选人{i}",
+            skills=rng.sample(SKILLS, rng.randint(0, 3)),
+            experience_years=rng.choice([None, 0, 1, 2, 3, 5, 8, 12, 60]),
+            education=rng.choice(EDUCATIONS),
+        ))
+        ids.append(candidate.id)
+    for status in STATUSES:
+        candidate_crud.bulk_update_status(db, ids=rng.sample(ids, 20), status=status)
+    facet_index.build(db)
+    return ids
+
+
+def sql_ids(db, criteria):
+    query, _ = candidate_crud._filter_query(db, **criteria)
+    return {c.id for c in query}
+
+
+@pytest.mark.parametrize("criteria", CRITERIA)
+def test_match_agrees_with_sql(db, candidates, criteria):
+    assert set(facet_index.match(**criteria)) == sql_ids(db, criteria)
+
+
+def test_match_stays_consistent_after_writes(db, candidates):
+    rng = random.Random(2800)
+    for candidate_id in rng.sample(candidates, 10):
+        candidate_crud.update(db, db_obj=candidate_crud.get(db, candidate_id), obj_in=CandidateUpdate(
+            skills=rng.sample(SKILLS, 2), experience_years=rng.randint(0, 15), education="硕士"
+        ))
+    for candidate_id in rng.sample(candidates, 5):
+        candidate_crud.delete(db, id=candidate_id)
+    candidate_crud.bulk_update_status(db, ids=rng.sample(candidates[:60], 10), status="hired")
+    candidate_crud.create(db, obj_in=CandidateCreate(name="新人", skills=["python"], experience_years=4))
+
+    for criteria in CRITERIA:
+        assert set(facet_index.match(**criteria)) == sql_ids(db, criteria), criteria
+
+
+def test_can_answer_falls_back_to_sql(candidates):
+    assert not facet_index.can_answer(keywords=["python"])
+    assert not facet_index.can_answer(education="计算机")
+    assert not facet_index.can_answer(min_experience=51)
+    assert not facet_index.can_answer(max_experience=50)
+    assert facet_index.can_answer(min_experience=50)
@@ -0,0 +1,83 @@
+"""模糊关键词筛选：三元组召回与结构化条件的组合"""
+
+from app.crud.candidate import candidate_crud
+from app.db.fulltext import candidate_fulltext
+from app.schemas.candidate import CandidateCreate
+
+
+def create_candidates(db, count, **fields):
+    return [
+        candidate_crud.create(db, obj_in=CandidateCreate(name=f"候选人{i}", **fields)).id
+        for i in range(count)
+    ]
+
+
+def test_fuzzy_recall_is_not_capped_by_structured_filters(db):
+    # 600个命中三元组但状态不符的候选人，按bm25排在符合条件的候选人之前
+    create_candidates(db, 600, current_company="Microsoft")
+    hired = create_candidates(db, 3, current_company="Microsoft China Research and Development Center")
+    candidate_crud.bulk_update_status(db, ids=hired, status="hired")
+
+    page = candidate_crud.filter_page(db, keywords=["Microsfot"], fuzzy=True, status="hired", limit=10)
+
+    assert sorted(c.id for c in page.candidates) == hired
+    assert page.total_count == 3
+    assert page.next_cursor is None
+
+
+def test_fuzzy_total_count_and_cursor_cover_all_matches(db):
+    matched = create_candidates(db, 520, current_company="阿里巴巴集团")
+    create_candidates(db, 5, current_company="腾讯")
+
+    seen, after = [], None
+    while True:
+        page = candidate_crud.filter_page(db, keywords=["阿里巴巴"], fuzzy=True, limit=200, after=after)
+        assert page.total_count == 520
+        seen.extend(c.id for c in page.candidates)
+        if page.next_cursor is None:
+            break
+        after = page.next_cursor
+
+    assert sorted(seen) == matched
+    assert candidate_crud.matching_ids(db, keywords=["阿里巴巴"], fuzzy=True) == matched
+    assert candidate_crud.matching_ids(db, keywords=["阿里巴巴"], fuzzy=True, status="rejected") == []
+
+
+def count_rescored_rows(monkeypatch):
+    """记录每次召回后在Python中重新打分的行数"""
+    counts = []
+    score_rows = candidate_fulltext._score_rows
+
+    def counting(rows, *args):
+        rows = list(rows)
+        counts.append(len(rows))
+        return score_rows(rows, *args)
+
+    monkeypatch.setattr(candidate_fulltext, "_score_rows", counting)
+    return counts
+
+
+def test_fuzzy_recall_skips_candidates_that_cannot_reach_threshold(db, monkeypatch):
+    # 400个姓名只与查询共有 per、ers 等少数三元组的候选人，相似度不可能达到阈值
+    decoys = [candidate_crud.create(db, obj_in=CandidateCreate(name=f"Person{i}")).id for i in range(400)]
+    target = candidate_crud.create(db, obj_in=CandidateCreate(name="Person12345")).id
+    counts = count_rescored_rows(monkeypatch)
+
+    page = candidate_crud.filter_page(db, keywords=["Persn12345"], fuzzy=True, limit=10)
+
+    assert [c.id for c in page.candidates] == [target]
+    assert not page.total_count_capped
+    assert sum(counts) <= 10, f"{len(decoys)} 个不可能达到阈值的候选人中召回了 {sum(counts)} 行"
+
+
+def test_capped_fuzzy_recall_keeps_closest_matches(db):
+    # 300个候选人都达到阈值，召回上限20时保留重合三元组最多的 Person12、Person120-129
+    ids = {f"Person{i}": candidate_crud.create(db, obj_in=CandidateCreate(name=f"Person{i}")).id for i in range(300)}
+
+    matches = candidate_fulltext.fuzzy_scores(db, ["Person12"], recall_limit=20)
+
+    assert matches.capped
+    assert len(matches.scores) <= 40
+    assert matches.scores[ids["Person12"]] == 1.0
+    assert {ids[f"Person12{i}"] for i in range(10)} <= set(matches.scores)
+    assert len(candidate_fulltext.fuzzy_scores(db, ["Person12"], recall_limit=None).scores) == 300
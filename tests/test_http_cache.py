@@ -0,0 +1,155 @@
+"""条件请求与字节范围：解析函数和简历下载接口"""
+
+import hashlib
+import os
+import time
+from datetime import timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core.http_cache import (
+    RangeNotSatisfiable,
+    http_date,
+    if_range_matches,
+    is_not_modified,
+    parse_range,
+)
+from app.crud.candidate import candidate_crud
+from app.crud.resume import resume_crud
+from app.crud.stored_file import stored_file_crud
+from app.main import app
+from app.schemas.candidate import CandidateCreate
+from app.services.file_service import file_service
+
+ETAG = '"abc123"'
+MTIME = 1700000000.5
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("items=0-10", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=0-9,20-29", None),  # 多个范围返回完整文件
+    ("bytes=50-10", None),
+    ("bytes=a-b", None),
+    ("bytes=-", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0"])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 1000)
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert is_not_modified(make_request(if_none_match=ETAG), ETAG, MTIME)
+    assert is_not_modified(make_request(if_none_match=f'"other", W/{ETAG}'), ETAG, MTIME)
+    assert is_not_modified(make_request(if_none_match="*"), ETAG, MTIME)
+    assert not is_not_modified(make_request(if_none_match='"other"'), ETAG, MTIME)
+    assert not is_not_modified(make_request(if_none_match=ETAG), None, MTIME)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    request = make_request(if_none_match='"other"', if_modified_since=http_date(MTIME + 60))
+    assert not is_not_modified(request, ETAG, MTIME)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    assert is_not_modified(make_request(if_modified_since=http_date(MTIME)), ETAG, MTIME)
+    assert not is_not_modified(make_request(if_modified_since=http_date(MTIME - 60)), ETAG, MTIME)
+    assert not is_not_modified(make_request(if_modified_since="not a date"), ETAG, MTIME)
+    assert not is_not_modified(make_request(), ETAG, MTIME)
+
+
+def test_if_range_requires_strong_etag_or_exact_date():
+    last_modified = http_date(MTIME)
+    assert if_range_matches(make_request(), ETAG, last_modified)
+    assert if_range_matches(make_request(if_range=ETAG), ETAG, last_modified)
+    assert not if_range_matches(make_request(if_range='"other"'), ETAG, last_modified)
+    assert not if_range_matches(make_request(if_range=f"W/{ETAG}"), f"W/{ETAG}", last_modified)
+    assert if_range_matches(make_request(if_range=last_modified), ETAG, last_modified)
+    assert not if_range_matches(make_request(if_range=http_date(MTIME - 60)), ETAG, last_modified)
+
+
+@pytest.fixture
+def stored_resume(db):
+    """内容寻址存储中的一份PDF简历，返回 (resume_id, 内容)"""
+    content = b"%PDF-1.4\n" + bytes(range(256)) * 40
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = file_service.blob_path(content_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    candidate = candidate_crud.create(db, obj_in=CandidateCreate(name="张三"))
+    resume = resume_crud.create(
+        db, filename="简历.pdf", file_path=path, file_size=len(content), file_type="pdf",
+        candidate_id=candidate.id, content_hash=content_hash
+    )
+    yield resume.id, content
+    os.remove(path)
+
+
+def test_download_conditional_and_range_requests(stored_resume):
+    resume_id, content = stored_resume
+    client = TestClient(app)
+    url = f"/api/resumes/{resume_id}/download"
+
+    full = client.get(url)
+    assert full.status_code == 200
+    assert full.content == content
+    etag = full.headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    partial = client.get(url, headers={"Range": "bytes=10-19"})
+    assert partial.status_code == 206
+    assert partial.content == content[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(content)}"
+
+    # If-Range 不匹配时忽略 Range 返回完整文件
+    stale = client.get(url, headers={"Range": "bytes=10-19", "If-Range": '"stale"'})
+    assert stale.status_code == 200
+    assert stale.content == content
+
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={len(content)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(content)}"
+
+
+def test_download_last_modified_ignores_blob_rewrites(db, stored_resume):
+    resume_id, content = stored_resume
+    client = TestClient(app)
+    url = f"/api/resumes/{resume_id}/download"
+    stored = stored_file_crud.get(db, hashlib.sha256(content).hexdigest())
+    created = stored.created_at.replace(tzinfo=timezone.utc).timestamp()
+
+    first = client.get(url)
+    assert first.headers["last-modified"] == http_date(created)
+
+    # 相同内容重新上传会重写文件并改变修改时间
+    later = time.time() + 3600
+    os.utime(file_service.blob_path(stored.sha256), (later, later))
+    second = client.get(url)
+    assert second.headers["last-modified"] == first.headers["last-modified"]
+    assert client.get(url, headers={"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
+    assert client.get(url, headers={
+        "Range": "bytes=0-9", "If-Range": first.headers["last-modified"]
+    }).status_code == 206
@@ -0,0 +1,79 @@
+"""数据迁移的回填：在独立的SQLite库上从旧版本升级"""
+
+import json
+
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+
+from app.db.compression import compress_text, decompress_text
+from app.db.init_db import MIGRATIONS_DIR
+from app.services.document_parser import document_parser
+
+RAW_TEXT = "张三\n电话：13800000000\n\n教育背景\n北京大学 本科\n\n工作经历\n2019-至今 阿里巴巴 后端工程师\n"
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    yield engine
+    engine.dispose()
+
+
+def migrate(engine, revision: str, downgrade: bool = False) -> None:
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        (command.downgrade if downgrade else command.upgrade)(config, revision)
+
+
+def test_0004_moves_resume_text_into_compressed_side_table(old_engine):
+    migrate(old_engine, "0003")
+    with old_engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO candidates (id, name) VALUES (1, '张三')"))
+        conn.execute(sa.text(
+            "INSERT INTO resumes (id, filename, file_path, file_type, raw_text, extracted_data, candidate_id) VALUES "
+            "(1, 'a.pdf', 'uploads/a.pdf', 'pdf', :text, '{\"name\": \"张三\"}', 1), "
+            "(2, 'b.pdf', 'uploads/b.pdf', 'pdf', NULL, NULL, 1)"
+        ), {"text": RAW_TEXT})
+
+    migrate(old_engine, "0004")
+    with old_engine.connect() as conn:
+        rows = conn.execute(sa.text(
+            "SELECT resume_id, compressed_text, text_length, extracted_data FROM resume_contents"
+        )).all()
+        columns = {c["name"] for c in sa.inspect(conn).get_columns("resumes")}
+    assert [(r.resume_id, decompress_text(r.compressed_text), r.text_length) for r in rows] == [
+        (1, RAW_TEXT, len(RAW_TEXT))
+    ]
+    assert json.loads(rows[0].extracted_data) == {"name": "张三"}
+    assert "raw_text" not in columns and "extracted_data" not in columns
+
+    migrate(old_engine, "0003", downgrade=True)
+    with old_engine.connect() as conn:
+        restored = conn.execute(sa.text("SELECT id, raw_text FROM resumes ORDER BY id")).all()
+    assert [tuple(r) for r in restored] == [(1, RAW_TEXT), (2, None)]
+
+
+def test_0010_backfills_resume_sections(old_engine):
+    migrate(old_engine, "0009")
+    with old_engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO candidates (id, name) VALUES (1, '张三')"))
+        conn.execute(sa.text(
+            "INSERT INTO resumes (id, filename, file_path, file_type, candidate_id) VALUES "
+            "(1, 'a.pdf', 'uploads/a.pdf', 'pdf', 1), (2, 'b.pdf', 'uploads/b.pdf', 'pdf', 1)"
+        ))
+        conn.execute(sa.text(
+            "INSERT INTO resume_contents (resume_id, compressed_text, text_length) VALUES "
+            "(1, :text, :length), (2, NULL, NULL)"
+        ), {"text": compress_text(RAW_TEXT), "length": len(RAW_TEXT)})
+
+    migrate(old_engine, "0010")
+    with old_engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT resume_id, sections FROM resume_contents ORDER BY resume_id")).all()
+    sections = json.loads(rows[0].sections)
+    assert sections == document_parser.split_sections(RAW_TEXT)
+    assert [s["name"] for s in sections] == ["contact", "education", "experience"]
+    assert rows[1].sections is None
@@ -0,0 +1,124 @@
+"""键集分页：游标编码，以及各筛选路径逐页读取与一次读取的结果一致"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.crud.candidate import candidate_crud
+from app.main import app
+from app.schemas.candidate import CandidateCreate
+from app.services.facet_index import facet_index
+
+
+def test_cursor_round_trip():
+    values = {"rank": -1.25, "id": 42}
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == values
+    assert encode_cursor(None) is None
+    assert decode_cursor(None) is None and decode_cursor("") is None
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor({"rank": 1}), encode_cursor({"id": "7"}), "W10"])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def candidates(db):
+    ids = []
+    for i in range(37):
+        candidate = candidate_crud.create(db, obj_in=CandidateCreate(
+            name=f"候选人{i}",
+            current_position="Backend Engineer" if i % 3 else "Frontend Engineer Engineer",
+            skills=["python"] if i % 2 else ["java"],
+            experience_years=i % 7,
+        ))
+        ids.append(candidate.id)
+    return ids
+
+
+def page_through(db, limit, **filters):
+    """按游标逐页读取，返回全部结果ID和每页的总数"""
+    seen, totals, after = [], set(), None
+    while True:
+        page = candidate_crud.filter_page(db, limit=limit, after=after, **filters)
+        totals.add(page.total_count)
+        seen.extend(c["id"] if isinstance(c, dict) else c.id for c in page.candidates)
+        if page.next_cursor is None:
+            return seen, totals
+        # 游标经过编码、解码后再使用，与接口一致
+        after = decode_cursor(encode_cursor(page.next_cursor))
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"skills": ["python"]},
+    {"min_experience": 2, "max_experience": 4},
+    {"keywords": ["engineer"]},
+    {"keywords": ["Backend"], "fields": ["id", "name"]},
+    {"skills": ["java"], "fields": ["id", "name", "skills"]},
+])
+@pytest.mark.parametrize("use_facet_index", [False, True])
+def test_pages_match_single_query(db, candidates, filters, use_facet_index):
+    if use_facet_index:
+        facet_index.build(db)
+    expected = candidate_crud.filter_page(db, limit=1000, **filters)
+    expected_ids = [c["id"] if isinstance(c, dict) else c.id for c in expected.candidates]
+
+    seen, totals = page_through(db, 5, **filters)
+
+    assert seen == expected_ids
+    assert totals == {len(expected_ids)}
+
+
+def test_cursor_is_stable_when_rows_are_added_before_it(db, candidates):
+    first = candidate_crud.filter_page(db, limit=10)
+    candidate_crud.delete(db, id=first.candidates[0].id)
+    candidate_crud.create(db, obj_in=CandidateCreate(name="新人"))
+
+    second = candidate_crud.filter_page(db, limit=10, after=first.next_cursor)
+    assert [c.id for c in second.candidates] == candidates[10:20]
+
+
+def test_broad_keyword_pages_by_id_with_capped_count(db, candidates, monkeypatch):
+    """命中超过上限的关键词按ID分页、总数只统计到上限；命中不多的关键词仍按相关度排序"""
+    monkeypatch.setattr("app.crud.candidate.RANKED_MATCH_LIMIT", 10)
+
+    first = candidate_crud.filter_page(db, keywords=["engineer"], limit=5)
+    assert (first.total_count, first.total_count_capped) == (10, True)
+    assert first.next_cursor["rank"] is None
+    seen, totals = page_through(db, 5, keywords=["engineer"])
+    assert seen == candidates
+    assert totals == {10}
+
+    narrow = candidate_crud.filter_page(db, keywords=["frontend"], skills=["java"], limit=100)
+    assert (narrow.total_count, narrow.total_count_capped) == (7, False)
+    assert [c.id for c in narrow.candidates] == [candidates[i] for i in range(0, 37, 6)]
+
+    client = TestClient(app)
+    body = client.post("/api/candidates/filter", json={"keywords": ["engineer"]}, params={"limit": 5}).json()
+    assert (body["total_count"], body["total_count_capped"]) == (10, True)
+
+
+def test_cursor_from_another_ordering_is_rejected(db, candidates):
+    page = candidate_crud.filter_page(db, limit=5)
+    with pytest.raises(ValueError):
+        candidate_crud.filter_page(db, keywords=["engineer"], limit=5, after=page.next_cursor)
+
+
+def test_list_endpoint_cursor_headers(db, candidates):
+    client = TestClient(app)
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/candidates/", params={"limit": 10, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == str(len(candidates))
+        seen.extend(c["id"] for c in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == candidates
+
+    assert client.get("/api/candidates/", params={"cursor": "garbage"}).status_code == 400
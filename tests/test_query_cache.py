@@ -0,0 +1,123 @@
+"""查询结果缓存：LRU、按写入代数失效，以及候选人写入后接口不返回旧结果"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud.candidate import candidate_crud
+from app.main import app
+from app.schemas.candidate import CandidateCreate, CandidateUpdate, FilterRequest
+from app.services.query_cache import QueryCache, normalize_filter_params
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    compute = Counter()
+    assert cache.get_or_compute("ns", {"a": 1}, compute) == 1
+    assert cache.get_or_compute("ns", {"a": 1}, compute) == 1
+    assert cache.get_or_compute("ns", {"a": 2}, compute) == 2
+    assert cache.get_or_compute("ns", {"a": 1}, compute) == 1  # 最近使用，留在缓存中
+    assert cache.get_or_compute("ns", {"a": 3}, compute) == 3  # 淘汰 {"a": 2}
+    assert cache.get_or_compute("ns", {"a": 2}, compute) == 4
+    assert cache.get_or_compute("other", {"a": 1}, compute) == 5
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 5, 3, 2)
+
+
+def test_parameter_order_does_not_matter():
+    cache = QueryCache()
+    compute = Counter()
+    cache.get_or_compute("ns", {"a": 1, "b": [1, 2]}, compute)
+    assert cache.get_or_compute("ns", {"b": [1, 2], "a": 1}, compute) == 1
+
+
+def test_invalidate_clears_entries():
+    cache = QueryCache()
+    compute = Counter()
+    cache.get_or_compute("ns", {}, compute)
+    cache.invalidate()
+    assert cache.get_or_compute("ns", {}, compute) == 2
+    assert cache.stats()["generation"] == 1
+
+
+def test_result_computed_across_a_write_is_not_stored():
+    cache = QueryCache()
+
+    def compute_while_writing():
+        cache.invalidate()
+        return "stale"
+
+    assert cache.get_or_compute("ns", {}, compute_while_writing) == "stale"
+    assert cache.get_or_compute("ns", {}, lambda: "fresh") == "fresh"
+
+
+def test_disabled_cache_always_computes():
+    cache = QueryCache(max_entries=0)
+    compute = Counter()
+    cache.get_or_compute("ns", {}, compute)
+    assert cache.get_or_compute("ns", {}, compute) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_async_variant_skips_store_after_write():
+    cache = QueryCache()
+
+    async def compute():
+        cache.invalidate()
+        return "stale"
+
+    async def fresh():
+        return "fresh"
+
+    async def run():
+        assert await cache.aget_or_compute("ns", {}, compute) == "stale"
+        assert await cache.aget_or_compute("ns", {}, fresh) == "fresh"
+        assert await cache.aget_or_compute("ns", {}, compute) == "fresh"
+
+    asyncio.run(run())
+
+
+def test_equivalent_filters_share_a_key():
+    a = FilterRequest(keywords=[" Python ", "go", "go"], skills=["Python", "K8S "], tags=["Urgent"])
+    b = FilterRequest(keywords=["go", "Python"], skills=["k8s", "python"], tags=[" Urgent  "])
+    assert QueryCache.make_key("f", normalize_filter_params(a)) == QueryCache.make_key("f", normalize_filter_params(b))
+
+
+@pytest.mark.parametrize("write", ["create", "update", "delete", "bulk_status"])
+def test_filter_endpoint_sees_candidate_writes(db, write):
+    client = TestClient(app)
+    existing = candidate_crud.create(db, obj_in=CandidateCreate(name="张三", skills=["python"]))
+    body = {"skills": ["python"], "status": "pending"}
+
+    def matched_ids():
+        response = client.post("/api/candidates/filter", json=body)
+        assert response.status_code == 200
+        return sorted(c["id"] for c in response.json()["candidates"])
+
+    assert matched_ids() == [existing.id]
+    assert matched_ids() == [existing.id]  # 命中缓存
+
+    if write == "create":
+        added = candidate_crud.create(db, obj_in=CandidateCreate(name="李四", skills=["Python"]))
+        expected = [existing.id, added.id]
+    elif write == "update":
+        candidate_crud.update(db, db_obj=existing, obj_in=CandidateUpdate(skills=["java"]))
+        expected = []
+    elif write == "delete":
+        candidate_crud.delete(db, id=existing.id)
+        expected = []
+    else:
+        candidate_crud.bulk_update_status(db, ids=[existing.id], status="hired")
+        expected = []
+    assert matched_ids() == expected
@@ -0,0 +1,88 @@
+"""热点查询执行计划：运行CRUD中的热点查询，EXPLAIN QUERY PLAN 中不得出现业务表的全表扫描"""
+
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.crud.candidate import candidate_crud
+from app.crud.resume import resume_crud
+from app.db.database import engine
+from app.schemas.candidate import CandidateCreate
+
+# 业务表上出现 SCAN 即视为全表（或全索引）扫描
+FULL_SCAN_PATTERN = re.compile(r"^SCAN (candidates|resumes|candidate_skills)\b")
+
+HOT_QUERIES = {
+    "按ID获取候选人": lambda db: candidate_crud.get(db, 10),
+    "按邮箱获取候选人": lambda db: candidate_crud.get_by_email(db, "user10@example.com"),
+    "候选人列表键集分页": lambda db: candidate_crud.get_multi(db, limit=20, after_id=100),
+    "候选人简历列表": lambda db: resume_crud.get_by_candidate(db, 10),
+    "状态筛选": lambda db: candidate_crud.filter_page(db, status="pending", limit=20, after={"id": 50}),
+    "工作年限筛选": lambda db: candidate_crud.filter_page(
+        db, min_experience=3, max_experience=5, limit=20, after={"id": 50}
+    ),
+    "多技能交集筛选": lambda db: candidate_crud.filter_page(db, skills=["Python", "Java"], limit=20),
+    "多技能并集筛选": lambda db: candidate_crud.filter_page(
+        db, skills=["Python", "Go"], skill_match="any", limit=20
+    ),
+    "关键词全文检索": lambda db: candidate_crud.filter_page(db, keywords=["Python开发"], limit=20),
+    "关键词与技能组合": lambda db: candidate_crud.filter_page(
+        db, keywords=["Python开发"], skills=["Python"], limit=20
+    ),
+}
+
+
+@pytest.fixture
+def seeded(db):
+    """写入少量数据并收集统计信息，让查询规划器按真实分布选择索引"""
+    skills_pool = ["Python", "Java", "Go", "React", "后端开发"]
+    for i in range(200):
+        candidate = candidate_crud.create(db, obj_in=CandidateCreate(
+            name=f"候选人{i}",
+            email=f"user{i}@example.com",
+            experience_years=i % 12,
+            current_position="Python开发工程师" if i % 2 else "Java工程师",
+            skills=skills_pool[i % 5:i % 5 + 2],
+        ))
+        resume_crud.create(
+            db, filename=f"resume_{i}.pdf", file_path=f"uploads/resume_{i}.pdf",
+            file_size=1024, file_type="pdf", candidate_id=candidate.id
+        )
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    yield db
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM sqlite_stat1")
+
+
+def explain(statement, parameters):
+    """返回查询计划的每一行描述"""
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_indexes(seeded, name):
+    captured = []
+
+    def capture_select(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture_select)
+    try:
+        HOT_QUERIES[name](seeded)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture_select)
+
+    assert captured
+    for statement, parameters in captured:
+        plan = explain(statement, parameters)
+        scans = [line for line in plan if FULL_SCAN_PATTERN.match(line)]
+        assert not scans, f"{name} 退化为全表扫描: {scans}\nSQL: {' '.join(statement.split())}"
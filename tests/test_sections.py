@@ -0,0 +1,58 @@
+"""简历分段：标题识别与字符偏移"""
+
+from app.services.document_parser import document_parser
+
+RESUME = """张三
+电话：13800000000  邮箱：zhangsan@example.com
+
+一、教育背景
+2015-2019 北京大学 计算机科学 本科
+
+【工作经历】
+2019-至今 阿里巴巴 后端工程师
+负责订单系统的技能改造
+
+专业技能：Python, Go, Kubernetes
+Project Experience
+Order service rewrite
+自我评价
+踏实肯干
+"""
+
+
+def names(sections):
+    return [section["name"] for section in sections]
+
+
+def test_split_sections_names_and_offsets():
+    sections = document_parser.split_sections(RESUME)
+
+    assert names(sections) == ["contact", "education", "experience", "skills", "projects", "other"]
+    # 各段首尾相接，覆盖全文
+    assert sections[0]["start"] == 0
+    assert sections[-1]["end"] == len(RESUME)
+    assert all(a["end"] == b["start"] for a, b in zip(sections, sections[1:]))
+    assert document_parser.section_text(RESUME, sections, "education") == (
+        "一、教育背景\n2015-2019 北京大学 计算机科学 本科"
+    )
+    assert document_parser.section_text(RESUME, sections, "skills") == "专业技能：Python, Go, Kubernetes"
+
+
+def test_heading_words_inside_body_lines_are_not_headings():
+    text = "工作经历\n在项目中负责技能培训和教育背景调查等工作，持续三年以上的长期工作内容描述\n技能提升很快\n"
+    assert names(document_parser.split_sections(text)) == ["experience"]
+
+
+def test_text_without_headings():
+    assert document_parser.split_sections("") == []
+    assert document_parser.split_sections("  \n") == []
+    assert document_parser.split_sections("张三 13800000000") == [
+        {"name": "contact", "start": 0, "end": len("张三 13800000000")}
+    ]
+
+
+def test_same_section_twice_is_joined():
+    text = "Experience\nA corp\nEducation\nMIT\nInternships\nB corp\n"
+    sections = document_parser.split_sections(text)
+    assert names(sections) == ["experience", "education", "experience"]
+    assert document_parser.section_text(text, sections, "experience") == "Experience\nA corp\nInternships\nB corp"
@@ -0,0 +1,173 @@
+"""存储后端：本地文件系统和S3（moto 模拟）的读写、分片上传、批量删除、列举和预签名URL"""
+
+import asyncio
+import os
+import uuid
+
+import pytest
+import requests
+
+from app.services.storage import LocalStorageBackend, S3StorageBackend
+
+BUCKET = "hr-copilot-test"
+# S3 除最后一片外每个分片至少 5MB
+PART_SIZE = 5 * 1024 * 1024
+
+
+async def chunks_of(data: bytes, size: int = 1024 * 1024):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def read_all(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    return LocalStorageBackend(str(tmp_path / "uploads"))
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    """本机启动的 moto S3 服务
+
+    aiobotocore 通过 aiohttp 发送请求，moto 的 mock_aws 无法在进程内拦截，因此使用服务模式。
+    """
+    pytest.importorskip("aioboto3")
+    server_module = pytest.importorskip("moto.server")
+    server = server_module.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    storage = make_s3_storage(endpoint)
+
+    async def create_bucket():
+        async with storage._client() as s3:
+            await s3.create_bucket(Bucket=BUCKET)
+
+    asyncio.run(create_bucket())
+    yield endpoint
+    server.stop()
+
+
+def make_s3_storage(endpoint: str, prefix: str = "") -> S3StorageBackend:
+    return S3StorageBackend(
+        BUCKET, prefix=prefix, endpoint_url=endpoint, region="us-east-1",
+        access_key_id="testing", secret_access_key="testing",
+        multipart_threshold=PART_SIZE, multipart_chunk_size=PART_SIZE
+    )
+
+
+@pytest.fixture
+def s3_storage(s3_endpoint):
+    """每个测试使用独立的键前缀"""
+    return make_s3_storage(s3_endpoint, prefix=f"test-{uuid.uuid4().hex[:8]}/")
+
+
+@pytest.fixture(params=["local", "s3"])
+def storage(request):
+    return request.getfixturevalue(f"{request.param}_storage")
+
+
+@pytest.mark.asyncio
+async def test_put_get_stat_and_range(storage):
+    data = b"%PDF-1.4 " + os.urandom(3000)
+    assert await storage.put_stream("aa/bb/small", chunks_of(data, 1000)) == len(data)
+
+    assert await read_all(storage.get_stream("aa/bb/small")) == data
+    assert await read_all(storage.get_stream("aa/bb/small", 10, 1999)) == data[10:2000]
+    assert await read_all(storage.get_stream("aa/bb/small", 2000)) == data[2000:]
+    assert (await storage.stat("aa/bb/small")).size == len(data)
+    assert await storage.stat("aa/bb/missing") is None
+    assert await storage.exists("aa/bb/small")
+
+
+@pytest.mark.asyncio
+async def test_put_file_and_download_to(storage, tmp_path):
+    source = tmp_path / "source.pdf"
+    source.write_bytes(b"resume")
+    await storage.put_file("aa/cc/copied", str(source))
+    assert source.exists()
+    await storage.put_file("aa/cc/moved", str(source), move=True)
+    assert not source.exists()
+
+    target = tmp_path / "target.pdf"
+    await storage.download_to("aa/cc/moved", str(target))
+    assert target.read_bytes() == b"resume"
+    assert await read_all(storage.get_stream("aa/cc/copied")) == b"resume"
+
+
+@pytest.mark.asyncio
+async def test_list_and_delete_many(storage):
+    for key in ["bb/cc/two", "aa/bb/one", "aa/cc/three"]:
+        await storage.put_stream(key, chunks_of(key.encode()))
+
+    assert [item.key async for item in storage.list_objects()] == ["aa/bb/one", "aa/cc/three", "bb/cc/two"]
+    assert [item.key async for item in storage.list_objects("aa/")] == ["aa/bb/one", "aa/cc/three"]
+
+    await storage.delete_many(["aa/bb/one", "bb/cc/two", "zz/zz/missing"])
+    assert [item.key async for item in storage.list_objects()] == ["aa/cc/three"]
+
+
+@pytest.mark.asyncio
+async def test_local_storage_has_no_presigned_url(local_storage):
+    await local_storage.put_stream("aa/bb/file", chunks_of(b"x"))
+    assert local_storage.local_path("aa/bb/file") == os.path.join(local_storage.root, "aa", "bb", "file")
+    assert await local_storage.presigned_url(
+        "aa/bb/file", filename="a.pdf", media_type="application/pdf", expires=60
+    ) is None
+
+
+async def head(storage: S3StorageBackend, key: str) -> dict:
+    async with storage._client() as s3:
+        return await s3.head_object(Bucket=BUCKET, Key=storage._object_key(key))
+
+
+async def pending_uploads(storage: S3StorageBackend) -> list:
+    async with storage._client() as s3:
+        response = await s3.list_multipart_uploads(Bucket=BUCKET, Prefix=storage.prefix)
+    return response.get("Uploads", [])
+
+
+@pytest.mark.asyncio
+async def test_s3_multipart_above_threshold(s3_storage):
+    at_threshold = os.urandom(PART_SIZE)
+    large = os.urandom(2 * PART_SIZE + 123)
+    await s3_storage.put_stream("aa/bb/single", chunks_of(at_threshold))
+    assert await s3_storage.put_stream("aa/bb/large", chunks_of(large)) == len(large)
+
+    # 分片上传的对象 ETag 以 "-<分片数>" 结尾
+    assert "-" not in (await head(s3_storage, "aa/bb/single"))["ETag"]
+    assert (await head(s3_storage, "aa/bb/large"))["ETag"].strip('"').endswith("-3")
+    assert await read_all(s3_storage.get_stream("aa/bb/large")) == large
+    assert await read_all(s3_storage.get_stream("aa/bb/large", PART_SIZE - 10, PART_SIZE + 9)) == \
+        large[PART_SIZE - 10:PART_SIZE + 10]
+    assert await pending_uploads(s3_storage) == []
+
+
+@pytest.mark.asyncio
+async def test_s3_failed_multipart_upload_is_aborted(s3_storage):
+    async def failing_chunks():
+        yield os.urandom(2 * PART_SIZE)
+        raise IOError("客户端断开")
+
+    with pytest.raises(IOError):
+        await s3_storage.put_stream("aa/bb/broken", failing_chunks())
+    assert await pending_uploads(s3_storage) == []
+    assert await s3_storage.stat("aa/bb/broken") is None
+
+
+@pytest.mark.asyncio
+async def test_s3_presigned_url(s3_storage):
+    await s3_storage.put_stream("aa/bb/resume", chunks_of(b"%PDF-1.4 resume"))
+    url = await s3_storage.presigned_url(
+        "aa/bb/resume", filename="简历.pdf", media_type="application/pdf", expires=60
+    )
+
+    response = requests.get(url, timeout=10)
+    assert response.status_code == 200
+    assert response.content == b"%PDF-1.4 resume"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"] == "inline; filename*=UTF-8''%E7%AE%80%E5%8E%86.pdf"
+    assert s3_storage.location("aa/bb/resume") == f"s3://{BUCKET}/{s3_storage.prefix}aa/bb/resume"
@@ -0,0 +1,158 @@
+"""存储对账：孤立文件、宽限期、文件缺失标记，以及 dry_run 不做修改"""
+
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.crud.candidate import candidate_crud
+from app.crud.resume import resume_crud
+from app.crud.stored_file import stored_file_crud
+from app.db.database import SessionLocal
+from app.models.resume import Resume
+from app.schemas.candidate import CandidateCreate
+from app.services.file_service import FileService
+from app.services.storage_gc import StorageReconciler
+
+OLD = time.time() - 3 * 86400
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    """独立上传目录上的文件服务，不受其他测试留下的文件影响"""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    return FileService()
+
+
+def write(path: str, data: bytes, mtime: float = OLD) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def write_blob(files: FileService, data: bytes, mtime: float = OLD) -> str:
+    content_hash = hashlib.sha256(data).hexdigest()
+    write(files.blob_path(content_hash), data, mtime)
+    return content_hash
+
+
+@pytest.fixture
+def layout(db, files):
+    """被引用的文件、超过/未超过宽限期的孤立文件、暂存残留、旧版平铺文件和缺失的文件"""
+    candidate = candidate_crud.create(db, obj_in=CandidateCreate(name="张三"))
+
+    def add_resume(file_path, content_hash=None):
+        return resume_crud.create(
+            db, filename="a.pdf", file_path=file_path, file_size=10, file_type="pdf",
+            candidate_id=candidate.id, content_hash=content_hash
+        ).id
+
+    kept = write_blob(files, b"kept")
+    missing = hashlib.sha256(b"missing").hexdigest()
+    paths = {
+        "kept": files.blob_path(kept),
+        "orphan": files.blob_path(write_blob(files, b"o" * 100)),
+        "recent": files.blob_path(write_blob(files, b"recent", time.time())),
+        "staging": write(os.path.join(files.staging_dir, "dead.part"), b"s" * 20),
+        "legacy_orphan": write(os.path.join(files.upload_dir, "legacy.pdf"), b"l" * 30),
+        "legacy_kept": write(os.path.join(files.upload_dir, "kept.pdf"), b"k"),
+        "unknown": write(os.path.join(files.upload_dir, "ab", "cd", "not-a-hash"), b"?"),
+    }
+    resumes = {
+        "kept": add_resume(paths["kept"], kept),
+        "missing": add_resume(files.blob_path(missing), missing),
+        "legacy_kept": add_resume(paths["legacy_kept"]),
+        "legacy_gone": add_resume(os.path.join(files.upload_dir, "gone.pdf")),
+    }
+    return paths, resumes
+
+
+def missing_flags(db, resumes):
+    db.expire_all()
+    return {name: db.get(Resume, resume_id).file_missing_at is not None for name, resume_id in resumes.items()}
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("async_db")  # 结束时释放异步连接池
+async def test_dry_run_reports_without_changing_anything(db, files, layout):
+    paths, resumes = layout
+    report = await StorageReconciler(files).run(dry_run=True, batch_size=2)
+
+    assert report.dry_run
+    assert report.objects_scanned == 3
+    assert report.orphans_deleted == 3  # 孤立对象、暂存残留、旧版孤立文件
+    assert report.bytes_reclaimed == 100 + 20 + 30
+    assert report.orphans_in_grace == 1
+    assert report.unknown_skipped == 1
+    assert report.missing_flagged == 2
+    assert all(os.path.exists(path) for path in paths.values())
+    assert not any(missing_flags(db, resumes).values())
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("async_db")
+async def test_run_deletes_orphans_and_flags_missing_files(db, files, layout):
+    paths, resumes = layout
+    reconciler = StorageReconciler(files)
+    dry = await reconciler.run(dry_run=True, batch_size=2)
+    report = await reconciler.run(batch_size=2)
+
+    assert report._replace(dry_run=True, elapsed_seconds=0) == dry._replace(elapsed_seconds=0)
+    assert {name for name, path in paths.items() if os.path.exists(path)} == {
+        "kept", "recent", "legacy_kept", "unknown"
+    }
+    assert missing_flags(db, resumes) == {
+        "kept": False, "missing": True, "legacy_kept": False, "legacy_gone": True
+    }
+
+    # 文件恢复后清除缺失标记
+    write_blob(files, b"missing")
+    report = await reconciler.run(batch_size=2)
+    assert report.missing_restored == 1
+    assert report.orphans_deleted == 0
+    assert missing_flags(db, resumes)["missing"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("async_db")
+async def test_orphan_uploaded_again_between_recheck_and_delete_is_kept(db, files, monkeypatch):
+    """没有写队列串行化时（PostgreSQL、多副本），对账删除孤立文件与同样内容的上传交错"""
+    content = b"orphan uploaded again"
+    content_hash = write_blob(files, content)
+    candidate_id = candidate_crud.create(db, obj_in=CandidateCreate(name="张三")).id
+
+    def upload():
+        """另一个连接上的上传：创建简历并登记引用，提交后写入文件"""
+        session = SessionLocal()
+        try:
+            resume_crud.create(
+                session, filename="a.pdf", file_path=files.blob_path(content_hash), file_size=len(content),
+                file_type="pdf", candidate_id=candidate_id, content_hash=content_hash
+            )
+        finally:
+            session.close()
+        write_blob(files, content, time.time())
+
+    delete_blobs = files.delete_blobs
+    threads = []
+
+    def delete_during_upload(content_hashes):
+        # 复查引用之后、删除文件之前开始上传；加锁时上传等待到对账提交之后
+        uploader = threading.Thread(target=upload)
+        uploader.start()
+        uploader.join(0.5)
+        threads.append(uploader)
+        return delete_blobs(content_hashes)
+
+    monkeypatch.setattr(files, "delete_blobs", delete_during_upload)
+    await StorageReconciler(files).run(batch_size=2)
+    threads[0].join()
+
+    assert os.path.exists(files.blob_path(content_hash))
+    db.expire_all()
+    assert stored_file_crud.get(db, content_hash).ref_count == 1
@@ -0,0 +1,209 @@
+"""内容存储引用计数：登记、释放、清理，以及与上传的并发"""
+
+import asyncio
+import hashlib
+import os
+import threading
+
+import pytest
+
+from app.crud.candidate import candidate_crud
+from app.crud.resume import resume_crud
+from app.crud.stored_file import stored_file_crud
+from app.db.database import SessionLocal
+from app.db.write_queue import write_queue
+from app.schemas.candidate import CandidateCreate
+from app.services.file_service import StagedFile, file_service
+from app.services.storage import StorageBackend
+
+
+class MemoryStorage(StorageBackend):
+    """内存中的远程存储"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.objects = {}
+
+    def location(self, key):
+        return f"memory://{key}"
+
+    async def exists(self, key):
+        return key in self.objects
+
+    async def put_file(self, key, path, move=False):
+        with open(path, "rb") as f:
+            self.objects[key] = f.read()
+        if move:
+            os.remove(path)
+
+    async def delete_many(self, keys):
+        return sum(self.objects.pop(key, None) is not None for key in keys)
+
+
+def write_blob(content: bytes) -> str:
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = file_service.blob_path(content_hash)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+    return content_hash
+
+
+def stage(content: bytes) -> StagedFile:
+    content_hash = hashlib.sha256(content).hexdigest()
+    temp_path = os.path.join(file_service.staging_dir, f"{content_hash}.part")
+    os.makedirs(file_service.staging_dir, exist_ok=True)
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    return StagedFile(temp_path, file_service.blob_path(content_hash), len(content), content_hash)
+
+
+def create_resume(db, content_hash: str, size: int = 10):
+    candidate = candidate_crud.create(db, obj_in=CandidateCreate(name="张三"))
+    resume_crud.create(
+        db, filename="a.pdf", file_path=file_service.blob_path(content_hash), file_size=size,
+        file_type="pdf", candidate_id=candidate.id, content_hash=content_hash
+    )
+    return candidate.id
+
+
+def ref_count(db, content_hash: str):
+    db.expire_all()
+    stored = stored_file_crud.get(db, content_hash)
+    return stored.ref_count if stored else None
+
+
+def test_acquire_release_purge(db):
+    content_hash = write_blob(b"resume")
+    for _ in range(2):
+        stored_file_crud.acquire(db, content_hash=content_hash, size=6)
+    db.commit()
+    assert ref_count(db, content_hash) == 2
+
+    assert stored_file_crud.release(db, [content_hash, None]) == [content_hash]
+    db.commit()
+    assert stored_file_crud.purge(db, [content_hash]) == []
+    assert ref_count(db, content_hash) == 1
+
+    stored_file_crud.release(db, [content_hash])
+    db.commit()
+    assert stored_file_crud.purge(db, [content_hash]) == [content_hash]
+    assert ref_count(db, content_hash) is None
+    assert not os.path.exists(file_service.blob_path(content_hash))
+
+
+def test_release_counts_repeated_hashes(db):
+    content_hash = write_blob(b"shared")
+    for _ in range(3):
+        stored_file_crud.acquire(db, content_hash=content_hash, size=6)
+    db.commit()
+    stored_file_crud.release(db, [content_hash, content_hash])
+    db.commit()
+    assert ref_count(db, content_hash) == 1
+
+
+def test_deleting_candidates_keeps_shared_blob_until_last_reference(db):
+    content_hash = write_blob(b"same pdf")
+    first = create_resume(db, content_hash)
+    second = create_resume(db, content_hash)
+    assert ref_count(db, content_hash) == 2
+
+    candidate_crud.delete(db, id=first)
+    assert ref_count(db, content_hash) == 1
+    assert os.path.exists(file_service.blob_path(content_hash))
+
+    candidate_crud.bulk_delete(db, ids=[second])
+    assert ref_count(db, content_hash) is None
+    assert not os.path.exists(file_service.blob_path(content_hash))
+
+
+def test_commit_staged_rewrites_existing_blob(db):
+    content = b"uploaded twice"
+    content_hash = write_blob(content)
+    staged = stage(content)
+    asyncio.run(file_service.commit_staged(staged))
+    assert not os.path.exists(staged.temp_path)
+    with open(file_service.blob_path(content_hash), "rb") as f:
+        assert f.read() == content
+
+
+@pytest.fixture
+def remote_storage(monkeypatch):
+    storage = MemoryStorage()
+    monkeypatch.setattr(file_service, "storage", storage)
+    return storage
+
+
+def test_remote_purge_skips_hash_acquired_again(db, remote_storage):
+    content = b"remote pdf"
+    content_hash = hashlib.sha256(content).hexdigest()
+    key = file_service.blob_key(content_hash)
+    remote_storage.objects[key] = content
+    stored_file_crud.acquire(db, content_hash=content_hash, size=len(content))
+    db.commit()
+
+    # 远程删除排在写队列中；在它执行前重新登记引用（上传同样内容）
+    release_writer = threading.Event()
+    blocker = write_queue.submit(lambda session: release_writer.wait(5))
+    stored_file_crud.release(db, [content_hash])
+    db.commit()
+    assert stored_file_crud.purge(db, [content_hash]) == [content_hash]
+    stored_file_crud.acquire(db, content_hash=content_hash, size=len(content))
+    db.commit()
+    release_writer.set()
+    blocker.result()
+    write_queue.submit(lambda session: None).result()
+
+    assert remote_storage.objects[key] == content
+    assert ref_count(db, content_hash) == 1
+
+
+def test_remote_purge_deletes_unreferenced_blob(db, remote_storage):
+    content_hash = hashlib.sha256(b"gone").hexdigest()
+    remote_storage.objects[file_service.blob_key(content_hash)] = b"gone"
+    stored_file_crud.acquire(db, content_hash=content_hash, size=4)
+    db.commit()
+    stored_file_crud.release(db, [content_hash])
+    db.commit()
+    stored_file_crud.purge(db, [content_hash])
+    write_queue.submit(lambda session: None).result()
+    assert remote_storage.objects == {}
+
+
+def test_purge_keeps_blob_uploaded_between_recheck_and_delete(db, monkeypatch):
+    """没有写队列串行化时（PostgreSQL、多副本），上传与删除最后一个引用交错"""
+    content = b"uploaded while purging"
+    content_hash = write_blob(content)
+    stored_file_crud.acquire(db, content_hash=content_hash, size=len(content))
+    db.commit()
+    stored_file_crud.release(db, [content_hash])
+    db.commit()
+
+    def upload():
+        """另一个连接上的上传：登记引用并提交后写入文件"""
+        session = SessionLocal()
+        try:
+            stored_file_crud.acquire(session, content_hash=content_hash, size=len(content))
+            session.commit()
+        finally:
+            session.close()
+        write_blob(content)
+
+    delete_blobs = file_service.delete_blobs
+
+    def delete_during_upload(content_hashes):
+        # 复查引用之后、删除文件之前开始上传；加锁时上传等待到删除提交之后
+        uploader = threading.Thread(target=upload)
+        uploader.start()
+        uploader.join(0.5)
+        threads.append(uploader)
+        return delete_blobs(content_hashes)
+
+    threads = []
+    monkeypatch.setattr(file_service, "delete_blobs", delete_during_upload)
+    assert stored_file_crud.purge(db, [content_hash]) == [content_hash]
+    threads[0].join()
+
+    assert ref_count(db, content_hash) == 1
+    assert os.path.exists(file_service.blob_path(content_hash))